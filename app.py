@@ -1,14 +1,148 @@
-from flask import Flask, jsonify, request
-from models import University, Student, Teacher, Course
+import atexit
+import hmac
+import os
+from flask import Flask, Response, jsonify, request
+from models import University, Student, Teacher, Course, FileStorage
+from models.changes import ChangeLog
+from importers import bulk_import, build_course, build_student, build_teacher, iter_records
+from cache import FragmentCache, ResponseCache, dumps
+from metrics import create_metrics, instrument_app, instrument_university, register_university_gauges
+from profiling import Profiler, attach_profiler
+from intake import EnrollmentIntake, IntakeUnavailable
+from export import MIMETYPES, iter_export
+from archive import CourseArchiver
 
 app = Flask(__name__)
-university = University()
+
+# Set UNIVERSITY_DATA_DIR to keep the data across restarts; without it everything lives in memory
+DATA_DIR = os.environ.get('UNIVERSITY_DATA_DIR')
+if DATA_DIR:
+    university = University.open(FileStorage(DATA_DIR))
+    atexit.register(university.close)
+else:
+    university = University()
+# Number of recent changes kept for GET /changes; clients further behind have to resync
+if os.environ.get('UNIVERSITY_CHANGES_MAX'):
+    university.changes = ChangeLog(int(os.environ['UNIVERSITY_CHANGES_MAX']))
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Serialized bodies of read endpoints, reused until the data they were built from changes
+response_cache = ResponseCache(max_entries=1024)
+# Serialized JSON of each entity, so listings only re-encode the entities that changed
+fragments = FragmentCache()
+
+# Per-route latency, status and size metrics, plus University gauges, served at /metrics
+metrics = create_metrics()
+instrument_app(app, metrics)
+register_university_gauges(metrics, university)
+# Set UNIVERSITY_METHOD_TIMERS=1 to also time every University method call
+if os.environ.get('UNIVERSITY_METHOD_TIMERS', '').lower() in ('1', 'true', 'yes'):
+    instrument_university(university, metrics)
+
+# Set UNIVERSITY_INTAKE=1 to queue single enrollments and apply them in per-course batches, shedding load
+# with 503 once UNIVERSITY_INTAKE_MAX requests are queued or being applied
+intake = None
+if os.environ.get('UNIVERSITY_INTAKE', '').lower() in ('1', 'true', 'yes'):
+    intake = EnrollmentIntake(
+        university,
+        window=float(os.environ.get('UNIVERSITY_INTAKE_WINDOW_MS', 5)) / 1000,
+        max_pending=int(os.environ.get('UNIVERSITY_INTAKE_MAX', 10_000))
+    )
+    atexit.register(intake.close)
+    metrics.gauge('enrollment_intake_depth', "Enrollment requests queued or being applied by the intake",
+                  lambda: [((), intake.stats()['depth'])])
+
+# End-of-term archival writes courses out as CSV before deleting them, under UNIVERSITY_ARCHIVE_DIR
+# (default: an archive folder inside UNIVERSITY_DATA_DIR); without either, archival is unavailable
+ARCHIVE_DIR = os.environ.get('UNIVERSITY_ARCHIVE_DIR') or (os.path.join(DATA_DIR, 'archive') if DATA_DIR else None)
+archiver = CourseArchiver(university, ARCHIVE_DIR, on_removed=fragments.discard) if ARCHIVE_DIR else None
+if archiver is not None:
+    atexit.register(archiver.close)
+
+# On-demand profiling of live requests; the /admin endpoints only exist when ADMIN_TOKEN is set
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+profiler = Profiler()
+attach_profiler(app, profiler)
 
 # Error handler for ValueError
 @app.errorhandler(ValueError)
 def handle_value_error(error):
     return jsonify({"error": str(error)}), 400
 
+def wants_ndjson() -> bool:
+    """Check whether the client asked for a streamed NDJSON listing"""
+    if request.args.get('format') == 'ndjson':
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+def cached_json(key, version: int, build):
+    """Serve a JSON body built as bytes from the response cache, with an ETag and 304 support"""
+    etag = response_cache.etag(key, version)
+    if request.if_none_match.contains(etag):
+        response_cache.record_not_modified(key)
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    etag, body = response_cache.get_or_build(key, version, build)
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response
+
+def fragment(collection: str, entity) -> bytes:
+    """The cached JSON of one entity"""
+    return fragments.fragment(entity, university.version(collection, entity.id))
+
+def entity_list(collection: str, entities, **fields) -> bytes:
+    """A JSON object holding a list of entities under the collection's name, assembled from cached fragments"""
+    array = fragments.array(entities, lambda entity_id: university.version(collection, entity_id))
+    parts = [dumps(collection) + b':' + array]
+    parts += [dumps(key) + b':' + dumps(value) for key, value in fields.items()]
+    return b'{' + b','.join(parts) + b'}'
+
+def json_response(body: bytes, status: int = 200) -> Response:
+    return Response(body, status=status, mimetype='application/json')
+
+def related(mapping, ids) -> list:
+    """The entities behind a set of linked IDs, skipping any that no longer exist"""
+    return [entity for entity in map(mapping.get, list(ids)) if entity is not None]
+
+def list_collection(collection: str):
+    """List a collection, either in full, one page at a time or as an NDJSON stream"""
+    # The cursor is the ID of the last entity of the previous page
+    after = request.args.get('after')
+    if wants_ndjson():
+        entities = university.iter_entities(collection, after)
+        records = (fragment(collection, entity) + b'\n' for entity in entities)
+        return Response(records, mimetype=NDJSON_MIMETYPE)
+
+    limit = request.args.get('limit', type=int)
+    key = (collection, request.query_string)
+    version = university.version(collection)
+    if limit is None and after is None:
+        # Unpaginated listing, kept for existing clients
+        return cached_json(key, version, lambda: entity_list(collection, university.iter_entities(collection)))
+
+    limit = min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+
+    def build_page():
+        entities, next_cursor = university.page(collection, limit, after)
+        return entity_list(collection, entities, next=next_cursor)
+    return cached_json(key, version, build_page)
+
+def search_collection(collection: str, find):
+    """List the entities matched by an index search, cached until the collection changes"""
+    key = (collection, request.query_string)
+    return cached_json(key, university.version(collection), lambda: entity_list(collection, find()))
+
+def bulk_response(build, insert):
+    """Stream a bulk upload through the importer and report per-row errors"""
+    records = iter_records(request.stream, request.content_type or '')
+    result = bulk_import(records, build, insert)
+    return jsonify(result), 201
+
 # Student endpoints
 @app.route('/students', methods=['GET', 'POST'])
 def handle_students():
@@ -25,9 +159,31 @@ def handle_students():
             return jsonify({"error": str(e)}), 400
     
     # GET method
-    return jsonify({
-        "students": [student.to_dict() for student in university.students.values()]
-    })
+    if any(key in request.args for key in ('email', 'name_prefix')):
+        return search_collection('students', lambda: university.find_students(
+            email=request.args.get('email'),
+            name_prefix=request.args.get('name_prefix')
+        ))
+    return list_collection('students')
+
+@app.route('/students/bulk', methods=['POST'])
+def bulk_students():
+    """Import many students from an NDJSON or CSV upload"""
+    return bulk_response(build_student, university.add_students)
+
+@app.route('/students/top', methods=['GET'])
+def top_students():
+    """Get the ?k=<n> students with the highest GPA (default 10)"""
+    k = request.args.get('k', default=10, type=int)
+    return jsonify({"students": university.get_top_students(k)})
+
+@app.route('/students/<student_id>/transcript', methods=['GET'])
+def get_transcript(student_id):
+    """Get a student's grades, GPA and class rank"""
+    transcript = university.get_transcript(student_id)
+    if transcript is None:
+        return jsonify({"error": "student not found"}), 404
+    return jsonify(transcript)
 
 @app.route('/students/<student_id>', methods=['GET'])
 def get_student(student_id):
@@ -38,7 +194,24 @@ def get_student(student_id):
     student = university.students.get(student_id)
     if not student:
         return jsonify({"error": "student not found"}), 404
-    return jsonify(student.to_dict())
+    return cached_json(('student', student_id), university.version('students', student_id),
+                       lambda: fragment('students', student))
+
+@app.route('/students/<student_id>', methods=['DELETE'])
+def delete_student(student_id):
+    """Delete a student with their enrollments, grades, attendance and waitlist places"""
+    if not university.remove_student(student_id):
+        return jsonify({"error": "student not found"}), 404
+    fragments.discard(student_id)
+    return jsonify({"message": "Student deleted"})
+
+@app.route('/students/<student_id>/courses', methods=['GET'])
+def get_student_courses(student_id):
+    """List the courses a student is enrolled in"""
+    student = university.students.get(student_id)
+    if not student:
+        return jsonify({"error": "student not found"}), 404
+    return json_response(entity_list('courses', related(university.courses, student.enrolled_courses)))
 
 # Teacher endpoints
 @app.route('/teachers', methods=['GET', 'POST'])
@@ -68,10 +241,34 @@ def handle_teachers():
             return jsonify({"error": str(e)}), 400
 
     # GET method
-    return jsonify({
-        "teachers": [teacher.to_dict() for teacher in university.teachers.values()]
-    })
+    if any(key in request.args for key in ('email', 'name_prefix', 'specialization')):
+        return search_collection('teachers', lambda: university.find_teachers(
+            email=request.args.get('email'),
+            name_prefix=request.args.get('name_prefix'),
+            specialization=request.args.get('specialization')
+        ))
+    return list_collection('teachers')
+
+@app.route('/teachers/bulk', methods=['POST'])
+def bulk_teachers():
+    """Import many teachers from an NDJSON or CSV upload"""
+    return bulk_response(build_teacher, university.add_teachers)
 
+@app.route('/teachers/<teacher_id>', methods=['DELETE'])
+def delete_teacher(teacher_id):
+    """Delete a teacher; their courses are left without a teacher"""
+    if not university.remove_teacher(teacher_id):
+        return jsonify({"error": "teacher not found"}), 404
+    fragments.discard(teacher_id)
+    return jsonify({"message": "Teacher deleted"})
+
+@app.route('/teachers/<teacher_id>/courses', methods=['GET'])
+def get_teacher_courses(teacher_id):
+    """List the courses assigned to a teacher"""
+    teacher = university.teachers.get(teacher_id)
+    if not teacher:
+        return jsonify({"error": "teacher not found"}), 404
+    return json_response(entity_list('courses', related(university.courses, teacher.assigned_courses)))
 
 # Course endpoints
 @app.route('/courses', methods=['GET', 'POST'])
@@ -113,9 +310,55 @@ def handle_courses():
             return jsonify({"error": str(e)}), 400
 
     # GET method
-    return jsonify({
-        "courses": [course.to_dict() for course in university.courses.values()]
-    })
+    if any(key in request.args for key in ('type', 'difficulty_level', 'open', 'min_seats')):
+        return search_collection('courses', lambda: university.find_courses(
+            course_type=request.args.get('type'),
+            difficulty_level=request.args.get('difficulty_level'),
+            open_only=request.args.get('open', '').lower() in ('1', 'true', 'yes'),
+            min_free_seats=request.args.get('min_seats', default=0, type=int)
+        ))
+    return list_collection('courses')
+
+@app.route('/courses/bulk', methods=['POST'])
+def bulk_courses():
+    """Import many courses from an NDJSON or CSV upload"""
+    return bulk_response(build_course, university.add_courses)
+
+@app.route('/courses/<course_id>', methods=['DELETE'])
+def delete_course(course_id):
+    """Delete a course with its enrollments, grades, attendance and waitlist"""
+    if not university.remove_course(course_id):
+        return jsonify({"error": "course not found"}), 404
+    fragments.discard(course_id)
+    return jsonify({"message": "Course deleted"})
+
+@app.route('/archive', methods=['POST'])
+def archive_courses():
+    """Archive then delete a batch of courses in the background: {"course_ids": [...]}"""
+    if archiver is None:
+        return jsonify({"error": "Archival needs UNIVERSITY_ARCHIVE_DIR or UNIVERSITY_DATA_DIR"}), 400
+    data = request.get_json()
+    course_ids = data.get('course_ids') if isinstance(data, dict) else None
+    if not isinstance(course_ids, list) or not all(isinstance(course_id, str) for course_id in course_ids):
+        return jsonify({"error": "Invalid archive request: expected {\"course_ids\": [...]}"}), 400
+    job = archiver.submit(course_ids)
+    return jsonify(job.to_dict()), 202
+
+@app.route('/archive/<job_id>', methods=['GET'])
+def archive_status(job_id):
+    """Progress of an archival job"""
+    job = archiver.jobs.get(job_id) if archiver is not None else None
+    if job is None:
+        return jsonify({"error": "archive job not found"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/courses/<course_id>/students', methods=['GET'])
+def get_course_roster(course_id):
+    """List the students enrolled in a course"""
+    course = university.courses.get(course_id)
+    if not course:
+        return jsonify({"error": "course not found"}), 404
+    return json_response(entity_list('students', related(university.students, course.students)))
 
 # Enrollment endpoints
 @app.route('/courses/<course_id>/students/<student_id>', methods=['POST', 'DELETE'])
@@ -130,19 +373,87 @@ def handle_enrollment(course_id, student_id):
     # 2. Return success/failure message
     # POST method
     if request.method == 'POST':
+        # Full courses queue the student at the priority tier an administrator gave them, never one from the request
         try:
-            university.enroll_student(student_id, course_id)
-            return jsonify({'message':"Enrollment successful"}), 201
+            if intake is not None:
+                status, position = intake.submit(student_id, course_id)
+            else:
+                status, position = university.enroll_or_waitlist(student_id, course_id)
+        except IntakeUnavailable as e:
+            response = jsonify({"error": str(e)})
+            response.headers['Retry-After'] = str(e.retry_after)
+            return response, 503
         except (KeyError, ValueError, TypeError) as e:
             return jsonify({"error": str(e)}), 400
+        if status == 'rejected':
+            return jsonify({"error": "student or course not found"}), 404
+        if status == 'waitlisted':
+            return jsonify({'message': "Course is full, added to the waitlist", 'position': position}), 202
+        return jsonify({'message':"Enrollment successful"}), 201
     # DELETE method
     elif request.method == 'DELETE':
         try:
-            university.withdraw_student(student_id, course_id)
+            if not university.withdraw_student(student_id, course_id) and \
+                    university.leave_waitlist(student_id, course_id):
+                return jsonify({'message': "Removed from the waitlist"}), 201
             return jsonify({'message': "Withdrawal successful"}), 201
         except (KeyError, ValueError, TypeError) as e:
             return jsonify({"error": str(e)}), 400
 
+@app.route('/courses/<course_id>/waitlist', methods=['GET'])
+def get_waitlist(course_id):
+    """List the students waiting for a course, in promotion order"""
+    waitlist = university.get_waitlist(course_id)
+    if waitlist is None:
+        return jsonify({"error": "course not found"}), 404
+    return jsonify({"waitlist": waitlist})
+
+@app.route('/courses/<course_id>/waitlist/<student_id>', methods=['GET'])
+def get_waitlist_position(course_id, student_id):
+    """Get a student's place on a course's waitlist"""
+    position = university.get_waitlist_position(student_id, course_id)
+    if position is None:
+        return jsonify({"error": "student is not on this waitlist"}), 404
+    return jsonify({"position": position})
+
+@app.route('/students/<student_id>/waitlists', methods=['GET'])
+def get_student_waitlists(student_id):
+    """Get a student's place on every waitlist they are on"""
+    positions = university.get_student_waitlists(student_id)
+    if positions is None:
+        return jsonify({"error": "student not found"}), 404
+    return jsonify({"waitlists": positions})
+
+@app.route('/intake/stats', methods=['GET'])
+def intake_stats():
+    """Report enrollment intake queue depth, batch sizes, shed requests and queueing delay"""
+    if intake is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **intake.stats()})
+
+@app.route('/enrollments', methods=['POST'])
+def batch_enrollment():
+    """Enroll many students in many courses in one all-or-nothing request"""
+    # Accepts either {"enrollments": [{"student_id", "course_id"}, ...]}
+    # or a cart for one student: {"student_id": ..., "course_ids": [...]}
+    data = request.get_json()
+    if not isinstance(data, dict):
+        return jsonify({"error": "Invalid enrollment batch: expected a JSON object"}), 400
+    try:
+        if 'enrollments' in data:
+            pairs = [(item['student_id'], item['course_id']) for item in data['enrollments']]
+        else:
+            pairs = [(data['student_id'], course_id) for course_id in data['course_ids']]
+    except (KeyError, TypeError) as e:
+        return jsonify({"error": f"Invalid enrollment batch: {e}"}), 400
+    if not all(isinstance(student_id, str) and isinstance(course_id, str) for student_id, course_id in pairs):
+        return jsonify({"error": "Invalid enrollment batch: student and course IDs must be strings"}), 400
+
+    rejected = university.enroll_batch(pairs)
+    if rejected:
+        return jsonify({"error": "Enrollment batch rejected", "rejected": rejected}), 409
+    return jsonify({"message": "Enrollment successful", "enrolled": len(pairs)}), 201
+
 # Course assignment endpoint
 @app.route('/courses/<course_id>/teacher/<teacher_id>', methods=['POST'])
 def assign_teacher_to_course(course_id, teacher_id):
@@ -170,11 +481,61 @@ def record_attendance(course_id):
         try:
             date = data['date']
             present_student_ids = set(data['present_student_ids'])
-            university.record_attendance(course_id,date,present_student_ids)
+            if not university.record_attendance(course_id,date,present_student_ids):
+                return jsonify({"error": "Attendance rejected: the course must exist, the date must be YYYY-MM-DD and every present student must be enrolled"}), 400
             return jsonify({'message': "Record successful"}), 201
         except (KeyError, ValueError, TypeError) as e:
             return jsonify({"error": str(e)}), 400
 
+@app.route('/courses/<course_id>/attendance/sheet', methods=['POST'])
+def record_attendance_sheet(course_id):
+    """Record many dates of attendance in one all-or-nothing request: {"sheet": {"<date>": [student_id, ...]}}"""
+    data = request.get_json()
+    sheet = data.get('sheet') if isinstance(data, dict) else None
+    if not isinstance(sheet, dict):
+        return jsonify({"error": "Invalid attendance sheet: expected {\"sheet\": {date: [student_id, ...]}}"}), 400
+    rejected = university.record_attendance_sheet(course_id, sheet)
+    if rejected is None:
+        return jsonify({"error": "course not found"}), 404
+    if rejected:
+        return jsonify({"error": "Attendance sheet rejected", "rejected": rejected}), 400
+    return jsonify({"message": "Attendance recorded", "sessions": len(sheet)}), 201
+
+@app.route('/courses/<course_id>/attendance', methods=['GET'])
+def get_course_attendance(course_id):
+    """List a course's sessions within ?from=&to= (ISO dates) or its ?last=<n> sessions"""
+    sessions = university.get_course_attendance(
+        course_id,
+        start=request.args.get('from'),
+        end=request.args.get('to'),
+        last=request.args.get('last', type=int)
+    )
+    if sessions is None:
+        return jsonify({"error": "course not found"}), 404
+    return jsonify({"sessions": sessions})
+
+@app.route('/students/<student_id>/attendance', methods=['GET'])
+def get_student_attendance(student_id):
+    """List the dates a student was present, per course, within ?from=&to= and optionally one ?course="""
+    attendance = university.get_student_attendance(
+        student_id,
+        course_id=request.args.get('course'),
+        start=request.args.get('from'),
+        end=request.args.get('to')
+    )
+    if attendance is None:
+        return jsonify({"error": "student not found"}), 404
+    return jsonify({"attendance": attendance})
+
+@app.route('/courses/<course_id>/attendance/stats', methods=['GET'])
+def attendance_stats(course_id):
+    """Get headcounts and attendance rates, optionally listing students below ?below=<percent>"""
+    below = request.args.get('below', type=float)
+    stats = university.get_attendance_stats(course_id, below)
+    if stats is None:
+        return jsonify({"error": "course not found"}), 404
+    return jsonify(stats)
+
 # Grade endpoints
 @app.route('/courses/<course_id>/grades/<student_id>', methods=['POST'])
 def assign_grade(course_id, student_id):
@@ -187,10 +548,168 @@ def assign_grade(course_id, student_id):
         data = request.get_json()
         try:
             grade= float(data['grade'])
-            university.assign_grade(course_id,student_id, grade)
+            if not university.assign_grade(course_id,student_id, grade):
+                return jsonify({"error": "Grade rejected: the student must be enrolled and the grade between 0 and 100"}), 400
             return jsonify({'message': "Grade assignation successful"}), 201
-        except (KeyError, ValueError, TypeError) as e:
+        except (KeyError, ValueError, TypeError, OverflowError) as e:
+            return jsonify({"error": str(e)}), 400
+
+@app.route('/courses/<course_id>/grades', methods=['POST'])
+def assign_gradebook(course_id):
+    """Assign a whole class's grades in one all-or-nothing request: {"grades": {"<student_id>": 91.5, ...}}"""
+    data = request.get_json()
+    grades = data.get('grades') if isinstance(data, dict) else None
+    if not isinstance(grades, dict):
+        return jsonify({"error": "Invalid gradebook: expected {\"grades\": {student_id: grade}}"}), 400
+    rejected = university.assign_grades(course_id, grades)
+    if rejected is None:
+        return jsonify({"error": "course not found"}), 404
+    if rejected:
+        return jsonify({"error": "Gradebook rejected", "rejected": rejected}), 400
+    return jsonify({"message": "Grades assigned", "graded": len(grades)}), 201
+
+@app.route('/courses/<course_id>/grades/stats', methods=['GET'])
+def course_grade_stats(course_id):
+    """Get grade statistics for one course"""
+    stats = university.get_course_grade_stats(course_id)
+    if stats is None:
+        return jsonify({"error": "course not found"}), 404
+    return jsonify(stats)
+
+@app.route('/grades/stats', methods=['GET'])
+def grade_report():
+    """Get grade statistics across every course"""
+    # Computed on a snapshot, so every course is counted as of the same moment while grading goes on
+    with university.snapshot() as view:
+        return jsonify(view.get_grade_report())
+
+@app.route('/exports/<name>', methods=['GET'])
+def export(name):
+    """Stream a full dump of enrollments, grades or attendance as ?format=csv (default) or parquet"""
+    fmt = request.args.get('format', 'csv')
+    chunks = iter_export(university, name, fmt, snapshot=True)
+    response = Response(chunks, mimetype=MIMETYPES[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename="{name}.{fmt}"'
+    return response
+
+@app.route('/changes', methods=['GET'])
+def get_changes():
+    """Stream of changes after ?since= (a sequence number), for clients that sync incrementally"""
+    since = request.args.get('since', 0, type=int)
+    limit = min(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), MAX_PAGE_SIZE)
+    if limit < 1:
+        return jsonify({"error": "limit must be positive"}), 400
+    changes, resync = university.changes.since(since, limit, request.args.get('epoch'))
+    latest = university.changes.latest
+    if resync:
+        # The client missed changes that are no longer kept: it re-downloads everything, then continues from `next`
+        body = {'epoch': university.changes.epoch, 'resync': True, 'changes': [], 'next': latest, 'latest': latest}
+    else:
+        next_seq = changes[-1]['seq'] if changes else since
+        body = {'epoch': university.changes.epoch, 'resync': False, 'changes': changes,
+                'next': next_seq, 'latest': max(latest, next_seq)}
+    return json_response(dumps(body))
+
+@app.route('/changes/stats', methods=['GET'])
+def change_stats():
+    """Report how many changes the feed keeps and which sequence numbers are still available"""
+    return jsonify(university.changes.stats())
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Report response cache hit rate and bytes saved, plus entity fragment reuse"""
+    return jsonify({**response_cache.stats(), 'fragments': fragments.stats()})
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Expose request and University metrics in Prometheus text format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+def admin_error():
+    """Return an error response unless the request carries the admin token"""
+    if not ADMIN_TOKEN:
+        return jsonify({"error": "not found"}), 404
+    # Compared as bytes: compare_digest rejects str with non-ASCII characters, which any client can send.
+    # WSGI decodes header bytes as latin-1, so encoding back gives what the client sent
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', '').encode('latin-1'), ADMIN_TOKEN.encode()):
+        return jsonify({"error": "forbidden"}), 403
+    return None
+
+@app.route('/admin/students/<student_id>/priority', methods=['PUT'])
+def set_student_priority(student_id):
+    """Set the waitlist tier a student joins full courses with, from a {"priority": n} body"""
+    error = admin_error()
+    if error:
+        return error
+    data = request.get_json(silent=True)
+    priority = data.get('priority') if isinstance(data, dict) else None
+    if not isinstance(priority, int) or isinstance(priority, bool):
+        return jsonify({"error": "body must be a JSON object with an integer priority"}), 400
+    if not university.set_student_priority(student_id, priority):
+        return jsonify({"error": "student not found"}), 404
+    return jsonify({'id': student_id, 'priority': priority})
+
+@app.route('/admin/profile', methods=['GET', 'POST', 'DELETE'])
+def handle_profile():
+    """Start (POST), inspect (GET) or stop (DELETE) a profiling window"""
+    error = admin_error()
+    if error:
+        return error
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        try:
+            session = profiler.start(
+                mode=data.get('mode', 'cprofile'),
+                route=data.get('route'),
+                percent=float(data.get('percent', 100)),
+                seconds=float(data.get('seconds', 60)),
+                interval=float(data.get('interval_ms', 5)) / 1000
+            )
+        except (TypeError, ValueError) as e:
             return jsonify({"error": str(e)}), 400
+        return jsonify(session.to_dict()), 201
+    session = profiler.stop() if request.method == 'DELETE' else profiler.session
+    if session is None:
+        return jsonify({"error": "no profiling session"}), 404
+    return jsonify(session.to_dict())
+
+@app.route('/admin/profile/pstats', methods=['GET'])
+def download_pstats():
+    """Download the aggregated cProfile data (load with pstats.Stats or snakeviz)"""
+    error = admin_error()
+    if error:
+        return error
+    data = profiler.pstats_bytes()
+    if data is None:
+        return jsonify({"error": "no cProfile data"}), 404
+    return Response(data, mimetype='application/octet-stream',
+                    headers={'Content-Disposition': 'attachment; filename=profile.pstats'})
+
+@app.route('/admin/profile/summary', methods=['GET'])
+def profile_summary():
+    """Show the top ?limit= functions of the cProfile data, ordered by ?sort= (default cumulative)"""
+    error = admin_error()
+    if error:
+        return error
+    try:
+        text = profiler.summary(request.args.get('limit', 30, type=int), request.args.get('sort', 'cumulative'))
+    except KeyError as e:
+        return jsonify({"error": f"unknown sort key {e}"}), 400
+    if text is None:
+        return jsonify({"error": "no cProfile data"}), 404
+    return Response(text, mimetype='text/plain')
+
+@app.route('/admin/profile/collapsed', methods=['GET'])
+def download_collapsed():
+    """Download sampled stacks in collapsed format, for flamegraph.pl or speedscope"""
+    error = admin_error()
+    if error:
+        return error
+    text = profiler.collapsed()
+    if text is None:
+        return jsonify({"error": "no stack samples"}), 404
+    return Response(text, mimetype='text/plain',
+                    headers={'Content-Disposition': 'attachment; filename=profile.collapsed'})
 
 if __name__ == '__main__':
-    app.run(debug=True, use_reloader=False)
\ No newline at end of file
+    app.run(debug=True, use_reloader=False)
@@ -0,0 +1,163 @@
+import csv
+import io
+import os
+import queue
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from export import EXPORTS
+
+
+class ArchiveJob:
+    """One batch of courses to archive, and how far the archiver got with it"""
+
+    def __init__(self, course_ids: List[str], directory: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.course_ids = course_ids
+        self.directory = os.path.join(directory, self.id)
+        self.status = 'queued'
+        self.archived = 0
+        self.missing: List[str] = []  # Course IDs that no longer existed when their turn came
+        self.changed: List[str] = []  # Course IDs left in place because they kept changing while being archived
+        self.rows: Dict[str, int] = {name: 0 for name in EXPORTS}
+        self.error: Optional[str] = None
+        self.submitted = time.time()
+        self.finished: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'status': self.status,
+            'courses': len(self.course_ids),
+            'archived': self.archived,
+            'missing': self.missing,
+            'changed': self.changed,
+            'rows': self.rows,
+            'files': [os.path.join(self.directory, f"{name}.csv") for name in EXPORTS],
+            'error': self.error,
+            'seconds': round((self.finished or time.time()) - self.submitted, 3),
+        }
+
+
+class CourseArchiver:
+    """End-of-term archival: write out whole batches of courses, then delete them, in the background.
+
+    A single worker thread handles one course at a time. It reads the
+    course's enrollment, grade and attendance rows and its version under the
+    course lock, appends the rows to the job's CSV files and fsyncs them,
+    then calls `University.remove_course` with that version, which locks
+    only that course and its own students and teachers. A course that
+    changed in between is not deleted: its rows are cut off the files again
+    and it is retried, up to `attempts` times. The worker pauses between
+    courses, so live requests are never held up for more than one course's
+    worth of work.
+    """
+
+    def __init__(self, university, directory: str, pause: float = 0.001,
+                 on_removed: Optional[Callable[[str], None]] = None, attempts: int = 3):
+        self.university = university
+        self.directory = directory
+        self.pause = pause
+        self.attempts = attempts
+        self.on_removed = on_removed  # Called with each deleted course ID, e.g. to drop cached JSON
+        self.jobs: Dict[str, ArchiveJob] = {}
+        self._queue: 'queue.Queue[Optional[ArchiveJob]]' = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, course_ids: List[str]) -> ArchiveJob:
+        job = ArchiveJob(list(dict.fromkeys(course_ids)), self.directory)
+        with self._lock:
+            self.jobs[job.id] = job
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='course-archiver', daemon=True)
+                self._worker.start()
+        self._queue.put(job)
+        return job
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            job.status = 'running'
+            try:
+                self._archive(job)
+                job.status = 'done'
+            except Exception as e:  # Reported through the job; the worker moves on to the next one
+                job.status = 'failed'
+                job.error = str(e)
+            job.finished = time.time()
+
+    def _archive(self, job: ArchiveJob):
+        os.makedirs(job.directory, exist_ok=True)
+        files = {name: open(os.path.join(job.directory, f"{name}.csv"), 'wb') for name in EXPORTS}
+        try:
+            for name, (columns, _) in EXPORTS.items():
+                files[name].write(_encode([columns])[0])
+            _sync(files.values())
+            # The files' directory entries must survive a crash as well as their contents
+            directory = os.open(job.directory, os.O_RDONLY)
+            try:
+                os.fsync(directory)
+            finally:
+                os.close(directory)
+            for course_id in job.course_ids:
+                self._archive_course(job, course_id, files)
+                time.sleep(self.pause)
+        finally:
+            for output in files.values():
+                output.close()
+
+    def _archive_course(self, job: ArchiveJob, course_id: str, files: Dict):
+        for _ in range(self.attempts):
+            with self.university.course_locked(course_id) as course:
+                if course is None:
+                    job.missing.append(course_id)
+                    return
+                version = self.university.version('courses', course_id)
+                chunks = {name: _encode(rows(self.university, [course])) for name, (_, rows) in EXPORTS.items()}
+            offsets = {name: output.tell() for name, output in files.items()}
+            for name, (data, _) in chunks.items():
+                files[name].write(data)
+            # The course's records are on disk before it goes away
+            _sync(files.values())
+            if self.university.remove_course(course_id, version=version):
+                job.archived += 1
+                for name, (_, count) in chunks.items():
+                    job.rows[name] += count
+                if self.on_removed is not None:
+                    self.on_removed(course_id)
+                return
+            # Changed or deleted since it was read: drop its rows and read it again
+            for name, output in files.items():
+                output.truncate(offsets[name])
+                output.seek(offsets[name])
+        job.changed.append(course_id)
+
+    def close(self):
+        """Finish the queued jobs, then stop the worker"""
+        with self._lock:
+            worker = self._worker
+        if worker is not None:
+            self._queue.put(None)
+            worker.join()
+
+
+def _encode(rows: Iterable[tuple]) -> Tuple[bytes, int]:
+    """CSV bytes of some rows, and how many there were"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return buffer.getvalue().encode('utf-8'), count
+
+
+def _sync(files: Iterable):
+    for output in files:
+        output.flush()
+        os.fsync(output.fileno())
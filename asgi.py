@@ -0,0 +1,196 @@
+"""Async (ASGI) entry point serving the same routes as app.py, over the same University.
+
+Run it under an ASGI server such as uvicorn or hypercorn:
+
+    uvicorn asgi:application --host 0.0.0.0 --port 8000
+    hypercorn asgi:application --bind 0.0.0.0:8000
+
+Requests are dispatched to the Flask app's views, so routes, caches, metrics
+and the model layer are shared with the WSGI path (`python app.py`), which
+stays available. A short list of constant-time, lock-free reads runs right
+on the event loop; every other request (listings, exports, statistics,
+waitlists, the change feed, and all mutations, which may wait for entity
+locks or the enrollment intake) runs on a thread pool, so a slow request
+never holds up the connections behind it. Responses without a
+length, such as exports and NDJSON listings, are pulled from the pool chunk
+by chunk and streamed out as they are produced.
+"""
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+from werkzeug.exceptions import HTTPException
+
+from app import app
+
+# Reads cheap enough to run on the event loop: one entity or a few counters, and no entity locks.
+# Anything not listed here runs on the thread pool, so a new route is offloaded until proven cheap
+INLINE_ENDPOINTS = frozenset({
+    'get_student', 'get_transcript', 'archive_status', 'cache_stats', 'change_stats',
+})
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+BODY_CHUNK = 64 * 1024
+
+executor = ThreadPoolExecutor(max_workers=int(os.environ.get('UNIVERSITY_ASGI_THREADS', 32)),
+                              thread_name_prefix='asgi')
+
+
+def offloaded(environ: Dict) -> bool:
+    """Whether a request should run on the thread pool rather than on the event loop"""
+    if environ['REQUEST_METHOD'] not in READ_METHODS:
+        return True
+    try:
+        rule, _ = app.url_map.bind_to_environ(environ).match(return_rule=True)
+    except HTTPException:
+        return False  # 404 and 405 answers are cheap
+    return rule.endpoint not in INLINE_ENDPOINTS
+
+
+def wsgi_environ(scope: Dict) -> Dict:
+    """Translate an ASGI HTTP scope into a WSGI environ; the caller supplies wsgi.input"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': str(server[0]),
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input_terminated': True,  # Reading to the end of the body is safe, with or without a length
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        key = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            key = 'HTTP_' + key
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+class ReceiveStream(io.RawIOBase):
+    """Blocking request body for a view running on the thread pool, fed by ASGI receive on the event loop"""
+
+    def __init__(self, receive: Callable, loop: asyncio.AbstractEventLoop):
+        super().__init__()
+        self._receive = receive
+        self._loop = loop
+        self._pending = b''
+        self._done = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending and not self._done:
+            message = asyncio.run_coroutine_threadsafe(self._receive(), self._loop).result()
+            if message['type'] == 'http.disconnect':
+                self._done = True
+            else:
+                self._pending = message.get('body', b'')
+                self._done = not message.get('more_body', False)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+async def read_body(receive: Callable) -> bytes:
+    """The whole request body, for views that run on the event loop"""
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body', False):
+            break
+    return b''.join(chunks)
+
+
+def call_wsgi(environ: Dict) -> Tuple[int, List[Tuple[bytes, bytes]], object]:
+    """Run the Flask app on one request; returns the status, headers and the body iterable"""
+    started = {}
+
+    def start_response(status: str, headers: List[Tuple[str, str]], exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+
+    body = app(environ, start_response)
+    return started['status'], started['headers'], body
+
+
+async def application(scope: Dict, receive: Callable, send: Callable):
+    """ASGI 3 application"""
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+    loop = asyncio.get_running_loop()
+    environ = wsgi_environ(scope)
+    if offloaded(environ):
+        environ['wsgi.input'] = io.BufferedReader(ReceiveStream(receive, loop), BODY_CHUNK)
+        status, headers, body = await loop.run_in_executor(executor, call_wsgi, environ)
+    else:
+        environ['wsgi.input'] = io.BytesIO(await read_body(receive))
+        status, headers, body = call_wsgi(environ)
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    streamed = not any(name == b'content-length' for name, _ in headers)
+    try:
+        if not streamed:
+            # Already serialized in memory: one message
+            await send({'type': 'http.response.body', 'body': b''.join(body)})
+            return
+        chunks = iter(body)
+        while True:
+            data, done = await loop.run_in_executor(executor, pull, chunks)
+            if data:
+                await send({'type': 'http.response.body', 'body': data, 'more_body': not done})
+            if done:
+                break
+        if not data:
+            await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        close = getattr(body, 'close', None)
+        if close is not None and streamed:
+            # Closing a streamed body runs its cleanup, such as releasing an export's snapshot
+            await loop.run_in_executor(executor, close)
+        elif close is not None:
+            close()
+
+
+def pull(chunks) -> Tuple[bytes, bool]:
+    """Collect chunks of a streamed body up to BODY_CHUNK bytes; returns them and whether the body ended"""
+    collected = []
+    size = 0
+    for chunk in chunks:
+        collected.append(chunk)
+        size += len(chunk)
+        if size >= BODY_CHUNK:
+            return b''.join(collected), False
+    return b''.join(collected), True
+
+
+async def lifespan(receive: Callable, send: Callable):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
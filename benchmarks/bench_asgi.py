@@ -0,0 +1,187 @@
+"""Compare the async (ASGI) entry point with the threaded Flask server under many concurrent connections.
+
+Each server runs in its own process on the same synthetic dataset: the
+Werkzeug threaded server that `app.run` uses, and asgi.py's application
+under uvicorn (which has to be installed). The load generator keeps
+`--concurrency` connections busy for `--seconds`, one request per connection
+since the Werkzeug server closes every connection. The mix is mostly
+single-student reads, some course rosters and enrollments, and a share of
+full student listings: the slow requests that tie up a worker.
+
+Reported per server and concurrency: connections handled and failed
+(refused, reset, timed out or answered with a 5xx), requests per second and
+p50/p99 latency, overall and per kind of request. The load generator runs
+on the same machine, so with few cores it competes with the server for CPU.
+
+    python benchmarks/bench_asgi.py --students 20000 --concurrency 50 200 1000 --seconds 10
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datagen import populate_from_args, scale_arguments
+from results import latency_summary, output_argument, report
+
+SERVERS = ('flask', 'asgi')
+HOST = '127.0.0.1'
+
+
+def serve(server: str, port: int, args: argparse.Namespace):
+    """Child process: populate the shared University and serve it until killed"""
+    import app
+    populate_from_args(app.university, args)
+    if server == 'flask':
+        from werkzeug.serving import make_server
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)  # One log line per request would dominate
+        make_server(HOST, port, app.app, threaded=True).serve_forever()
+    else:
+        import asgi
+        import uvicorn
+        uvicorn.run(asgi.application, host=HOST, port=port, log_level='warning', access_log=False)
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind((HOST, 0))
+        return probe.getsockname()[1]
+
+
+def start_server(server: str, args: argparse.Namespace) -> (subprocess.Popen, int):
+    port = free_port()
+    command = [sys.executable, os.path.abspath(__file__), '--serve', server, '--port', str(port),
+               '--students', str(args.students), '--teachers', str(args.teachers), '--courses', str(args.courses),
+               '--per-student', str(args.per_student), '--sessions', str(args.sessions), '--seed', str(args.seed)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    deadline = time.time() + 300
+    while time.time() < deadline:
+        try:
+            with socket.create_connection((HOST, port), timeout=1):
+                return process, port
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError(f"{server} server exited with status {process.returncode}")
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"{server} server did not start")
+
+
+def fetch_ids(port: int, collection: str) -> list:
+    ids, after = [], None
+    while True:
+        query = "?limit=1000" + (f"&after={after}" if after else '')
+        with urllib.request.urlopen(f"http://{HOST}:{port}/{collection}{query}") as response:
+            page = json.load(response)
+        ids.extend(entity['id'] for entity in page[collection])
+        after = page.get('next')
+        if not after:
+            return ids
+
+
+def request_mix(student_ids: list, course_ids: list, listing_share: float):
+    """Pick one (kind, method, path) at random"""
+    def pick(rng: random.Random):
+        roll = rng.random()
+        if roll < listing_share:
+            return 'listing', 'GET', '/students'
+        roll = rng.random()
+        if roll < 0.75:
+            return 'student', 'GET', f"/students/{rng.choice(student_ids)}"
+        if roll < 0.9:
+            return 'roster', 'GET', f"/courses/{rng.choice(course_ids)}/students"
+        return 'enroll', 'POST', f"/courses/{rng.choice(course_ids)}/students/{rng.choice(student_ids)}"
+    return pick
+
+
+async def one_request(port: int, method: str, path: str, timeout: float) -> int:
+    """Send one request on a fresh connection and return the status code once the whole response is read"""
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(HOST, port), timeout)
+    try:
+        writer.write(f"{method} {path} HTTP/1.1\r\nHost: {HOST}\r\nContent-Length: 0\r\n"
+                     f"Connection: close\r\n\r\n".encode('latin-1'))
+        response = await asyncio.wait_for(reader.read(), timeout)  # Until the server closes the connection
+        return int(response.split(b' ', 2)[1])
+    finally:
+        writer.close()
+
+
+async def load(port: int, pick, concurrency: int, seconds: float, timeout: float, seed: int) -> dict:
+    latencies = {}
+    failures = {}
+    deadline = time.perf_counter() + seconds
+
+    async def connection_loop(index: int):
+        rng = random.Random(seed + index)
+        while time.perf_counter() < deadline:
+            kind, method, path = pick(rng)
+            started = time.perf_counter()
+            try:
+                status = await one_request(port, method, path, timeout)
+                error = f"http_{status}" if status >= 500 else None
+            except (OSError, asyncio.TimeoutError, IndexError, ValueError) as e:
+                error = type(e).__name__
+            if error:
+                failures[error] = failures.get(error, 0) + 1
+            else:
+                latencies.setdefault(kind, []).append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(connection_loop(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    samples = [sample for kind_samples in latencies.values() for sample in kind_samples]
+    return {
+        'connections_handled': len(samples),
+        'connections_failed': sum(failures.values()),
+        'failures': failures,
+        'requests_per_second': round(len(samples) / elapsed),
+        'latency': latency_summary(samples),
+        'p99_ms_by_kind': {kind: latency_summary(kind_samples)['p99_ms'] for kind, kind_samples in sorted(latencies.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    scale_arguments(parser, students=20_000, courses=200, per_student=5, sessions=10)
+    parser.add_argument('--servers', nargs='+', choices=SERVERS, default=list(SERVERS))
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[50, 200, 1000])
+    parser.add_argument('--seconds', type=float, default=10.0, help="duration of each run")
+    parser.add_argument('--timeout', type=float, default=10.0, help="per-request timeout in seconds")
+    parser.add_argument('--listing-share', type=float, default=0.01, help="share of full student listings")
+    parser.add_argument('--serve', choices=SERVERS, help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    output_argument(parser)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve, args.port, args)
+        return
+    if 'asgi' in args.servers and importlib.util.find_spec('uvicorn') is None:
+        parser.error("the asgi server runs under uvicorn, which is not installed (or pass --servers flask)")
+
+    results = {}
+    for server in args.servers:
+        process, port = start_server(server, args)
+        try:
+            pick = request_mix(fetch_ids(port, 'students'), fetch_ids(port, 'courses'), args.listing_share)
+            results[server] = {
+                str(concurrency): asyncio.run(load(port, pick, concurrency, args.seconds, args.timeout, args.seed))
+                for concurrency in args.concurrency
+            }
+        finally:
+            process.kill()
+            process.wait()
+    report('asgi', {key: value for key, value in vars(args).items() if key not in ('serve', 'port')},
+           results, args.output)
+
+
+if __name__ == '__main__':
+    main()
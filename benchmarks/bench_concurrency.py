@@ -0,0 +1,95 @@
+"""Stress University with concurrent enrollments and check that no course is overbooked.
+
+Each run starts from a fresh University with a few small courses and many
+students, then lets `threads` workers hammer enroll_student,
+withdraw_student and assign_grade on random pairs. Afterwards every course
+must be within capacity and the course and student sides of each
+enrollment must agree. Throughput is reported per thread count.
+
+    python benchmarks/bench_concurrency.py --threads 1 2 4 8
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Course, Student, University
+
+
+def check_invariants(university: University) -> list:
+    problems = []
+    for course in university.courses.values():
+        if len(course.students) > course.max_capacity:
+            problems.append(f"course {course.id} overbooked: {len(course.students)}/{course.max_capacity}")
+        for student_id in course.students:
+            if course.id not in university.students[student_id].enrolled_courses:
+                problems.append(f"student {student_id} missing course {course.id}")
+    for student in university.students.values():
+        for course_id in student.enrolled_courses:
+            if student.id not in university.courses[course_id].students:
+                problems.append(f"course {course_id} missing student {student.id}")
+    return problems
+
+
+def run(threads: int, operations: int, courses: int, capacity: int, students: int) -> dict:
+    university = University()
+    course_ids = [university.add_course(Course(f"Course {i}", capacity, "math", "beginner")) for i in range(courses)]
+    student_ids = [
+        university.add_student(Student(f"Student {i}", {'email': f"s{i}@example.com", 'phone': '555'}))
+        for i in range(students)
+    ]
+    per_thread = operations // threads
+    start = threading.Barrier(threads + 1)
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        start.wait()
+        for _ in range(per_thread):
+            student_id, course_id = rng.choice(student_ids), rng.choice(course_ids)
+            roll = rng.random()
+            if roll < 0.7:
+                university.enroll_student(student_id, course_id)
+            elif roll < 0.9:
+                university.withdraw_student(student_id, course_id)
+            else:
+                university.assign_grade(course_id, student_id, rng.uniform(0, 100))
+
+    workers = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    for thread in workers:
+        thread.start()
+    start.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    problems = check_invariants(university)
+    return {
+        'threads': threads,
+        'operations': per_thread * threads,
+        'seconds': round(elapsed, 3),
+        'ops_per_second': round(per_thread * threads / elapsed),
+        'violations': problems[:10],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--operations', type=int, default=200_000)
+    parser.add_argument('--courses', type=int, default=20)
+    parser.add_argument('--capacity', type=int, default=30)
+    parser.add_argument('--students', type=int, default=5_000)
+    args = parser.parse_args()
+    results = [run(threads, args.operations, args.courses, args.capacity, args.students) for threads in args.threads]
+    print(json.dumps(results, indent=2))
+    if any(result['violations'] for result in results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Measure export throughput in rows per second, and the memory an export holds at its peak.
+
+Each export is streamed to nowhere in every available format. Peak memory is
+traced separately (tracing slows Python down) and compared with the old way
+of building a grade dump: calling get_course_roster and get_course_grades
+per course and collecting the results.
+
+    python benchmarks/bench_export.py --students 50000 --courses 500 --per-student 5 --sessions 20
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from export import EXPORTS, FORMATS, iter_export, pa
+from models import University
+from datagen import populate_from_args, scale_arguments
+from results import output_argument, report
+
+
+def drain(chunks) -> int:
+    return sum(len(chunk) for chunk in chunks)
+
+
+def peak_kib(call) -> float:
+    tracemalloc.start()
+    try:
+        call()
+        return round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+
+def materialized_grades(university: University) -> list:
+    rows = []
+    for course_id in list(university.courses):
+        roster = university.get_course_roster(course_id)
+        grades = university.get_course_grades(course_id)
+        rows.extend((course_id, student['id'], grades.get(student['id'])) for student in roster)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    scale_arguments(parser, students=20_000, courses=200, per_student=5, sessions=10)
+    parser.add_argument('--rounds', type=int, default=3)
+    output_argument(parser)
+    args = parser.parse_args()
+
+    university = University()
+    populate_from_args(university, args)
+
+    results = {'pyarrow': pa is not None}
+    for name, (_, rows) in EXPORTS.items():
+        count = sum(1 for _ in rows(university))
+        for fmt in FORMATS:
+            if fmt == 'parquet' and pa is None:
+                continue
+            best = float('inf')
+            for _ in range(args.rounds):
+                started = time.perf_counter()
+                size = drain(iter_export(university, name, fmt))
+                best = min(best, time.perf_counter() - started)
+            results[f"{name}.{fmt}"] = {
+                'rows': count,
+                'bytes': size,
+                'rows_per_second': round(count / best),
+                'peak_kib': peak_kib(lambda: drain(iter_export(university, name, fmt))),
+            }
+    results['materialized_grades_peak_kib'] = peak_kib(lambda: materialized_grades(university))
+    report('export', vars(args), results, args.output)
+
+
+if __name__ == '__main__':
+    main()
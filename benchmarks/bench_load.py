@@ -0,0 +1,145 @@
+"""Replay realistic request mixes against the Flask app and report latency and throughput.
+
+The app runs in-process behind Flask's test client, so the numbers cover
+routing, request parsing, the model and JSON encoding, but no network.
+Each scenario is a weighted mix of requests issued by `--clients` threads:
+
+  registration_rush  enrollments, cart checkouts, open-course listings, student lookups
+  attendance_hour    attendance posts and attendance queries
+  grade_day          grade posts, transcripts, grade statistics and the top-k ranking
+
+    python benchmarks/bench_load.py --scenarios grade_day --requests 20000 --output load.json
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as server
+from datagen import Dataset, populate_from_args, scale_arguments
+from results import latency_summary, output_argument, report
+
+# A request is (endpoint label, method, url, JSON body or None)
+Request = Tuple[str, str, str, object]
+
+
+def registration_rush(dataset: Dataset, rng: random.Random) -> Request:
+    student_id, course_id = rng.choice(dataset.student_ids), rng.choice(dataset.course_ids)
+    roll = rng.random()
+    if roll < 0.6:
+        return ('enroll', 'POST', f"/courses/{course_id}/students/{student_id}", None)
+    if roll < 0.75:
+        cart = rng.sample(dataset.course_ids, min(3, len(dataset.course_ids)))
+        return ('enroll_cart', 'POST', '/enrollments', {'student_id': student_id, 'course_ids': cart})
+    if roll < 0.9:
+        return ('open_courses', 'GET', '/courses?open=true&limit=100', None)
+    return ('get_student', 'GET', f"/students/{student_id}", None)
+
+
+def attendance_hour(dataset: Dataset, rng: random.Random) -> Request:
+    student_id, course_id = rng.choice(dataset.enrollments)
+    roll = rng.random()
+    if roll < 0.5:
+        roster = server.university.courses[course_id].students
+        present = [sid for sid in roster if rng.random() < 0.9]
+        day = rng.choice(dataset.session_dates).isoformat()
+        return ('record_attendance', 'POST', f"/courses/{course_id}/attendance",
+                {'date': day, 'present_student_ids': present})
+    if roll < 0.75:
+        return ('course_attendance', 'GET', f"/courses/{course_id}/attendance?last=5", None)
+    return ('student_attendance', 'GET', f"/students/{student_id}/attendance", None)
+
+
+def grade_day(dataset: Dataset, rng: random.Random) -> Request:
+    student_id, course_id = rng.choice(dataset.enrollments)
+    roll = rng.random()
+    if roll < 0.6:
+        return ('assign_grade', 'POST', f"/courses/{course_id}/grades/{student_id}",
+                {'grade': round(rng.uniform(40, 100), 1)})
+    if roll < 0.8:
+        return ('transcript', 'GET', f"/students/{student_id}/transcript", None)
+    if roll < 0.9:
+        return ('course_grade_stats', 'GET', f"/courses/{course_id}/grades/stats", None)
+    return ('top_students', 'GET', '/students/top?k=10', None)
+
+
+SCENARIOS: Dict[str, Callable[[Dataset, random.Random], Request]] = {
+    'registration_rush': registration_rush,
+    'attendance_hour': attendance_hour,
+    'grade_day': grade_day,
+}
+
+
+def run(scenario: str, dataset: Dataset, clients: int, requests: int, seed: int) -> dict:
+    make_request = SCENARIOS[scenario]
+    per_client = requests // clients
+    latencies: Dict[str, List[float]] = {}
+    statuses: Counter = Counter()
+    guard = threading.Lock()
+    start = threading.Barrier(clients + 1)
+
+    def client(client_seed: int):
+        rng = random.Random(client_seed)
+        # Requests are prepared up front so only the round trip is timed
+        batch = [make_request(dataset, rng) for _ in range(per_client)]
+        local: Dict[str, List[float]] = {}
+        local_statuses: Counter = Counter()
+        test_client = server.app.test_client()
+        start.wait()
+        for label, method, url, body in batch:
+            started = time.perf_counter()
+            response = test_client.open(url, method=method, json=body)
+            local.setdefault(label, []).append(time.perf_counter() - started)
+            local_statuses[response.status_code] += 1
+        with guard:
+            for label, samples in local.items():
+                latencies.setdefault(label, []).extend(samples)
+            statuses.update(local_statuses)
+
+    workers = [threading.Thread(target=client, args=(seed * 1000 + i,)) for i in range(clients)]
+    for thread in workers:
+        thread.start()
+    start.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    samples = [sample for values in latencies.values() for sample in values]
+    return {
+        'requests': len(samples),
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(len(samples) / elapsed),
+        **latency_summary(samples),
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'endpoints': {
+            label: {'requests': len(values), **latency_summary(values)}
+            for label, values in sorted(latencies.items())
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    scale_arguments(parser, students=20_000, courses=500)
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--requests', type=int, default=10_000, help="requests per scenario")
+    parser.add_argument('--clients', type=int, default=4)
+    output_argument(parser)
+    args = parser.parse_args()
+
+    dataset = populate_from_args(server.university, args)
+    results = {
+        scenario: run(scenario, dataset, args.clients, args.requests, args.seed)
+        for scenario in args.scenarios
+    }
+    report('load', vars(args), results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Measure bytes per student and bytes per enrollment.
+
+Memory is measured with tracemalloc around each phase, so the numbers cover
+everything the University allocates: entities, ID strings, indexes and
+enrollment sets or arrays.
+
+    python benchmarks/bench_memory.py --students 100000 --courses 4000 --enrollments 600000
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Course, Student, University
+
+
+def measure(students: int, courses: int, enrollments: int) -> dict:
+    rng = random.Random(7)
+    gc.collect()
+    tracemalloc.start()
+    university = University()
+    course_ids = [university.add_course(Course(f"Course {i}", students, "math", "beginner")) for i in range(courses)]
+    before_students = tracemalloc.get_traced_memory()[0]
+    student_ids = []
+    for i in range(students):
+        student = Student(f"Student {i}", {'email': f"student{i}@example.com", 'phone': '555-0100'})
+        student_ids.append(university.add_student(student))
+    after_students = tracemalloc.get_traced_memory()[0]
+    before_enrollments = after_students
+    # IDs arrive as fresh strings from request URLs, not as the entities' own objects
+    pairs = [(rng.choice(student_ids).encode().decode(), rng.choice(course_ids).encode().decode())
+             for _ in range(enrollments)]
+    enrolled = sum(university.enroll_student(student_id, course_id) for student_id, course_id in pairs)
+    del pairs
+    gc.collect()
+    after_enrollments = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return {
+        'bytes_per_student': round((after_students - before_students) / students),
+        'bytes_per_enrollment': round((after_enrollments - before_enrollments) / max(enrolled, 1)),
+        'enrollments': enrolled,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--students', type=int, default=100_000)
+    parser.add_argument('--courses', type=int, default=4_000)
+    parser.add_argument('--enrollments', type=int, default=600_000)
+    args = parser.parse_args()
+    print(json.dumps(measure(args.students, args.courses, args.enrollments), indent=2))
+
+
+if __name__ == '__main__':
+    main()
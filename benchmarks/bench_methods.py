@@ -0,0 +1,172 @@
+"""Time every public University method and the entities' to_dict on a synthetic dataset.
+
+Each case runs `--number` calls per repeat and reports the best repeat as
+microseconds per call, which is the most stable figure to compare between
+commits. Mutating cases work on their own entities so they do not skew
+the read cases. Public University methods without a case are listed under
+"uncovered", so new methods get noticed.
+
+    python benchmarks/bench_methods.py --output methods.json
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import University
+from datagen import make_course, make_student, make_teacher, populate_from_args, scale_arguments
+from results import output_argument, report
+
+
+def time_calls(call: Callable[[int], object], number: int, repeat: int) -> float:
+    """Best time per call, in seconds, of call(i) for i in range(number)"""
+    best = float('inf')
+    for r in range(repeat):
+        offset = r * number
+        started = time.perf_counter()
+        for i in range(offset, offset + number):
+            call(i)
+        best = min(best, (time.perf_counter() - started) / number)
+    return best
+
+
+def hold(context):
+    """Enter and leave a context manager, such as a lock"""
+    with context:
+        pass
+
+
+def build_cases(university: University, dataset, number: int, repeat: int, seed: int) -> Dict[str, Callable[[int], object]]:
+    rng = random.Random(seed)
+    total = number * repeat
+    pick = lambda ids: [rng.choice(ids) for _ in range(total)]
+    students, courses, teachers = pick(dataset.student_ids), pick(dataset.course_ids), pick(dataset.teacher_ids)
+    enrolled = [rng.choice(dataset.enrollments) for _ in range(total)]
+    day = dataset.session_dates[len(dataset.session_dates) // 2]
+    start, end = dataset.session_dates[0], dataset.session_dates[-1]
+
+    new_students = [make_student(1_000_000 + i, rng) for i in range(total)]
+    new_teachers = [make_teacher(1_000_000 + i, rng) for i in range(total)]
+    new_courses = [make_course(1_000_000 + i, rng, total) for i in range(total)]
+    batch_students = [[make_student(2_000_000 + i * 100 + j, rng) for j in range(100)] for i in range(total)]
+    batch_teachers = [[make_teacher(2_000_000 + i * 100 + j, rng) for j in range(100)] for i in range(total)]
+    batch_courses = [[make_course(2_000_000 + i * 100 + j, rng, 1) for j in range(100)] for i in range(total)]
+
+    # A course of its own for the enroll/withdraw cycle, so the read cases keep their rosters
+    sandbox = university.add_course(make_course(3_000_000, rng, total * 2))
+    sandbox_students = university.add_students([make_student(3_000_000 + i, rng) for i in range(total)])
+    sandbox_pairs = [[(student_id, sandbox)] for student_id in sandbox_students]
+    cycle = itertools.cycle(sandbox_students)
+    # A full course, so every enroll_or_waitlist call queues
+    full = university.add_course(make_course(3_000_001, rng, 1))
+    university.enroll_student(dataset.student_ids[0], full)
+    # Entities to delete, each with a few links so deletion has something to clean up
+    doomed_course = university.add_course(make_course(4_000_000, rng, total))
+    doomed_students = university.add_students([make_student(4_000_000 + i, rng) for i in range(total)])
+    for student_id in doomed_students:
+        university.enroll_student(student_id, doomed_course)
+        university.assign_grade(doomed_course, student_id, 70)
+    doomed_teachers = university.add_teachers([make_teacher(4_000_000 + i, rng) for i in range(total)])
+    doomed_courses = university.add_courses([make_course(4_100_000 + i, rng, 10) for i in range(total)])
+    for i, course_id in enumerate(doomed_courses):
+        university.assign_teacher(doomed_teachers[i], course_id)
+        university.enroll_student(sandbox_students[i], course_id)
+    full_requests = [[(sandbox_students[(i * 10 + j) % total], j % 3) for j in range(10)] for i in range(total)]
+    emails = [f"student{rng.randrange(len(dataset.student_ids))}@example.edu" for _ in range(total)]
+    prefixes = [rng.choice(('Ada', 'Gr', 'Li', 'Marg')) for _ in range(total)]
+
+    return {
+        'add_student': lambda i: university.add_student(new_students[i]),
+        'add_teacher': lambda i: university.add_teacher(new_teachers[i]),
+        'add_course': lambda i: university.add_course(new_courses[i]),
+        'add_students[100]': lambda i: university.add_students(batch_students[i]),
+        'add_teachers[100]': lambda i: university.add_teachers(batch_teachers[i]),
+        'add_courses[100]': lambda i: university.add_courses(batch_courses[i]),
+        'remove_student': lambda i: university.remove_student(doomed_students[i]),
+        'remove_teacher': lambda i: university.remove_teacher(doomed_teachers[i]),
+        'remove_course': lambda i: university.remove_course(doomed_courses[i]),
+        'enroll_student': lambda i: university.enroll_student(next(cycle), sandbox),
+        'withdraw_student': lambda i: university.withdraw_student(next(cycle), sandbox),
+        'enroll_batch': lambda i: university.enroll_batch(sandbox_pairs[i]),
+        'enroll_or_waitlist': lambda i: university.enroll_or_waitlist(sandbox_students[i], full, i % 3),
+        'enroll_requests[10]': lambda i: university.enroll_requests(full, full_requests[i]),
+        'get_waitlist_position': lambda i: university.get_waitlist_position(sandbox_students[i], full),
+        'get_student_waitlists': lambda i: university.get_student_waitlists(sandbox_students[i]),
+        'get_waitlist': lambda i: university.get_waitlist(full),
+        'leave_waitlist': lambda i: university.leave_waitlist(sandbox_students[i], full),
+        'set_student_priority': lambda i: university.set_student_priority(students[i], i % 3),
+        'course_locked': lambda i: hold(university.course_locked(courses[i])),
+        'assign_teacher': lambda i: university.assign_teacher(teachers[i], courses[i]),
+        'record_attendance': lambda i: university.record_attendance(
+            enrolled[i][1], day, set(university.courses[enrolled[i][1]].students)),
+        'assign_grade': lambda i: university.assign_grade(enrolled[i][1], enrolled[i][0], 50 + i % 50),
+        # A whole class per call: every enrolled student of the course, and a week of sessions
+        'assign_grades': lambda i: university.assign_grades(
+            courses[i], {student_id: 50 + i % 50 for student_id in university.courses[courses[i]].students}),
+        'record_attendance_sheet': lambda i: university.record_attendance_sheet(
+            courses[i], {session: list(university.courses[courses[i]].students) for session in dataset.session_dates[:5]}),
+        'get_course_roster': lambda i: university.get_course_roster(courses[i]),
+        'get_teacher_courses': lambda i: university.get_teacher_courses(teachers[i]),
+        'get_student_courses': lambda i: university.get_student_courses(students[i]),
+        'get_course_attendance': lambda i: university.get_course_attendance(courses[i], start, end),
+        'get_student_attendance': lambda i: university.get_student_attendance(students[i]),
+        'get_attendance_stats': lambda i: university.get_attendance_stats(courses[i], 75),
+        'get_course_grades': lambda i: university.get_course_grades(courses[i]),
+        'get_course_grade_stats': lambda i: university.get_course_grade_stats(courses[i]),
+        'get_grade_report': lambda i: university.get_grade_report(),
+        'snapshot': lambda i: university.snapshot().close(),
+        'snapshot_stats': lambda i: university.snapshot_stats(),
+        'get_student_grades': lambda i: university.get_student_grades(students[i]),
+        'get_transcript': lambda i: university.get_transcript(students[i]),
+        'get_top_students': lambda i: university.get_top_students(10),
+        'iter_entities[courses]': lambda i: sum(1 for _ in university.iter_entities('courses')),
+        'page': lambda i: university.page('students', 100, students[i]),
+        'version': lambda i: university.version('students', students[i]),
+        'changes.since[100]': lambda i: university.changes.since(max(0, university.changes.latest - 100), 100),
+        'find_students': lambda i: university.find_students(email=emails[i]),
+        'find_teachers': lambda i: university.find_teachers(name_prefix=prefixes[i]),
+        'find_courses': lambda i: university.find_courses(course_type='math', difficulty_level='advanced'),
+        'checkpoint': lambda i: university.checkpoint(),
+        'close': lambda i: university.close(),
+        'Student.to_dict': lambda i: university.students[students[i]].to_dict(),
+        'Teacher.to_dict': lambda i: university.teachers[teachers[i]].to_dict(),
+        'Course.to_dict': lambda i: university.courses[courses[i]].to_dict(),
+    }
+
+
+def public_methods() -> List[str]:
+    return sorted(
+        name for name, value in vars(University).items()
+        if not name.startswith('_') and callable(value) and not isinstance(value, classmethod)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    scale_arguments(parser, students=20_000, courses=500)
+    parser.add_argument('--number', type=int, default=200, help="calls per repeat")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', nargs='*', help="run only these cases")
+    output_argument(parser)
+    args = parser.parse_args()
+
+    university = University()
+    dataset = populate_from_args(university, args)
+    cases = build_cases(university, dataset, args.number, args.repeat, args.seed)
+    timings = {}
+    for name, call in cases.items():
+        if args.only and name not in args.only:
+            continue
+        timings[name] = {'us_per_call': round(time_calls(call, args.number, args.repeat) * 1e6, 3)}
+    covered = {name.split('[')[0] for name in cases}
+    uncovered = [name for name in public_methods() if name not in covered]
+    report('methods', vars(args), {'cases': timings, 'uncovered': uncovered}, args.output)
+
+
+if __name__ == '__main__':
+    main()
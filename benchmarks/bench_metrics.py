@@ -0,0 +1,101 @@
+"""Measure what the metrics layer costs per request and per University method call.
+
+Requests go through the Flask test client with metrics enabled and then
+disabled, alternating several rounds and keeping the best time of each, on
+a cheap cached endpoint (where relative overhead is largest) and on an
+enrollment. Whole requests are noisy at this scale, so the cost of the
+bookkeeping alone is reported too. Method timers are measured the same
+way on a cheap University method.
+
+    python benchmarks/bench_metrics.py --requests 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as server
+from metrics import create_metrics, instrument_university
+from models import University
+from datagen import populate_from_args, scale_arguments
+from results import output_argument, report
+
+
+def best_per_call(call, number: int, rounds: int) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for i in range(number):
+            call(i)
+        best = min(best, (time.perf_counter() - started) / number)
+    return best
+
+
+def compare(call, number: int, rounds: int, toggle) -> dict:
+    """Best time per call with the instrumentation on and off, in microseconds"""
+    timings = {True: float('inf'), False: float('inf')}
+    for _ in range(rounds):
+        for enabled in (True, False):
+            toggle(enabled)
+            timings[enabled] = min(timings[enabled], best_per_call(call, number, 1))
+    toggle(True)
+    on, off = timings[True] * 1e6, timings[False] * 1e6
+    return {
+        'enabled_us': round(on, 3),
+        'disabled_us': round(off, 3),
+        'overhead_us': round(on - off, 3),
+        'overhead_percent': round(100 * (on - off) / off, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    scale_arguments(parser, students=2_000, courses=100)
+    parser.add_argument('--requests', type=int, default=5_000, help="requests per round")
+    parser.add_argument('--calls', type=int, default=200_000, help="method calls per round")
+    parser.add_argument('--rounds', type=int, default=5)
+    output_argument(parser)
+    args = parser.parse_args()
+
+    dataset = populate_from_args(server.university, args)
+    rng = random.Random(args.seed)
+    client = server.app.test_client()
+    students = [rng.choice(dataset.student_ids) for _ in range(args.requests)]
+    courses = [rng.choice(dataset.course_ids) for _ in range(args.requests)]
+
+    def toggle_requests(enabled: bool):
+        server.metrics.enabled = enabled
+
+    results = {
+        'get_student': compare(lambda i: client.get(f"/students/{students[i]}"),
+                               args.requests, args.rounds, toggle_requests),
+        # Alternate enroll and withdraw so the course never fills up
+        'enroll_withdraw': compare(
+            lambda i: client.open(f"/courses/{courses[i]}/students/{students[i]}",
+                                  method='POST' if i % 2 == 0 else 'DELETE'),
+            args.requests, args.rounds, toggle_requests),
+    }
+
+    metrics = create_metrics()
+    timed = University()
+    student_id = timed.add_student(server.university.students[dataset.student_ids[0]])
+    instrument_university(timed, metrics, ['version'])
+
+    def toggle_timers(enabled: bool):
+        metrics.enabled = enabled
+
+    results['method_timer'] = compare(lambda i: timed.version('students', student_id),
+                                      args.calls, args.rounds, toggle_timers)
+    # The bookkeeping a request pays, without the noise of a whole request around it
+    results['observe_request_us'] = round(best_per_call(
+        lambda i: metrics.observe_request('GET', '/students/<student_id>', 200, 0.0002, 120),
+        args.calls, args.rounds) * 1e6, 3)
+    results['scrape_ms'] = round(best_per_call(lambda i: client.get('/metrics'), 20, 1) * 1000, 3)
+    report('metrics', vars(args), results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Measure University startup time from a snapshot plus journal tail.
+
+Writes `--records` mutations (students, courses and enrollments) through a
+FileStorage, closes it, then reopens the directory and reports how long the
+snapshot load and the journal replay took. Because a snapshot is taken every
+`--snapshot-every` records, the replayed tail never exceeds that bound.
+
+    python benchmarks/bench_recovery.py --records 1000000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Course, FileStorage, Student, University
+
+
+def populate(university: University, records: int, courses_count: int):
+    course_ids = []
+    for i in range(courses_count):
+        course_ids.append(university.add_course(Course(f"Course {i}", 10_000, "math", "beginner")))
+    written = courses_count
+    student_ids = []
+    rng = random.Random(42)
+    while written < records:
+        if not student_ids or rng.random() < 0.2:
+            student = Student(f"Student {written}", {'email': f"s{written}@example.com", 'phone': '555'})
+            student_ids.append(university.add_student(student))
+        else:
+            university.enroll_student(rng.choice(student_ids), rng.choice(course_ids))
+        written += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, default=1_000_000)
+    parser.add_argument('--courses', type=int, default=1_000)
+    parser.add_argument('--snapshot-every', type=int, default=100_000)
+    parser.add_argument('--max-seconds', type=float, default=None,
+                        help="exit with status 1 if startup takes longer than this")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='university-bench-')
+    try:
+        university = University.open(FileStorage(directory, snapshot_every=args.snapshot_every))
+        started = time.perf_counter()
+        populate(university, args.records, args.courses)
+        university.close()
+        write_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        reopened = University.open(FileStorage(directory, snapshot_every=args.snapshot_every))
+        startup_seconds = time.perf_counter() - started
+        reopened.close()
+
+        results = {
+            'records': args.records,
+            'snapshot_every': args.snapshot_every,
+            'write_seconds': round(write_seconds, 3),
+            'writes_per_second': round(args.records / write_seconds),
+            'startup_seconds': round(startup_seconds, 3),
+            **{key: round(value, 3) for key, value in reopened.recovery_stats.items()},
+            'students': len(reopened.students),
+            'courses': len(reopened.courses),
+        }
+        print(json.dumps(results, indent=2))
+        if args.max_seconds is not None and startup_seconds > args.max_seconds:
+            sys.exit(1)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Measure the CPU cost of list endpoints while the data keeps changing.
+
+Between two listings one enrollment changes one course and one student,
+so every listing misses the response cache. Each case reports the time to
+build the body of a full `GET /courses` and `GET /students` listing:
+"encode" serializes every entity from scratch (what the endpoints did
+before fragment caching), "fragments" joins per-entity JSON fragments and
+re-encodes only the changed entities.
+
+    python benchmarks/bench_serialization.py --courses 200 --students 20000 --per-student 5
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as server
+from cache import orjson
+from datagen import populate_from_args, scale_arguments
+from results import output_argument, report
+
+
+def best_ms(call, rounds: int) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        started = time.perf_counter()
+        call()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    scale_arguments(parser, students=20_000, courses=200, per_student=5, sessions=0)
+    parser.add_argument('--rounds', type=int, default=10)
+    output_argument(parser)
+    args = parser.parse_args()
+
+    university = server.university
+    dataset = populate_from_args(university, args)
+    rng = random.Random(args.seed)
+    client = server.app.test_client()
+
+    def change_one():
+        student_id, course_id = rng.choice(dataset.enrollments)
+        university.withdraw_student(student_id, course_id)
+        university.enroll_student(student_id, course_id)
+
+    results = {'orjson': orjson is not None}
+    for collection in ('courses', 'students'):
+        entities = lambda: university.iter_entities(collection)
+
+        def encode():
+            change_one()
+            server.app.json.dumps({collection: [entity.to_dict() for entity in entities()]}).encode()
+
+        def fragments():
+            change_one()
+            server.entity_list(collection, entities())
+
+        def request():
+            change_one()
+            client.get(f"/{collection}")
+
+        fragments()  # Warm the fragment cache, as a running server would be
+        body = client.get(f"/{collection}").data
+        if json.loads(body) != json.loads(server.app.json.dumps({collection: [e.to_dict() for e in entities()]})):
+            sys.exit(f"fragment listing of {collection} differs from a fresh encoding")
+        results[collection] = {
+            'entities': len(getattr(university, collection)),
+            'bytes': len(body),
+            'encode_ms': best_ms(encode, args.rounds),
+            'fragments_ms': best_ms(fragments, args.rounds),
+            'request_ms': best_ms(request, args.rounds),
+        }
+        results[collection]['speedup'] = round(
+            results[collection]['encode_ms'] / results[collection]['fragments_ms'], 1)
+    report('serialization', vars(args), results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""Measure what a long-running report costs concurrent writers, with and without snapshots.
+
+Writer threads grade, enroll and withdraw at random while one reader
+streams the attendance export over and over, in four modes:
+
+  none      writers alone, as a baseline
+  live      the export reads the live objects (fast, but not a consistent dump)
+  snapshot  the export runs on University.snapshot()
+  deepcopy  the reader pauses writers, deep-copies the collections and exports the copy
+
+Write throughput and latency are reported per mode. Memory is measured
+separately (tracing slows Python down): what a snapshot keeps alive after
+`--traced-writes` writes, against one deep copy of the dataset.
+
+    python benchmarks/bench_snapshot.py --students 20000 --courses 200 --seconds 5
+"""
+import argparse
+import copy
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from export import attendance_rows, iter_csv, iter_export
+from models import University
+from datagen import populate_from_args, scale_arguments
+from results import latency_summary, output_argument, report
+
+MODES = ('none', 'live', 'snapshot', 'deepcopy')
+COLUMNS = ('course_id', 'date', 'student_id')
+
+
+def write(university: University, dataset, rng: random.Random):
+    student_id, course_id = rng.choice(dataset.student_ids), rng.choice(dataset.course_ids)
+    roll = rng.random()
+    if roll < 0.5:
+        university.assign_grade(course_id, student_id, rng.uniform(0, 100))
+    elif roll < 0.8:
+        university.enroll_student(student_id, course_id)
+    else:
+        university.withdraw_student(student_id, course_id)
+
+
+def deepcopy_export(university: University) -> int:
+    with university._world.exclusive():
+        courses = copy.deepcopy(list(university.courses.values()))
+    return sum(len(chunk) for chunk in iter_csv(COLUMNS, attendance_rows(None, courses)))
+
+
+def run(university: University, dataset, mode: str, threads: int, seconds: float, seed: int) -> dict:
+    stop = threading.Event()
+    latencies = [[] for _ in range(threads)]
+    exports = []
+
+    def writer(index: int):
+        rng = random.Random(seed + index)
+        samples = latencies[index]
+        while not stop.is_set():
+            started = time.perf_counter()
+            write(university, dataset, rng)
+            samples.append(time.perf_counter() - started)
+
+    def reader():
+        while not stop.is_set():
+            started = time.perf_counter()
+            if mode == 'deepcopy':
+                deepcopy_export(university)
+            else:
+                sum(len(chunk) for chunk in iter_export(university, 'attendance', snapshot=mode == 'snapshot'))
+            exports.append(time.perf_counter() - started)
+
+    workers = [threading.Thread(target=writer, args=(i,)) for i in range(threads)]
+    if mode != 'none':
+        workers.append(threading.Thread(target=reader))
+    for thread in workers:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in workers:
+        thread.join()
+    samples = [sample for thread_samples in latencies for sample in thread_samples]
+    return {
+        'writes': len(samples),
+        'writes_per_second': round(len(samples) / seconds),
+        'write_latency': latency_summary(samples),
+        'exports': len(exports),
+        'export_seconds': round(sum(exports) / len(exports), 3) if exports else None,
+    }
+
+
+def traced_kib(call) -> float:
+    """Memory still allocated after `call`, beyond what was allocated before it"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = call()
+        after = tracemalloc.get_traced_memory()[0]
+        del kept
+        return round((after - before) / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+
+def memory(university: University, dataset, writes: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    views = []
+
+    def snapshot_and_write():
+        view = university.snapshot()
+        views.append(view)
+        for _ in range(writes):
+            write(university, dataset, rng)
+        return view
+
+    snapshot_kib = traced_kib(snapshot_and_write)
+    view = views.pop()
+    preserved = view.stats()['preserved']
+    view.close()
+    return {
+        'writes': writes,
+        'snapshot_kib': snapshot_kib,
+        'preserved': preserved,
+        'deepcopy_kib': traced_kib(lambda: copy.deepcopy(
+            (list(university.students.values()), list(university.teachers.values()), list(university.courses.values())))),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    scale_arguments(parser, students=20_000, courses=200, per_student=5, sessions=10)
+    parser.add_argument('--threads', type=int, default=2, help="writer threads")
+    parser.add_argument('--seconds', type=float, default=3.0, help="duration of each mode")
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--traced-writes', type=int, default=2000, help="writes made while memory is traced")
+    output_argument(parser)
+    args = parser.parse_args()
+
+    university = University()
+    dataset = populate_from_args(university, args)
+    results = {mode: run(university, dataset, mode, args.threads, args.seconds, args.seed) for mode in args.modes}
+    results['memory'] = memory(university, dataset, args.traced_writes, args.seed)
+    report('snapshot', vars(args), results, args.output)
+
+
+if __name__ == '__main__':
+    main()
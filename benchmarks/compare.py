@@ -0,0 +1,77 @@
+"""Compare two saved benchmark results and flag regressions.
+
+Walks both documents and pairs up every numeric figure whose name says
+which way is better: timings and latencies (`*_ms`, `us_per_call`,
+`seconds`) should go down, throughputs (`*_per_second`) should go up.
+Exits with status 1 if any figure got worse by more than `--threshold`.
+
+    python benchmarks/compare.py before.json after.json --threshold 0.10
+"""
+import argparse
+import json
+import sys
+from typing import Dict, Iterator, Tuple
+
+LOWER_IS_BETTER = ('_ms', 'us_per_call', 'seconds')
+HIGHER_IS_BETTER = ('_per_second',)
+
+
+def figures(node, path: str = '') -> Iterator[Tuple[str, float]]:
+    if isinstance(node, dict):
+        for key, value in node.items():
+            yield from figures(value, f"{path}.{key}" if path else key)
+    elif isinstance(node, (int, float)) and not isinstance(node, bool):
+        yield path, node
+
+
+def direction(path: str) -> int:
+    """1 if a larger value is better, -1 if smaller is better, 0 if the figure is not comparable"""
+    name = path.rsplit('.', 1)[-1]
+    if name.endswith(HIGHER_IS_BETTER):
+        return 1
+    if name.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare(before: Dict, after: Dict, threshold: float) -> Dict:
+    old = dict(figures(before['results']))
+    changes, regressions = {}, []
+    for path, new_value in figures(after['results']):
+        better = direction(path)
+        old_value = old.get(path)
+        if not better or not old_value:
+            continue
+        change = (new_value - old_value) / old_value
+        changes[path] = {'before': old_value, 'after': new_value, 'change': round(change, 4)}
+        if change * better < -threshold:
+            regressions.append(path)
+    return {
+        'before': before.get('commit'),
+        'after': after.get('commit'),
+        'threshold': threshold,
+        'regressions': regressions,
+        'changes': changes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=0.10, help="tolerated relative slowdown")
+    args = parser.parse_args()
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    if before.get('benchmark') != after.get('benchmark'):
+        sys.exit(f"cannot compare {before.get('benchmark')} results with {after.get('benchmark')} results")
+    result = compare(before, after, args.threshold)
+    print(json.dumps(result, indent=2))
+    if result['regressions']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""Generate a synthetic university at a configurable scale.
+
+Used as a library by the other benchmarks (`populate` fills a University,
+`scale_arguments` adds the matching command-line options), or on its own to
+report how long generating and loading a dataset takes. The same seed
+always produces the same dataset.
+
+    python benchmarks/datagen.py --students 100000 --courses 2000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from typing import Dict, List, NamedTuple, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Course, Student, Teacher, University
+
+COURSE_TYPES = ('math', 'science', 'history', 'language', 'arts')
+DIFFICULTY_LEVELS = ('beginner', 'intermediate', 'advanced')
+SPECIALIZATIONS = ('algebra', 'physics', 'biology', 'literature', 'music', 'painting', 'statistics')
+FIRST_NAMES = ('Ada', 'Alan', 'Barbara', 'Claude', 'Edsger', 'Grace', 'Ken', 'Linus', 'Margaret', 'Niklaus')
+LAST_NAMES = ('Lovelace', 'Turing', 'Liskov', 'Shannon', 'Dijkstra', 'Hopper', 'Thompson', 'Torvalds', 'Hamilton', 'Wirth')
+TERM_START = date(2024, 9, 2)
+
+
+class Dataset(NamedTuple):
+    """IDs of everything populate() created"""
+    student_ids: List[str]
+    teacher_ids: List[str]
+    course_ids: List[str]
+    enrollments: List[Tuple[str, str]]
+    session_dates: List[date]
+
+
+def scale_arguments(parser: argparse.ArgumentParser, students: int = 10_000, teachers: int = 200,
+                    courses: int = 500, per_student: int = 4, sessions: int = 10):
+    """Add the dataset size options, with defaults suited to the calling benchmark"""
+    parser.add_argument('--students', type=int, default=students)
+    parser.add_argument('--teachers', type=int, default=teachers)
+    parser.add_argument('--courses', type=int, default=courses)
+    parser.add_argument('--per-student', type=int, default=per_student, help="enrollments per student")
+    parser.add_argument('--sessions', type=int, default=sessions, help="attendance sessions per course")
+    parser.add_argument('--graded', type=float, default=0.8, help="fraction of enrollments with a grade")
+    parser.add_argument('--seed', type=int, default=42)
+
+
+def make_student(i: int, rng: random.Random) -> Student:
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}"
+    return Student(name, {'email': f"student{i}@example.edu", 'phone': f"555-{i:07d}"})
+
+
+def make_teacher(i: int, rng: random.Random) -> Teacher:
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}"
+    specializations = rng.sample(SPECIALIZATIONS, rng.randint(1, 3))
+    return Teacher(name, {'email': f"teacher{i}@example.edu", 'phone': f"556-{i:07d}"}, specializations)
+
+
+def make_course(i: int, rng: random.Random, capacity: int) -> Course:
+    return Course(f"Course {i}", capacity, rng.choice(COURSE_TYPES), rng.choice(DIFFICULTY_LEVELS),
+                  {f"book {rng.randint(1, 50)}"})
+
+
+def session_dates(sessions: int) -> List[date]:
+    """Weekly sessions from the start of the term"""
+    return [TERM_START + timedelta(weeks=week) for week in range(sessions)]
+
+
+def populate(university: University, students: int, teachers: int, courses: int, per_student: int,
+             sessions: int, graded: float, seed: int) -> Dataset:
+    """Fill a University with entities, enrollments, attendance and grades"""
+    rng = random.Random(seed)
+    # Room for the expected enrollments plus some slack, so a few popular courses still fill up
+    capacity = max(1, students * per_student // max(courses, 1) * 5 // 4)
+    student_ids = university.add_students([make_student(i, rng) for i in range(students)])
+    teacher_ids = university.add_teachers([make_teacher(i, rng) for i in range(teachers)])
+    course_ids = university.add_courses([make_course(i, rng, capacity) for i in range(courses)])
+
+    for i, course_id in enumerate(course_ids):
+        if teacher_ids:
+            university.assign_teacher(teacher_ids[i % len(teacher_ids)], course_id)
+
+    enrollments = []
+    for student_id in student_ids:
+        for course_id in rng.sample(course_ids, min(per_student, len(course_ids))):
+            if university.enroll_student(student_id, course_id):
+                enrollments.append((student_id, course_id))
+
+    days = session_dates(sessions)
+    rosters: Dict[str, List[str]] = {}
+    for student_id, course_id in enrollments:
+        rosters.setdefault(course_id, []).append(student_id)
+    for course_id, roster in rosters.items():
+        for day in days:
+            present = {student_id for student_id in roster if rng.random() < 0.85}
+            university.record_attendance(course_id, day, present)
+    for student_id, course_id in enrollments:
+        if rng.random() < graded:
+            university.assign_grade(course_id, student_id, round(rng.gauss(75, 12), 1))
+    return Dataset(student_ids, teacher_ids, course_ids, enrollments, days)
+
+
+def populate_from_args(university: University, args: argparse.Namespace) -> Dataset:
+    return populate(university, args.students, args.teachers, args.courses, args.per_student,
+                    args.sessions, args.graded, args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    scale_arguments(parser)
+    args = parser.parse_args()
+    started = time.perf_counter()
+    university = University()
+    dataset = populate_from_args(university, args)
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        'students': len(dataset.student_ids),
+        'teachers': len(dataset.teacher_ids),
+        'courses': len(dataset.course_ids),
+        'enrollments': len(dataset.enrollments),
+        'sessions': len(dataset.session_dates) * len({course_id for _, course_id in dataset.enrollments}),
+        'grades': sum(len(student.grades) for student in university.students.values()),
+        'seconds': round(elapsed, 3),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Shared helpers for saving benchmark results in a comparable form."""
+import json
+import os
+import platform
+import subprocess
+import time
+from typing import Dict, List, Optional, Sequence
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def percentile(sorted_samples: Sequence[float], percent: float) -> float:
+    """Nearest-rank percentile of already sorted samples"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(0, min(len(sorted_samples) - 1, round(percent / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[rank]
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    """p50/p90/p99/max in milliseconds of samples given in seconds"""
+    samples = sorted(samples)
+    return {
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p90_ms': round(percentile(samples, 90) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        'max_ms': round(samples[-1] * 1000, 3) if samples else 0.0,
+    }
+
+
+def report(benchmark: str, parameters: Dict, results, output: Optional[str] = None):
+    """Print results as JSON with enough context to compare runs, and save them if asked"""
+    document = {
+        'benchmark': benchmark,
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'parameters': parameters,
+        'results': results,
+    }
+    text = json.dumps(document, indent=2)
+    print(text)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text + '\n')
+    return document
+
+
+def output_argument(parser):
+    parser.add_argument('--output', help="also write the results to this JSON file")
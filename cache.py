@@ -0,0 +1,125 @@
+import hashlib
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Tuple
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the standard library encoder is used without it
+    orjson = None
+
+
+def dumps(value: Any) -> bytes:
+    """Encode a value as compact JSON with sorted keys, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(value, sort_keys=True, separators=(',', ':')).encode()
+
+
+class ResponseCache:
+    """LRU cache of serialized response bodies, keyed on a data version.
+
+    An entry is reused only while the version it was built for is still the
+    current one, so a mutation invalidates it without any explicit purge.
+    ETags combine a per-process token with the key and version, so tags
+    handed out before a restart never match afterwards.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, Tuple[int, str, bytes]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._token = uuid.uuid4().hex[:8]
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.bytes_saved = 0  # Bytes neither re-serialized (hits) nor sent (304s)
+
+    def etag(self, key: Hashable, version: int) -> str:
+        digest = hashlib.blake2s(repr(key).encode(), digest_size=6).hexdigest()
+        return f"{self._token}-{digest}-{version}"
+
+    def get_or_build(self, key: Hashable, version: int, build: Callable[[], bytes]) -> Tuple[str, bytes]:
+        """Return (etag, body) for the key at this version, serializing only on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.bytes_saved += len(entry[2])
+                return entry[1], entry[2]
+            self.misses += 1
+        # Built outside the lock so slow serializations don't block other readers
+        body = build()
+        etag = self.etag(key, version)
+        with self._lock:
+            self._entries[key] = (version, etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return etag, body
+
+    def record_not_modified(self, key: Hashable):
+        """Count a 304, crediting the size of the body that was not sent"""
+        with self._lock:
+            self.not_modified += 1
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.bytes_saved += len(entry[2])
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'not_modified': self.not_modified,
+                'bytes_saved': self.bytes_saved,
+            }
+
+
+class FragmentCache:
+    """Serialized JSON of each entity, rebuilt only when that entity's version changes.
+
+    List responses are assembled by joining these byte fragments, so a
+    listing re-encodes only the entities that changed since the last one.
+    Entries are keyed by entity ID (UUIDs are unique across collections) and
+    hold one fragment per entity, so the cache is as large as the data set.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[int, bytes]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def fragment(self, entity, version: int) -> bytes:
+        entry = self._entries.get(entity.id)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        # The version is read before serializing, so a concurrent change only causes a rebuild next time
+        body = dumps(entity.to_dict())
+        self._entries[entity.id] = (version, body)
+        return body
+
+    def array(self, entities: Iterable, version_of: Callable[[str], int]) -> bytes:
+        """A JSON array of the entities' fragments"""
+        fragment = self.fragment
+        return b'[' + b','.join([fragment(entity, version_of(entity.id)) for entity in entities]) + b']'
+
+    def discard(self, entity_id: str):
+        self._entries.pop(entity_id, None)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
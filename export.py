@@ -0,0 +1,193 @@
+"""Stream registrar dumps of enrollments, grades and attendance as CSV or Parquet.
+
+Rows are produced by generators that walk one course at a time, so memory
+stays bounded by the largest course rather than the whole dataset. They
+accept a University or a University snapshot (see iter_export). Also
+usable from the command line against a data directory:
+
+    python export.py grades --data-dir ./data --output grades.csv
+    python export.py attendance --data-dir ./data --format parquet --output attendance.parquet
+"""
+import argparse
+import csv
+import io
+import sys
+from typing import Callable, Dict, IO, Iterable, Iterator, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional; CSV always works
+    pa = pq = None
+
+CSV_CHUNK_ROWS = 1000
+PARQUET_CHUNK_ROWS = 65536  # Rows per Parquet row group
+FORMATS = ('csv', 'parquet')
+
+Row = Tuple
+
+
+def enrollment_rows(university, courses: Optional[Iterable] = None) -> Iterator[Row]:
+    """One row per enrolled student: course, then student"""
+    students = university.students
+    for course in _courses(university, courses):
+        for student_id in list(course.students):
+            student = students.get(student_id)
+            if student is not None:
+                yield (course.id, course.name, student.id, student.name, student.contact_info.get('email', ''))
+
+
+def grade_rows(university, courses: Optional[Iterable] = None) -> Iterator[Row]:
+    """One row per grade: course, student, grade"""
+    for course in _courses(university, courses):
+        for student_id, grade in course.grades.copy().items():
+            yield (course.id, student_id, grade)
+
+
+def attendance_rows(university, courses: Optional[Iterable] = None) -> Iterator[Row]:
+    """One row per student present at a session: course, date, student"""
+    for course in _courses(university, courses):
+        for day in course.sessions_between():
+            present = course.present_students(day) or set()
+            iso_day = day.isoformat()
+            for student_id in sorted(present):
+                yield (course.id, iso_day, student_id)
+
+
+def _courses(university, courses: Optional[Iterable]) -> Iterable:
+    """The given courses, or every course in listing order"""
+    return university.iter_entities('courses') if courses is None else courses
+
+
+# Export name to (column names, row generator)
+EXPORTS: Dict[str, Tuple[Tuple[str, ...], Callable[..., Iterator[Row]]]] = {
+    'enrollments': (('course_id', 'course_name', 'student_id', 'student_name', 'student_email'), enrollment_rows),
+    'grades': (('course_id', 'student_id', 'grade'), grade_rows),
+    'attendance': (('course_id', 'date', 'student_id'), attendance_rows),
+}
+MIMETYPES = {'csv': 'text/csv', 'parquet': 'application/vnd.apache.parquet'}
+
+
+def iter_csv(columns: Tuple[str, ...], rows: Iterable[Row], chunk_rows: int = CSV_CHUNK_ROWS) -> Iterator[bytes]:
+    """Encode rows as CSV with a header, yielding one chunk of bytes every `chunk_rows` rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode('utf-8')
+
+
+class _Drain(io.RawIOBase):
+    """Write-only stream that hands back what was written since the last `take`"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def take(self) -> bytes:
+        data, self._chunks = b''.join(self._chunks), []
+        return data
+
+
+def iter_parquet(columns: Tuple[str, ...], rows: Iterable[Row], chunk_rows: int = PARQUET_CHUNK_ROWS) -> Iterator[bytes]:
+    """Encode rows as a Parquet file, one row group per `chunk_rows` rows, yielding bytes as each group is written"""
+    if pa is None:
+        raise RuntimeError("Parquet export needs pyarrow")
+    schema = pa.schema([(name, pa.float64() if name == 'grade' else pa.string()) for name in columns])
+    drain = _Drain()
+    with pq.ParquetWriter(drain, schema) as writer:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunk_rows:
+                writer.write_table(_table(schema, batch))
+                batch = []
+                yield drain.take()
+        if batch:
+            writer.write_table(_table(schema, batch))
+    # Closing the writer adds the footer
+    yield drain.take()
+
+
+def _table(schema, batch) -> 'pa.Table':
+    return pa.Table.from_arrays([pa.array(column, type=field.type) for column, field in zip(zip(*batch), schema)],
+                                schema=schema)
+
+
+def iter_export(university, name: str, fmt: str = 'csv', snapshot: bool = False) -> Iterator[bytes]:
+    """The chunks of one export in one format; raises ValueError for unknown names and formats.
+
+    With `snapshot`, rows come from a University snapshot taken when the
+    first chunk is requested and closed after the last one, so the dump is
+    consistent even while writes go on.
+    """
+    if name not in EXPORTS:
+        raise ValueError(f"Unknown export: {name} (expected one of {', '.join(EXPORTS)})")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt} (expected one of {', '.join(FORMATS)})")
+    if fmt == 'parquet' and pa is None:
+        raise ValueError("Parquet export needs pyarrow, which is not installed")
+    columns, rows = EXPORTS[name]
+    encode = iter_parquet if fmt == 'parquet' else iter_csv
+    if snapshot:
+        return _iter_snapshot(university, columns, rows, encode)
+    return encode(columns, rows(university))
+
+
+def _iter_snapshot(university, columns, rows, encode) -> Iterator[bytes]:
+    # Taken lazily, so a response that is never iterated leaves no snapshot open
+    with university.snapshot() as view:
+        yield from encode(columns, rows(view))
+
+
+def write_export(university, name: str, fmt: str, output: IO[bytes]) -> int:
+    """Write one export to a binary file and return the number of bytes written"""
+    written = 0
+    for chunk in iter_export(university, name, fmt):
+        output.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export enrollments, grades or attendance from a data directory")
+    parser.add_argument('export', choices=sorted(EXPORTS))
+    parser.add_argument('--data-dir', required=True, help="directory written by the app with UNIVERSITY_DATA_DIR")
+    parser.add_argument('--format', choices=FORMATS, default='csv')
+    parser.add_argument('--output', default='-', help="file to write, or - for standard output")
+    args = parser.parse_args()
+
+    from models import FileStorage, University
+    university = University.open(FileStorage(args.data_dir))
+    try:
+        if args.output == '-':
+            write_export(university, args.export, args.format, sys.stdout.buffer)
+        else:
+            with open(args.output, 'wb') as output:
+                write_export(university, args.export, args.format, output)
+    finally:
+        university.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+import csv
+import io
+import json
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Tuple
+from models import Course, Student, Teacher
+
+BATCH_SIZE = 1000
+CSV_LIST_SEPARATOR = ';'  # Separates specializations / materials inside one CSV cell
+
+
+def iter_records(stream: IO[bytes], content_type: str) -> Iterator[Tuple[int, Any]]:
+    """Yield (row number, record) pairs from an NDJSON or CSV upload without buffering it whole.
+
+    A record is either a dict or the exception raised while parsing that row,
+    so one malformed line does not abort the rest of the upload.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    if content_type.startswith('text/csv'):
+        reader = csv.DictReader(text)
+        for row_number, row in enumerate(reader, start=1):
+            yield row_number, _from_csv(row)
+    elif content_type.startswith(('application/x-ndjson', 'application/jsonl')):
+        for row_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield row_number, json.loads(line)
+            except ValueError as e:
+                yield row_number, e
+    else:
+        raise ValueError("Bulk uploads must be sent as application/x-ndjson or text/csv")
+
+
+def _from_csv(row: Dict[str, str]) -> Dict[str, Any]:
+    """Turn a flat CSV row into the same shape as a JSON request body"""
+    record: Dict[str, Any] = {key: value for key, value in row.items() if key and value not in (None, '')}
+    if 'email' in record or 'phone' in record:
+        record['contact_info'] = {'email': record.pop('email', None), 'phone': record.pop('phone', None)}
+        record['contact_info'] = {k: v for k, v in record['contact_info'].items() if v is not None}
+    for list_field in ('specializations', 'materials_required'):
+        # An empty cell is an empty list, so validation says what is wrong rather than reporting a missing field
+        value = row.get(list_field)
+        if value is not None:
+            record[list_field] = [item.strip() for item in value.split(CSV_LIST_SEPARATOR) if item.strip()]
+    if 'max_capacity' in record:
+        try:
+            record['max_capacity'] = int(record['max_capacity'])
+        except ValueError:
+            pass  # Left as a string so that validation reports it
+    return record
+
+
+def build_student(data: Dict[str, Any]) -> Student:
+    return Student(name=data['name'], contact_info=data['contact_info'])
+
+
+def build_teacher(data: Dict[str, Any]) -> Teacher:
+    teacher = Teacher(
+        name=data['name'],
+        contact_info=data['contact_info'],
+        specializations=data['specializations']
+    )
+    if not teacher.validate_specializations():
+        raise ValueError("Specializations must be a non-empty list of strings")
+    return teacher
+
+
+def build_course(data: Dict[str, Any]) -> Course:
+    course_type = data['type']
+    if course_type == 'math':
+        course = Course(
+            name=data['name'],
+            course_type=course_type,
+            max_capacity=data['max_capacity'],
+            difficulty_level=data['difficulty_level']
+        )
+    elif course_type == 'art':
+        course = Course(
+            name=data['name'],
+            course_type=course_type,
+            max_capacity=data['max_capacity'],
+            materials_required=set(data['materials_required'])
+        )
+    else:
+        raise ValueError("Course type must be 'math' or 'art'")
+    if not course.validate():
+        raise ValueError("Invalid course data")
+    return course
+
+
+def bulk_import(records: Iterable[Tuple[int, Any]], build: Callable[[Dict[str, Any]], Any],
+                insert: Callable[[List[Any]], List[str]]) -> Dict[str, Any]:
+    """Validate records batch by batch and insert the valid ones.
+
+    Rows that fail to parse or validate are reported with their row number
+    and skipped; they never abort the rest of the upload.
+    """
+    ids: List[str] = []
+    errors: List[Dict[str, Any]] = []
+    batch: List[Any] = []
+    for row_number, record in records:
+        try:
+            if isinstance(record, Exception):
+                raise record
+            if not isinstance(record, dict):
+                raise ValueError("Each record must be a JSON object")
+            batch.append(build(record))
+        except KeyError as e:
+            errors.append({'row': row_number, 'error': f"Missing field {e}"})
+        except (ValueError, TypeError) as e:
+            errors.append({'row': row_number, 'error': str(e)})
+        if len(batch) >= BATCH_SIZE:
+            ids.extend(insert(batch))
+            batch = []
+    if batch:
+        ids.extend(insert(batch))
+    return {'inserted': len(ids), 'ids': ids, 'errors': errors}
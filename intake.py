@@ -0,0 +1,187 @@
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+
+
+class IntakeUnavailable(Exception):
+    """The enrollment was not applied; the client should retry after `retry_after` seconds"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"{reason}, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class IntakeFull(IntakeUnavailable):
+    """The intake queue is at capacity"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("enrollment queue is full", retry_after)
+
+
+class _Ticket:
+    __slots__ = ('student_id', 'priority', 'arrived', 'done', 'result', 'error', 'taken', 'abandoned')
+
+    def __init__(self, student_id: str, priority: Optional[int]):
+        self.student_id = student_id
+        self.priority = priority
+        self.arrived = time.monotonic()
+        self.taken = False  # Handed to the University by the dispatcher
+        self.abandoned = False  # Given up by its request before it was taken; never applied
+        self.done = threading.Event()
+        self.result: Optional[Tuple[str, Optional[int]]] = None
+        self.error: Optional[BaseException] = None
+
+
+class EnrollmentIntake:
+    """Bounded admission queue that coalesces enrollment requests per course.
+
+    Request threads `submit` and block until their request is applied. A
+    single dispatcher thread waits up to `window` seconds after the oldest
+    pending request, then hands each course its requests in arrival order
+    through `University.enroll_requests`, which locks the course once for
+    the whole batch. Once `max_pending` requests are queued or being
+    applied, new ones are refused with IntakeFull instead of piling up, so
+    latency stays bounded. A request still queued after `timeout` seconds is
+    abandoned (the dispatcher skips it) and refused with IntakeUnavailable.
+    """
+
+    def __init__(self, university, window: float = 0.005, max_pending: int = 10_000, timeout: float = 30.0):
+        self.university = university
+        self.window = window
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._condition = threading.Condition()
+        self._pending: 'OrderedDict[str, List[_Ticket]]' = OrderedDict()  # Course ID to its tickets
+        self._depth = 0  # Tickets queued or being applied
+        self._oldest: Optional[float] = None
+        self._closed = False
+        # Statistics
+        self.submitted = 0
+        self.shed = 0
+        self.abandoned = 0
+        self.batches = 0
+        self.applied = 0
+        self.max_depth = 0
+        self._waits: deque = deque(maxlen=4096)  # Recent queueing delays, in seconds
+        self._rate: deque = deque(maxlen=64)  # (finished at, requests) of recent dispatch rounds
+        self._dispatcher = threading.Thread(target=self._run, name='enrollment-intake', daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, student_id: str, course_id: str, priority: Optional[int] = None) -> Tuple[str, Optional[int]]:
+        """Queue one enrollment and wait for its outcome, as returned by University.enroll_or_waitlist"""
+        ticket = _Ticket(student_id, priority)
+        with self._condition:
+            if self._closed:
+                raise IntakeUnavailable("enrollment intake is closed", 1)
+            if self._depth >= self.max_pending:
+                self.shed += 1
+                raise IntakeFull(self._retry_after())
+            self._pending.setdefault(course_id, []).append(ticket)
+            self._depth += 1
+            self.submitted += 1
+            self.max_depth = max(self.max_depth, self._depth)
+            if self._oldest is None:
+                self._oldest = ticket.arrived
+                self._condition.notify()
+        if not ticket.done.wait(self.timeout):
+            with self._condition:
+                if not ticket.taken:
+                    ticket.abandoned = True
+                    self._depth -= 1
+                    self.abandoned += 1
+                    raise IntakeUnavailable("enrollment was not applied in time", self._retry_after())
+            ticket.done.wait()  # Being applied right now, so the outcome is moments away
+        if ticket.error is not None:
+            raise ticket.error
+        return ticket.result
+
+    def _retry_after(self) -> int:
+        """Seconds until the current backlog should have drained, from the recent dispatch rate"""
+        if len(self._rate) < 2:
+            return 1
+        elapsed = self._rate[-1][0] - self._rate[0][0]
+        rate = sum(count for _, count in list(self._rate)[1:]) / elapsed if elapsed > 0 else 0
+        return max(1, math.ceil(self._depth / rate)) if rate else 1
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._oldest is None and not self._closed:
+                    self._condition.wait()
+                if self._closed and self._oldest is None:
+                    return
+                oldest = self._oldest
+            # Let more requests for the same courses arrive before applying the batch
+            delay = oldest + self.window - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            with self._condition:
+                pending, self._pending = self._pending, OrderedDict()
+                self._oldest = None
+                for course_id, tickets in list(pending.items()):
+                    tickets = [ticket for ticket in tickets if not ticket.abandoned]
+                    for ticket in tickets:
+                        ticket.taken = True
+                    if tickets:
+                        pending[course_id] = tickets
+                    else:
+                        del pending[course_id]
+            self._dispatch(pending)
+
+    def _dispatch(self, pending: 'OrderedDict[str, List[_Ticket]]'):
+        count = 0
+        for course_id, tickets in pending.items():
+            try:
+                results = self.university.enroll_requests(
+                    course_id, [(ticket.student_id, ticket.priority) for ticket in tickets]
+                )
+            except Exception as e:  # Handed to the waiting request threads
+                results = None
+                for ticket in tickets:
+                    ticket.error = e
+            finished = time.monotonic()
+            for i, ticket in enumerate(tickets):
+                if results is not None:
+                    ticket.result = results[i]
+                self._waits.append(finished - ticket.arrived)
+                ticket.done.set()
+            with self._condition:
+                self._depth -= len(tickets)
+            count += len(tickets)
+            self.batches += 1
+        self.applied += count
+        self._rate.append((time.monotonic(), count))
+
+    def close(self):
+        """Apply what is still queued, then stop the dispatcher"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._dispatcher.join(self.timeout)
+
+    def stats(self) -> Dict[str, float]:
+        with self._condition:
+            depth = self._depth
+        waits = sorted(self._waits)
+
+        def wait_ms(percent: float) -> float:
+            if not waits:
+                return 0.0
+            return round(waits[min(len(waits) - 1, int(len(waits) * percent / 100))] * 1000, 3)
+
+        return {
+            'depth': depth,
+            'max_depth': self.max_depth,
+            'max_pending': self.max_pending,
+            'window_ms': self.window * 1000,
+            'submitted': self.submitted,
+            'applied': self.applied,
+            'shed': self.shed,
+            'abandoned': self.abandoned,
+            'batches': self.batches,
+            'mean_batch_size': round(self.applied / self.batches, 2) if self.batches else 0.0,
+            'wait_p50_ms': wait_ms(50),
+            'wait_p99_ms': wait_ms(99),
+        }
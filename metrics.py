@@ -0,0 +1,217 @@
+import functools
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Upper bounds in seconds; the implicit last bucket is +Inf
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Upper bounds in bytes
+SIZE_BUCKETS = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152, 8388608)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense, plus sum and count"""
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        # Callers hold the registry lock
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """In-process registry of counters, histograms and gauges rendered in Prometheus text format.
+
+    Observing is a dictionary lookup, a bisect and a few additions under one
+    lock, so it stays cheap enough to leave on. Gauges are callbacks read
+    only when /metrics is scraped.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._bounds: Dict[str, Tuple[float, ...]] = {}
+        self._gauges: List[Tuple[str, str, Callable[[], Iterable[Tuple[Labels, float]]]]] = []
+        self._help: Dict[str, str] = {}
+
+    def counter(self, name: str, help_text: str):
+        self._help[name] = help_text
+        self._counters.setdefault(name, {})
+
+    def histogram(self, name: str, help_text: str, bounds: Tuple[float, ...]):
+        self._help[name] = help_text
+        self._histograms.setdefault(name, {})
+        self._bounds[name] = bounds
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], Iterable[Tuple[Labels, float]]]):
+        """Register a gauge whose labelled values are produced by `read` at scrape time"""
+        self._help[name] = help_text
+        self._gauges.append((name, help_text, read))
+
+    def inc(self, name: str, labels: Labels = (), amount: float = 1):
+        with self._lock:
+            series = self._counters[name]
+            series[labels] = series.get(labels, 0) + amount
+
+    def observe(self, name: str, labels: Labels, value: float):
+        with self._lock:
+            series = self._histograms[name]
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram(self._bounds[name])
+            histogram.observe(value)
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, size: Optional[int]):
+        """Record one HTTP request: latency, status and response size, under a single lock"""
+        labels = (('method', method), ('route', route))
+        with self._lock:
+            series = self._histograms['http_request_duration_seconds']
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(seconds)
+            statuses = self._counters['http_requests_total']
+            status_labels = labels + (('status', str(status)),)
+            statuses[status_labels] = statuses.get(status_labels, 0) + 1
+            if size is not None:
+                sizes = self._histograms['http_response_size_bytes']
+                histogram = sizes.get(labels)
+                if histogram is None:
+                    histogram = sizes[labels] = Histogram(SIZE_BUCKETS)
+                histogram.observe(size)
+
+    def render(self) -> str:
+        """Everything registered, in the Prometheus text exposition format"""
+        lines: List[str] = []
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {
+                name: {labels: (h.bounds, list(h.counts), h.sum, h.count) for labels, h in series.items()}
+                for name, series in self._histograms.items()
+            }
+        for name, series in counters.items():
+            lines += [f"# HELP {name} {self._help[name]}", f"# TYPE {name} counter"]
+            lines += [f"{name}{_labels(labels)} {_number(value)}" for labels, value in sorted(series.items())]
+        for name, series in histograms.items():
+            lines += [f"# HELP {name} {self._help[name]}", f"# TYPE {name} histogram"]
+            for labels, (bounds, counts, total, count) in sorted(series.items()):
+                cumulative = 0
+                for bound, bucket in zip(bounds + (float('inf'),), counts):
+                    cumulative += bucket
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', _number(bound)),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+                lines.append(f"{name}_count{_labels(labels)} {count}")
+        for name, help_text, read in self._gauges:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            lines += [f"{name}{_labels(labels)} {_number(value)}" for labels, value in read()]
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + '}'
+
+
+def _number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return repr(value)
+
+
+def create_metrics() -> Metrics:
+    """A registry with the HTTP and University metrics declared"""
+    metrics = Metrics()
+    metrics.histogram('http_request_duration_seconds', "Time spent handling a request, per route", LATENCY_BUCKETS)
+    metrics.counter('http_requests_total', "Requests handled, per route and status code")
+    metrics.histogram('http_response_size_bytes', "Size of response bodies, per route", SIZE_BUCKETS)
+    metrics.histogram('university_method_duration_seconds', "Time spent in University methods", LATENCY_BUCKETS)
+    return metrics
+
+
+def instrument_app(app, metrics: Metrics):
+    """Time every request of a Flask app, labelled by its route template rather than the raw path"""
+    from flask import g, request
+
+    @app.before_request
+    def start_timer():
+        if metrics.enabled:
+            g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            # Streamed responses have no length up front and are left out of the size histogram
+            size = None if response.is_streamed else response.calculate_content_length()
+            metrics.observe_request(request.method, route, response.status_code,
+                                    time.perf_counter() - started, size)
+        return response
+
+
+def instrument_university(university, metrics: Metrics, methods: Optional[Iterable[str]] = None):
+    """Wrap the public methods of one University instance with timers (opt-in, costs about a microsecond per call)"""
+    if methods is None:
+        methods = [
+            name for name, value in vars(type(university)).items()
+            if not name.startswith('_') and callable(value) and not isinstance(value, classmethod)
+        ]
+    for name in methods:
+        setattr(university, name, _timed(getattr(university, name), (('method', name),), metrics))
+
+
+def _timed(method: Callable, labels: Labels, metrics: Metrics) -> Callable:
+    @functools.wraps(method)
+    def timed(*args, **kwargs):
+        if not metrics.enabled:
+            return method(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            metrics.observe('university_method_duration_seconds', labels, time.perf_counter() - started)
+    return timed
+
+
+def register_university_gauges(metrics: Metrics, university):
+    """Entity counts plus enrollment, attendance and grade record totals, computed at scrape time"""
+    metrics.gauge('university_entities', "Number of students, teachers and courses", lambda: [
+        ((('collection', 'students'),), len(university.students)),
+        ((('collection', 'teachers'),), len(university.teachers)),
+        ((('collection', 'courses'),), len(university.courses)),
+    ])
+
+    def records():
+        enrollments = sessions = presences = grades = 0
+        for course in list(university.courses.values()):
+            enrollments += len(course.students)
+            sessions += len(course.attendance)
+            presences += sum(bitset.bit_count() for bitset in list(course.attendance.values()))
+            grades += len(course.grades)
+        return [
+            ((('kind', 'enrollments'),), enrollments),
+            ((('kind', 'attendance_sessions'),), sessions),
+            ((('kind', 'attendance_presences'),), presences),
+            ((('kind', 'grades'),), grades),
+        ]
+    metrics.gauge('university_records', "Enrollments, attendance sessions/presences and grades", records)
+    metrics.gauge('university_snapshots', "Open snapshots, and entity versions preserved for them", lambda: [
+        ((('kind', kind),), value) for kind, value in university.snapshot_stats().items()
+    ])
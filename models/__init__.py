@@ -1,5 +1,6 @@
 from .person import Person, Student, Teacher
 from .course import Course
 from .university import University
+from .storage import Storage, FileStorage
 
-__all__ = ['Person', 'Course', 'Student', 'Teacher', 'University']
\ No newline at end of file
+__all__ = ['Person', 'Course', 'Student', 'Teacher', 'University', 'Storage', 'FileStorage']
\ No newline at end of file
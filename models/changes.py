@@ -0,0 +1,59 @@
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+
+class ChangeLog:
+    """Bounded, sequence-numbered record of the changes made to a University, for incremental sync.
+
+    Changes live in a ring buffer indexed by sequence number, so reading
+    from any retained point is O(1) to find plus O(limit) to copy. Once more
+    than `capacity` changes have been recorded the oldest are overwritten;
+    a reader that asks for an overwritten point is told to resync. The log
+    only covers the running process: `epoch` changes on every restart, and
+    readers holding a sequence number from another epoch must resync too.
+    """
+
+    def __init__(self, capacity: int = 100_000):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.epoch = uuid.uuid4().hex[:16]
+        self._lock = threading.Lock()
+        self._ring: List[Optional[Dict]] = [None] * capacity
+        self.latest = 0  # Sequence number of the newest change; the first change is 1
+
+    @property
+    def oldest(self) -> int:
+        """Sequence number of the oldest change still retained (latest + 1 when empty)"""
+        return max(1, self.latest - self.capacity + 1)
+
+    def record(self, change_type: str, **fields) -> int:
+        """Append a change and return its sequence number"""
+        change = {'type': change_type, 'time': round(time.time(), 6), **fields}
+        with self._lock:
+            self.latest += 1
+            change['seq'] = self.latest
+            self._ring[self.latest % self.capacity] = change
+            return self.latest
+
+    def since(self, seq: int, limit: int = 1000, epoch: Optional[str] = None) -> Tuple[List[Dict], bool]:
+        """Changes after `seq`, oldest first and at most `limit` of them, and whether the reader must resync"""
+        with self._lock:
+            latest = self.latest
+            if (epoch is not None and epoch != self.epoch) or seq > latest or seq < self.oldest - 1:
+                return [], True
+            end = min(latest, seq + limit)
+            ring, capacity = self._ring, self.capacity
+            return [ring[s % capacity] for s in range(seq + 1, end + 1)], False
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'epoch': self.epoch,
+                'capacity': self.capacity,
+                'latest': self.latest,
+                'oldest': self.oldest,
+                'retained': min(self.latest, self.capacity),
+            }
@@ -1,8 +1,27 @@
-from typing import Dict, Any, Set
-from datetime import date
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Set
+from datetime import date, datetime
+from bisect import bisect_left, bisect_right, insort
+import copy
 import uuid
+from .grades import GradeBook
+
+
+def as_date(value) -> date:
+    """Normalize a date, datetime or ISO 'YYYY-MM-DD' string to a date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    raise ValueError(f"Invalid date: {value!r}")
+
 
 class Course:
+    __slots__ = ('id', 'name', 'max_capacity', 'course_type', 'difficulty_level', 'materials_required',
+                 'students', 'teacher_id', 'attendance', '_session_dates', '_slots', '_slot_ids', '_attended',
+                 'grades')
+
     def __init__(self, name: str, max_capacity: int, course_type: str,
                  difficulty_level: str = None, materials_required: Set[str] = None):
         self.id = str(uuid.uuid4())
@@ -13,8 +32,12 @@ class Course:
         self.materials_required = materials_required or set()
         self.students = set()  # Set of student IDs
         self.teacher_id = None
-        self.attendance = {}  # Dictionary mapping dates to sets of present student IDs
-        self.grades = {}  # Dictionary mapping student IDs to their grades
+        self.attendance = {}  # Dictionary mapping dates to bitsets of present student slots
+        self._session_dates: List[date] = []  # Recorded session dates, kept sorted
+        self._slots: Dict[str, int] = {}  # Student ID to its bit position in the attendance bitsets
+        self._slot_ids: List[str] = []  # Bit position to student ID
+        self._attended: List[int] = []  # Bit position to number of sessions attended
+        self.grades = GradeBook()  # Mapping of student IDs to their grades, array-backed
         self.validate()
 
     def validate(self):
@@ -46,6 +69,18 @@ class Course:
         #if all conditions are met, return True
         return True
 
+    def clone(self) -> 'Course':
+        """Return a copy whose roster, attendance and grades can change without affecting this course"""
+        clone = copy.copy(self)
+        clone.students = copy.copy(self.students)
+        clone.attendance = dict(self.attendance)  # Bitsets are immutable ints
+        clone._session_dates = list(self._session_dates)
+        clone._slots = dict(self._slots)
+        clone._slot_ids = list(self._slot_ids)
+        clone._attended = list(self._attended)
+        clone.grades = self.grades.clone()
+        return clone
+
     def take_attendance(self, date: date, present_student_ids: Set[str]):
         """Record attendance for a specific date"""
         # TODO: Implement the take_attendance method
@@ -62,9 +97,125 @@ class Course:
             return False
 
         #if conditions are met, record attendance and return true
-        self.attendance[f"{date}"] = present_student_ids
+        try:
+            key = as_date(date)
+        except ValueError:
+            return False
+        bitset = self._to_bitset(present_student_ids)
+        previous = self.attendance.get(key, 0)
+        # Keep the per-student counters in step, touching only the bits that changed
+        for slot in self._iter_slots(previous & ~bitset):
+            self._attended[slot] -= 1
+        for slot in self._iter_slots(bitset & ~previous):
+            self._attended[slot] += 1
+        if key not in self.attendance:
+            insort(self._session_dates, key)
+        self.attendance[key] = bitset
         return True
 
+    def forget_student(self, student_id: str, attended_days: Iterable[date]):
+        """Drop every trace of a student: enrollment, grade and their bits in the given sessions.
+
+        The caller passes the days the student attended (kept on the
+        Student), so the cost is proportional to those rather than to every
+        session of the course.
+        """
+        self.students.discard(student_id)
+        self.grades.pop(student_id, None)
+        slot = self._slots.pop(student_id, None)
+        if slot is None:
+            return
+        mask = ~(1 << slot)
+        for day in attended_days:
+            bitset = self.attendance.get(day)
+            if bitset is not None:
+                self.attendance[day] = bitset & mask
+        self._attended[slot] = 0
+        self._slot_ids[slot] = None  # The slot stays allocated, like slots of withdrawn students
+
+    def attendees(self) -> List[str]:
+        """IDs of every student who has an attendance slot, including ones who withdrew since"""
+        return list(self._slots)
+
+    def _slot(self, student_id: str) -> int:
+        """Return the student's bit position, allocating the next free one on first use"""
+        slot = self._slots.get(student_id)
+        if slot is None:
+            # Slots are never reused, so past sessions keep pointing at the right student
+            slot = len(self._slot_ids)
+            self._slots[student_id] = slot
+            self._slot_ids.append(student_id)
+            self._attended.append(0)
+        return slot
+
+    def _to_bitset(self, student_ids: Set[str]) -> int:
+        """Pack a set of student IDs into one integer with a bit per slot"""
+        slots = [self._slot(student_id) for student_id in student_ids]
+        if not slots:
+            return 0
+        bits = bytearray((max(slots) >> 3) + 1)
+        for slot in slots:
+            bits[slot >> 3] |= 1 << (slot & 7)
+        return int.from_bytes(bits, 'little')
+
+    def _iter_slots(self, bitset: int) -> Iterator[int]:
+        """Yield the positions of the set bits, lowest first"""
+        while bitset:
+            lowest = bitset & -bitset
+            yield lowest.bit_length() - 1
+            bitset ^= lowest
+
+    def present_students(self, date) -> Optional[Set[str]]:
+        """Return the IDs of the students present on a date, or None if no session was recorded"""
+        bitset = self.attendance.get(as_date(date))
+        if bitset is None:
+            return None
+        return {self._slot_ids[slot] for slot in self._iter_slots(bitset)}
+
+    def headcount(self, date) -> Optional[int]:
+        """Return the number of students present on a date"""
+        bitset = self.attendance.get(as_date(date))
+        if bitset is None:
+            return None
+        return bitset.bit_count()
+
+    def sessions_between(self, start: Optional[date] = None, end: Optional[date] = None) -> List[date]:
+        """Return the recorded session dates within [start, end], in order"""
+        low = bisect_left(self._session_dates, as_date(start)) if start is not None else 0
+        high = bisect_right(self._session_dates, as_date(end)) if end is not None else len(self._session_dates)
+        return self._session_dates[low:high]
+
+    def last_sessions(self, count: int) -> List[date]:
+        """Return the dates of the most recent sessions, oldest first"""
+        if count <= 0:
+            return []
+        return self._session_dates[-count:]
+
+    def attendance_rate(self, student_id: str) -> Optional[float]:
+        """Return the share of recorded sessions (0-100) a student attended"""
+        if not self.attendance:
+            return None
+        slot = self._slots.get(student_id)
+        if slot is None:
+            return 0.0
+        return 100 * self._attended[slot] / len(self.attendance)
+
+    def attendance_rates(self) -> Dict[str, float]:
+        """Return the attendance rate (0-100) of every enrolled student"""
+        sessions = len(self.attendance)
+        if not sessions:
+            return {}
+        counts = self._attended
+        rates = {}
+        for student_id in self.students:
+            slot = self._slots.get(student_id)
+            rates[student_id] = 100 * counts[slot] / sessions if slot is not None else 0.0
+        return rates
+
+    def students_below(self, threshold: float) -> List[str]:
+        """Return the enrolled students whose attendance rate is below a percentage"""
+        return [student_id for student_id, rate in self.attendance_rates().items() if rate < threshold]
+
 
     def assign_grade(self, student_id: str, grade: float):
         """Assign a grade to a student"""
@@ -0,0 +1,209 @@
+from array import array
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import math
+import statistics
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; statistics fall back to pure Python
+    np = None
+
+PERCENTILES = (10, 25, 50, 75, 90)
+HISTOGRAM_EDGES = tuple(range(0, 101, 10))  # Ten buckets of ten points each, the last one includes 100
+
+
+class GradeBook(MutableMapping):
+    """Mapping of student ID to grade backed by a contiguous array of doubles.
+
+    Grades live in an `array('d')` with a side index from student ID to
+    position; removal swaps the last grade into the freed position, so every
+    update is O(1). Count, sum and sum of squares are kept up to date as
+    grades change, which makes mean and standard deviation free.
+    """
+
+    __slots__ = ('_values', '_ids', '_index', 'total', 'total_squares')
+
+    def __init__(self, grades: Optional[Dict[str, float]] = None):
+        self._values = array('d')
+        self._ids: List[str] = []  # Position to student ID
+        self._index: Dict[str, int] = {}  # Student ID to position
+        self.total = 0.0
+        self.total_squares = 0.0
+        for student_id, grade in (grades or {}).items():
+            self[student_id] = grade
+
+    def __getitem__(self, student_id: str) -> float:
+        return self._values[self._index[student_id]]
+
+    def __setitem__(self, student_id: str, grade: float):
+        grade = float(grade)
+        position = self._index.get(student_id)
+        if position is None:
+            self._index[student_id] = len(self._values)
+            self._ids.append(student_id)
+            self._values.append(grade)
+        else:
+            previous = self._values[position]
+            self.total -= previous
+            self.total_squares -= previous * previous
+            self._values[position] = grade
+        self.total += grade
+        self.total_squares += grade * grade
+
+    def __delitem__(self, student_id: str):
+        position = self._index.pop(student_id)
+        grade = self._values[position]
+        self.total -= grade
+        self.total_squares -= grade * grade
+        last = len(self._values) - 1
+        if position != last:
+            # Move the last grade into the hole to keep the array dense
+            self._values[position] = self._values[last]
+            moved_id = self._ids[last]
+            self._ids[position] = moved_id
+            self._index[moved_id] = position
+        self._values.pop()
+        self._ids.pop()
+
+    def __contains__(self, student_id: object) -> bool:
+        return student_id in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._ids))
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def copy(self) -> Dict[str, float]:
+        """Return a plain dictionary with the same grades"""
+        return dict(zip(self._ids, self._values))
+
+    def clone(self) -> 'GradeBook':
+        """Return an independent GradeBook with the same grades, without re-adding them one by one"""
+        clone = GradeBook()
+        clone._values = array('d', self._values)
+        clone._ids = list(self._ids)
+        clone._index = dict(self._index)
+        clone.total = self.total
+        clone.total_squares = self.total_squares
+        return clone
+
+    @property
+    def values_array(self) -> array:
+        """The raw array of grades, in no particular order"""
+        return self._values
+
+    def mean(self) -> Optional[float]:
+        if not self._values:
+            return None
+        return self.total / len(self._values)
+
+    def std(self) -> Optional[float]:
+        """Population standard deviation, from the running sums"""
+        if not self._values:
+            return None
+        mean = self.total / len(self._values)
+        return math.sqrt(max(self.total_squares / len(self._values) - mean * mean, 0.0))
+
+
+def grade_stats(values: Any) -> Dict[str, Any]:
+    """Summary statistics of a sequence of grades: count, mean, spread, percentiles and a histogram"""
+    if np is not None:
+        data = _as_ndarray(values)
+        if data.size == 0:
+            return {'count': 0}
+        percentiles = np.percentile(data, PERCENTILES)
+        # Buckets are ten points wide, so integer division beats a generic np.histogram
+        buckets = np.minimum((data // 10).astype(np.intp), len(HISTOGRAM_EDGES) - 2)
+        histogram = np.bincount(buckets, minlength=len(HISTOGRAM_EDGES) - 1)
+        return {
+            'count': int(data.size),
+            'mean': float(data.mean()),
+            'median': float(percentiles[PERCENTILES.index(50)]),
+            'std': float(data.std()),
+            'min': float(data.min()),
+            'max': float(data.max()),
+            'percentiles': {f'p{p}': float(v) for p, v in zip(PERCENTILES, percentiles)},
+            'histogram': _histogram_dict(histogram.tolist()),
+        }
+
+    data = sorted(values)
+    if not data:
+        return {'count': 0}
+    histogram = [0] * (len(HISTOGRAM_EDGES) - 1)
+    for grade in data:
+        histogram[min(int(grade // 10), len(histogram) - 1)] += 1
+    return {
+        'count': len(data),
+        'mean': statistics.fmean(data),
+        'median': statistics.median(data),
+        'std': statistics.pstdev(data),
+        'min': data[0],
+        'max': data[-1],
+        'percentiles': {f'p{p}': _percentile(data, p) for p in PERCENTILES},
+        'histogram': _histogram_dict(histogram),
+    }
+
+
+def combined_values(gradebooks: Iterable[GradeBook]) -> Any:
+    """Concatenate the grades of many gradebooks into one array for university-wide statistics"""
+    combined = array('d')
+    for book in gradebooks:
+        # extend copies in one step, so a gradebook growing concurrently is never caught exporting its buffer
+        combined.extend(book.values_array)
+    if np is not None:
+        return np.frombuffer(combined, dtype=np.float64)
+    return combined
+
+
+def grade_report(gradebooks: Dict[str, GradeBook]) -> Dict[str, Any]:
+    """University-wide grade statistics plus running count/mean/std per course, from course ID to gradebook"""
+    courses = {}
+    for course_id, gradebook in gradebooks.items():
+        if len(gradebook):
+            courses[course_id] = {'count': len(gradebook), 'mean': gradebook.mean(), 'std': gradebook.std()}
+    return {
+        'overall': grade_stats(combined_values(gradebooks.values())),
+        'courses': courses,
+    }
+
+
+def out_of_range(values: List[float], low: float = 0.0, high: float = 100.0) -> List[int]:
+    """Positions of the values outside [low, high] (NaN included), in one vectorized pass when NumPy is available"""
+    # Integers too large for a double would make the conversion raise; they are out of range like infinity
+    values = [_as_float(value) for value in values]
+    if np is not None:
+        data = np.asarray(values, dtype=np.float64)
+        return np.flatnonzero(~((data >= low) & (data <= high))).tolist()
+    return [i for i, value in enumerate(values) if not low <= value <= high]
+
+
+def _as_float(value: float) -> float:
+    try:
+        return float(value)
+    except OverflowError:
+        return math.inf
+
+
+def _as_ndarray(values: Any) -> Any:
+    """Turn an array('d') into an ndarray through the buffer protocol; anything else goes through asarray"""
+    if isinstance(values, array):
+        # View a private slice rather than the live array, which a concurrent grade may need to resize
+        return np.frombuffer(values[:], dtype=np.float64)
+    return np.asarray(values, dtype=np.float64)
+
+
+def _percentile(sorted_data: List[float], percentile: float) -> float:
+    """Linear-interpolation percentile, matching NumPy's default"""
+    rank = (len(sorted_data) - 1) * percentile / 100
+    low = math.floor(rank)
+    high = min(low + 1, len(sorted_data) - 1)
+    return sorted_data[low] + (sorted_data[high] - sorted_data[low]) * (rank - low)
+
+
+def _histogram_dict(counts: List[int]) -> Dict[str, int]:
+    return {
+        f'{low}-{high}': count
+        for low, high, count in zip(HISTOGRAM_EDGES, HISTOGRAM_EDGES[1:], counts)
+    }
@@ -0,0 +1,151 @@
+from bisect import bisect_left, insort
+from typing import Dict, Hashable, Iterable, Iterator, List, Set, Tuple, Union
+
+
+class HashIndex:
+    """Maps attribute values to the set of entity IDs that have them.
+
+    An entity may be indexed under several keys, which makes this an
+    inverted index for multi-valued attributes such as specializations.
+    Keys held by a single entity (the common case for emails) store the bare
+    ID instead of a one-element set.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Hashable, Union[str, Set[str]]] = {}
+
+    def add(self, key: Hashable, entity_id: str):
+        current = self._entries.get(key)
+        if current is None:
+            self._entries[key] = entity_id
+        elif isinstance(current, str):
+            if current != entity_id:
+                self._entries[key] = {current, entity_id}
+        else:
+            current.add(entity_id)
+
+    def remove(self, key: Hashable, entity_id: str):
+        current = self._entries.get(key)
+        if current is None:
+            return
+        if isinstance(current, str):
+            if current == entity_id:
+                del self._entries[key]
+            return
+        current.discard(entity_id)
+        if len(current) == 1:
+            self._entries[key] = next(iter(current))
+
+    def get(self, key: Hashable) -> Set[str]:
+        """Return the IDs indexed under a key (an empty set if there are none)"""
+        current = self._entries.get(key)
+        if current is None:
+            return set()
+        if isinstance(current, str):
+            return {current}
+        return current
+
+    def keys(self) -> List[Hashable]:
+        return list(self._entries)
+
+    def clone(self) -> 'HashIndex':
+        """Return an independent copy of the index"""
+        clone = HashIndex()
+        clone._entries = {key: ids if isinstance(ids, str) else set(ids) for key, ids in self._entries.items()}
+        return clone
+
+
+class PrefixIndex:
+    """Sorted (key, entity ID) pairs, for case-insensitive prefix searches.
+
+    The pairs are split into sorted blocks of at most 2 * BLOCK entries,
+    with the largest pair of each block kept alongside. Inserting or
+    removing a pair is a bisect over the blocks plus a shift inside one of
+    them, so it costs the same whatever the size of the index.
+    """
+
+    BLOCK = 512
+
+    def __init__(self):
+        self._blocks: List[List[Tuple[str, str]]] = []
+        self._maxes: List[Tuple[str, str]] = []  # Last pair of each block
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def clone(self) -> 'PrefixIndex':
+        clone = PrefixIndex()
+        clone._blocks = [list(block) for block in self._blocks]  # The pairs themselves are immutable
+        clone._maxes = list(self._maxes)
+        clone._size = self._size
+        return clone
+
+    def add(self, key: str, entity_id: str):
+        self._insert((key.casefold(), entity_id))
+
+    def add_many(self, pairs: Iterable[Tuple[str, str]]):
+        """Index many (key, entity ID) pairs, rebuilding the blocks when the batch outnumbers the index"""
+        new = [(key.casefold(), entity_id) for key, entity_id in pairs]
+        if len(new) < self._size:
+            for entry in new:
+                self._insert(entry)
+            return
+        entries = [entry for block in self._blocks for entry in block] + new
+        entries.sort()
+        self._blocks = [entries[i:i + self.BLOCK] for i in range(0, len(entries), self.BLOCK)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._size = len(entries)
+
+    def _insert(self, entry: Tuple[str, str]):
+        blocks, maxes = self._blocks, self._maxes
+        self._size += 1
+        if not blocks:
+            blocks.append([entry])
+            maxes.append(entry)
+            return
+        index = bisect_left(maxes, entry)
+        if index == len(maxes):
+            index -= 1
+            blocks[index].append(entry)
+            maxes[index] = entry
+        else:
+            insort(blocks[index], entry)
+        block = blocks[index]
+        if len(block) > 2 * self.BLOCK:
+            blocks[index:index + 1] = [block[:self.BLOCK], block[self.BLOCK:]]
+            maxes[index:index + 1] = [block[self.BLOCK - 1], block[-1]]
+
+    def remove(self, key: str, entity_id: str):
+        entry = (key.casefold(), entity_id)
+        index = bisect_left(self._maxes, entry)
+        if index == len(self._maxes):
+            return
+        block = self._blocks[index]
+        position = bisect_left(block, entry)
+        if position < len(block) and block[position] == entry:
+            del block[position]
+            self._size -= 1
+            if not block:
+                del self._blocks[index]
+                del self._maxes[index]
+            elif position == len(block):
+                self._maxes[index] = block[-1]
+
+    def search(self, prefix: str) -> Iterator[str]:
+        """Yield the IDs whose key starts with the prefix, in key order"""
+        prefix = prefix.casefold()
+        start = (prefix, '')
+        blocks = self._blocks
+        index = bisect_left(self._maxes, start)
+        position = bisect_left(blocks[index], start) if index < len(blocks) else 0
+        while index < len(blocks):
+            block = blocks[index]
+            while position < len(block):
+                key, entity_id = block[position]
+                if not key.startswith(prefix):
+                    return
+                yield entity_id
+                position += 1
+            index += 1
+            position = 0
@@ -0,0 +1,115 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Hashable, Iterator, Tuple
+
+# Rank of each entity kind in the global lock order: courses, then students, then teachers
+COURSE = 0
+STUDENT = 1
+TEACHER = 2
+
+LockKey = Tuple[int, str]
+
+
+def course_key(course_id: str) -> LockKey:
+    return (COURSE, course_id)
+
+
+def student_key(student_id: str) -> LockKey:
+    return (STUDENT, student_id)
+
+
+def teacher_key(teacher_id: str) -> LockKey:
+    return (TEACHER, teacher_id)
+
+
+class LockTable:
+    """One re-entrant lock per entity, always acquired in a fixed global order.
+
+    `hold` sorts the requested keys before locking them, so two operations
+    that touch overlapping entities can never wait on each other in a cycle.
+    A thread may take more locks while holding some, as long as every new key
+    ranks after the ones it already holds (e.g. a course, then its students).
+    """
+
+    def __init__(self):
+        self._locks: Dict[Hashable, threading.RLock] = {}
+        self._guard = threading.Lock()
+
+    def _lock(self, key: LockKey) -> threading.RLock:
+        lock = self._locks.get(key)
+        if lock is None:
+            with self._guard:
+                lock = self._locks.setdefault(key, threading.RLock())
+        return lock
+
+    def discard(self, key: LockKey):
+        """Forget the lock of an entity that no longer exists"""
+        with self._guard:
+            self._locks.pop(key, None)
+
+    @contextmanager
+    def hold(self, *keys: LockKey) -> Iterator[None]:
+        locks = [self._lock(key) for key in sorted(set(keys))]
+        acquired = []
+        try:
+            for lock in locks:
+                lock.acquire()
+                acquired.append(lock)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
+
+
+class SharedExclusiveLock:
+    """Readers-writer lock where "shared" holders are mutations on disjoint entities.
+
+    Ordinary mutations hold it shared and serialize among themselves through
+    the per-entity locks; whole-state operations such as snapshots hold it
+    exclusively. Shared holds are re-entrant per thread, and waiting
+    exclusive holders block new shared ones so snapshots are not starved.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._shared = 0
+        self._exclusive = False
+        self._exclusive_waiting = 0
+        self._local = threading.local()
+
+    def held_shared(self) -> bool:
+        return getattr(self._local, 'depth', 0) > 0
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        depth = getattr(self._local, 'depth', 0)
+        if depth == 0:
+            with self._condition:
+                while self._exclusive or self._exclusive_waiting:
+                    self._condition.wait()
+                self._shared += 1
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            if depth == 0:
+                with self._condition:
+                    self._shared -= 1
+                    if not self._shared:
+                        self._condition.notify_all()
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        with self._condition:
+            self._exclusive_waiting += 1
+            while self._exclusive or self._shared:
+                self._condition.wait()
+            self._exclusive_waiting -= 1
+            self._exclusive = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._exclusive = False
+                self._condition.notify_all()
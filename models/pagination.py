@@ -0,0 +1,98 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class CursorIndex:
+    """Stable insertion ordering of entity IDs for cursor-based pagination.
+
+    IDs are kept in an append-only list together with a map from ID to its
+    position, so resuming after a cursor is a dictionary lookup rather than
+    a scan of everything that comes before it.  Removed IDs leave a
+    tombstone behind, which keeps the positions of later entries stable,
+    and remember their position, so a cursor pointing at a deleted entity
+    still resumes where it left off.
+    """
+
+    def __init__(self):
+        self._order: List[Optional[str]] = []  # Position to ID (None once removed)
+        self._positions: Dict[str, int] = {}  # ID to position
+        self._removed: Dict[str, int] = {}  # Removed ID to the position it had
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, entity_id: str) -> bool:
+        return entity_id in self._positions
+
+    def clone(self) -> 'CursorIndex':
+        """Return an independent copy of the ordering"""
+        clone = CursorIndex()
+        clone._order = list(self._order)
+        clone._positions = dict(self._positions)
+        clone._removed = dict(self._removed)
+        return clone
+
+    def position(self, entity_id: str) -> int:
+        """Return the position of an ID in the ordering"""
+        return self._positions[entity_id]
+
+    def find(self, entity_id: str) -> Optional[int]:
+        """Return the position of an ID, or None if it is not (or no longer) in the ordering"""
+        return self._positions.get(entity_id)
+
+    def cursor_position(self, entity_id: str) -> Optional[int]:
+        """Return the position to resume after: the ID's own, or the one it had before it was removed"""
+        position = self._positions.get(entity_id)
+        return position if position is not None else self._removed.get(entity_id)
+
+    def end(self) -> int:
+        """Return the position the next added ID will get"""
+        return len(self._order)
+
+    def id_at(self, position: int) -> Optional[str]:
+        """Return the ID at a position, or None if it was removed"""
+        return self._order[position]
+
+    def add(self, entity_id: str):
+        """Append an ID at the end of the ordering"""
+        if entity_id in self._positions:
+            return
+        self._removed.pop(entity_id, None)
+        self._positions[entity_id] = len(self._order)
+        self._order.append(entity_id)
+
+    def discard(self, entity_id: str):
+        """Remove an ID, leaving a tombstone in its position"""
+        position = self._positions.pop(entity_id, None)
+        if position is not None:
+            self._order[position] = None
+            self._removed[entity_id] = position
+
+    def iter_after(self, after: Optional[str] = None) -> Iterator[str]:
+        """Yield IDs in order, starting right after the given cursor"""
+        start = 0
+        if after is not None:
+            position = self.cursor_position(after)
+            if position is None:
+                raise ValueError(f"Unknown cursor: {after}")
+            start = position + 1
+        # The cursor is checked eagerly so that a bad one fails before streaming starts
+        return self._iter_from(start)
+
+    def _iter_from(self, start: int) -> Iterator[str]:
+        order = self._order
+        for position in range(start, len(order)):
+            entity_id = order[position]
+            if entity_id is not None:
+                yield entity_id
+
+    def page(self, limit: int, after: Optional[str] = None) -> Tuple[List[str], Optional[str]]:
+        """Return up to `limit` IDs after the cursor and the cursor of the next page"""
+        if not isinstance(limit, int) or limit <= 0:
+            raise ValueError("Limit must be a positive integer")
+        ids = []
+        for entity_id in self.iter_after(after):
+            if len(ids) == limit:
+                # There is at least one more entry, so hand out a cursor
+                return ids, ids[-1]
+            ids.append(entity_id)
+        return ids, None
@@ -1,9 +1,14 @@
 from abc import ABC, abstractmethod
 from operator import truediv
-from typing import Dict, Any, Set, List
+from typing import Dict, Any, Set, List, Optional
+from datetime import date
+from bisect import bisect_left, bisect_right
+import copy
 import uuid
 
 class Person(ABC):
+    __slots__ = ('id', 'name', 'contact_info')
+
     def __init__(self, name: str, contact_info: Dict[str, str]):
         self.id = str(uuid.uuid4())
         self.name = name
@@ -26,6 +31,10 @@ class Person(ABC):
             if field not in self.contact_info:
                 raise ValueError(f"Contact info must include {field}")
 
+    def clone(self) -> 'Person':
+        """Return a copy whose collections can change without affecting this person"""
+        return copy.copy(self)
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert person data to dictionary"""
         return {
@@ -36,14 +45,26 @@ class Person(ABC):
         }
 
 class Student(Person):
+    __slots__ = ('enrolled_courses', 'attendance', 'grades', '_grade_total', 'priority')
+
     def __init__(self, name: str, contact_info: Dict[str, str]):
         super().__init__(name, contact_info)
         self.enrolled_courses: Set[str] = set()  # Set of course IDs
-        self.attendance: Dict[str, Set[str]] = {}  # Course ID to set of dates present
+        self.priority = 0  # Waitlist tier (e.g. seniority), set by administrators only
+        self.attendance: Dict[str, List[date]] = {}  # Course ID to sorted dates present
+        self.grades: Dict[str, float] = {}  # Course ID to grade, for graded courses only
+        self._grade_total = 0.0  # Running sum of self.grades, so the GPA needs no recomputation
 
     def get_role(self) -> str:
         return "student"
 
+    def clone(self) -> 'Student':
+        clone = super().clone()
+        clone.enrolled_courses = copy.copy(self.enrolled_courses)
+        clone.attendance = {course_id: list(dates) for course_id, dates in self.attendance.items()}
+        clone.grades = dict(self.grades)
+        return clone
+
     def enroll_in_course(self, course_id: str):
         """Enroll student in a course"""
         self.enrolled_courses.add(course_id)
@@ -55,6 +76,44 @@ class Student(Person):
         except KeyError:
             raise KeyError("Course not found for this student. Please try again")
 
+    def record_grade(self, course_id: str, grade: float):
+        """Add or replace the grade of a course in the student's transcript"""
+        grade = float(grade)
+        self._grade_total += grade - self.grades.get(course_id, 0.0)
+        self.grades[course_id] = grade
+
+    def drop_grade(self, course_id: str):
+        """Remove a course from the student's transcript"""
+        self._grade_total -= self.grades.pop(course_id)
+
+    def gpa(self) -> Optional[float]:
+        """Average grade (0-100) over graded courses, or None without grades"""
+        if not self.grades:
+            return None
+        return self._grade_total / len(self.grades)
+
+    def mark_present(self, course_id: str, day: date):
+        """Add a date to the student's attendance for a course"""
+        dates = self.attendance.setdefault(course_id, [])
+        position = bisect_left(dates, day)
+        if position == len(dates) or dates[position] != day:
+            dates.insert(position, day)
+
+    def unmark_present(self, course_id: str, day: date):
+        """Remove a date from the student's attendance for a course"""
+        dates = self.attendance.get(course_id, [])
+        position = bisect_left(dates, day)
+        if position < len(dates) and dates[position] == day:
+            del dates[position]
+
+    def attendance_between(self, course_id: str, start: Optional[date] = None,
+                           end: Optional[date] = None) -> List[date]:
+        """Return the dates the student was present in a course within [start, end]"""
+        dates = self.attendance.get(course_id, [])
+        low = bisect_left(dates, start) if start is not None else 0
+        high = bisect_right(dates, end) if end is not None else len(dates)
+        return dates[low:high]
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert student data to dictionary"""
         base_dict = super().to_dict()
@@ -64,6 +123,8 @@ class Student(Person):
         return base_dict
 
 class Teacher(Person):
+    __slots__ = ('specializations', 'assigned_courses')
+
     def __init__(self, name: str, contact_info: Dict[str, str], specializations: List[str]):
         super().__init__(name, contact_info)
         self.specializations = specializations
@@ -76,6 +137,11 @@ class Teacher(Person):
         # Return "teacher" as the role
         return "teacher"
 
+    def clone(self) -> 'Teacher':
+        clone = super().clone()
+        clone.assigned_courses = copy.copy(self.assigned_courses)
+        return clone
+
     def validate_specializations(self):
         """Validate teacher specializations"""
         # TODO: Implement validate_specializations method
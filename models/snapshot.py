@@ -0,0 +1,163 @@
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from .grades import grade_report
+
+
+class Snapshot:
+    """Point-in-time, read-only view of a University's students, teachers and courses.
+
+    Taking a snapshot copies nothing: it records how far each collection's
+    ordering reached. Afterwards, a mutation that locks an entity the
+    snapshot can see first hands the untouched object over to the snapshot
+    and carries on with a copy of it (copy-on-write, see
+    `University._unshare`). Memory therefore grows with what changes while
+    the snapshot is open, not with the size of the dataset, and writers
+    never wait for readers. Waitlists and the GPA ranking are not part of
+    the view.
+
+    Use it as a context manager, or call `close` when done: an open
+    snapshot keeps every entity changed since it was taken alive.
+    """
+
+    def __init__(self, university, ends: Dict[str, int], counts: Dict[str, int]):
+        self._university = university
+        self._ends = ends  # Collection to the end of its ordering when the snapshot was taken
+        self._counts = counts
+        # Entities changed or deleted since the snapshot was taken, as they were: ID to (entity, position)
+        self._preserved: Dict[str, Dict[str, Tuple[Any, int]]] = {collection: {} for collection in ends}
+        self._preserved_ids: Dict[str, Dict[int, str]] = {collection: {} for collection in ends}  # Position to ID
+        self._lock = threading.Lock()
+        self.taken_at = time.time()
+        self.closed = False
+        self.students = SnapshotCollection(self, 'students')
+        self.teachers = SnapshotCollection(self, 'teachers')
+        self.courses = SnapshotCollection(self, 'courses')
+
+    def preserve(self, collection: str, entity, position: int) -> bool:
+        """Keep an entity as it is now, if it is part of the view; returns whether it was needed"""
+        if position >= self._ends[collection]:
+            return False  # Added after the snapshot was taken
+        with self._lock:
+            preserved = self._preserved[collection]
+            if self.closed or entity.id in preserved:
+                return False
+            preserved[entity.id] = (entity, position)
+            self._preserved_ids[collection][position] = entity.id
+            return True
+
+    def get(self, collection: str, entity_id: str):
+        """Return an entity as it was when the snapshot was taken, or None"""
+        self._check_open()
+        # The live entry is read first: writers preserve the original before they replace or delete it
+        live = self._university._collection(collection).get(entity_id)
+        kept = self._preserved[collection].get(entity_id)
+        if kept is not None:
+            return kept[0]
+        if live is None:
+            return None
+        position = self._university._order[collection].find(entity_id)
+        if position is None:
+            # Deleted in between the two reads, so it has been preserved by now
+            kept = self._preserved[collection].get(entity_id)
+            return kept[0] if kept is not None else None
+        return live if position < self._ends[collection] else None
+
+    def iter_entities(self, collection: str, after: Optional[str] = None) -> Iterator:
+        """Yield the entities of a collection in stable order, starting after a cursor"""
+        self._check_open()
+        start = 0
+        if after is not None:
+            position = self._position(collection, after)
+            if position is None:
+                raise ValueError(f"Unknown cursor: {after}")
+            start = position + 1
+        return self._iter_from(collection, start)
+
+    def _iter_from(self, collection: str, start: int) -> Iterator:
+        order = self._university._order[collection]
+        preserved_ids = self._preserved_ids[collection]
+        for position in range(start, self._ends[collection]):
+            entity_id = order.id_at(position)
+            if entity_id is None:
+                entity_id = preserved_ids.get(position)  # Deleted since the snapshot was taken
+                if entity_id is None:
+                    continue
+            entity = self.get(collection, entity_id)
+            if entity is not None:
+                yield entity
+
+    def _position(self, collection: str, entity_id: str) -> Optional[int]:
+        kept = self._preserved[collection].get(entity_id)
+        if kept is not None:
+            return kept[1]
+        order = self._university._order[collection]
+        position = order.find(entity_id)
+        if position is None:
+            kept = self._preserved[collection].get(entity_id)
+            if kept is not None:
+                return kept[1]
+            position = order.cursor_position(entity_id)  # Deleted before the snapshot was taken
+            if position is None:
+                return None
+        return position if position < self._ends[collection] else None
+
+    def get_grade_report(self) -> Dict:
+        """Get university-wide grade statistics plus running count/mean/std per course, as of the snapshot"""
+        return grade_report({course.id: course.grades for course in self.iter_entities('courses')})
+
+    def stats(self) -> Dict[str, Any]:
+        """Sizes of the view, and how many entities writers have copied away from it so far"""
+        return {
+            'taken_at': self.taken_at,
+            'closed': self.closed,
+            'counts': dict(self._counts),
+            'preserved': {collection: len(preserved) for collection, preserved in self._preserved.items()},
+        }
+
+    def close(self):
+        """Release the preserved entities; writers stop copying for this snapshot"""
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+        self._university._release_snapshot(self)
+        with self._lock:
+            for collection in self._preserved:
+                self._preserved[collection] = {}
+                self._preserved_ids[collection] = {}
+
+    def _check_open(self):
+        if self.closed:
+            raise RuntimeError("Snapshot is closed")
+
+    def __enter__(self) -> 'Snapshot':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SnapshotCollection(Mapping):
+    """Read-only ID to entity mapping of one collection as of a snapshot, in listing order"""
+
+    def __init__(self, snapshot: Snapshot, collection: str):
+        self._snapshot = snapshot
+        self._collection = collection
+
+    def __getitem__(self, entity_id: str):
+        entity = self._snapshot.get(self._collection, entity_id)
+        if entity is None:
+            raise KeyError(entity_id)
+        return entity
+
+    def __contains__(self, entity_id: object) -> bool:
+        return isinstance(entity_id, str) and self._snapshot.get(self._collection, entity_id) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (entity.id for entity in self._snapshot.iter_entities(self._collection))
+
+    def __len__(self) -> int:
+        return self._snapshot._counts[self._collection]
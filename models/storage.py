@@ -0,0 +1,185 @@
+import os
+import pickle
+import struct
+import threading
+from typing import Any, Iterator, List, Optional, Tuple
+
+# Every journal record is a little-endian length prefix followed by a pickle
+_RECORD_HEADER = struct.Struct('<I')
+_PICKLE_PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+
+class Storage:
+    """Persistence backend used by University.
+
+    The base class keeps nothing, which gives the original purely in-memory
+    behaviour. Backends override the hooks to make mutations durable.
+    """
+
+    def load(self) -> Tuple[Optional[Any], Iterator[Tuple[str, tuple]]]:
+        """Return the latest snapshot state (or None) and the journal records written after it"""
+        return None, iter(())
+
+    def append(self, op: str, args: tuple):
+        """Record a successful mutating call"""
+        pass
+
+    def should_snapshot(self) -> bool:
+        """Tell whether the journal tail has grown long enough for a new snapshot"""
+        return False
+
+    def begin_snapshot(self) -> int:
+        """Start a fresh journal for the mutations made after the snapshot about to be taken, and return its generation"""
+        return 0
+
+    def write_snapshot(self, state: Any, generation: int):
+        """Persist a full state snapshot, which makes the journals older than its generation obsolete"""
+        pass
+
+    def sync(self):
+        """Force every appended record to disk"""
+        pass
+
+    def close(self):
+        pass
+
+
+class FileStorage(Storage):
+    """Snapshot + write-ahead journal stored in a directory.
+
+    Mutations are appended to `journal-<generation>.log`. Each record is
+    written straight through to the OS, so it survives the process dying;
+    fsyncs, which make it survive the machine, are batched: once
+    `fsync_batch` records are pending, and otherwise by a background flusher
+    every `fsync_interval` seconds while records are pending. Every
+    `snapshot_every` records the owner is asked to write a snapshot: it
+    starts a new journal generation while mutations are paused, then writes
+    the snapshot at its leisure; a restart only reads the latest snapshot and
+    replays the journals from its generation on.
+    """
+
+    SNAPSHOT_NAME = 'snapshot.pkl'
+
+    def __init__(self, directory: str, fsync_batch: int = 256, fsync_interval: float = 0.05,
+                 snapshot_every: int = 100_000):
+        self.directory = directory
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.snapshot_every = snapshot_every
+        self.generation = 0
+        self.records_since_snapshot = 0
+        self._pending = 0
+        self._journal = None
+        self._lock = threading.Lock()  # Guards the journal file and the pending count against the flusher
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+        os.makedirs(directory, exist_ok=True)
+
+    def _journal_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f'journal-{generation:08d}.log')
+
+    def _journal_generations(self) -> List[int]:
+        generations = []
+        for name in os.listdir(self.directory):
+            if name.startswith('journal-') and name.endswith('.log'):
+                generations.append(int(name[len('journal-'):-len('.log')]))
+        return sorted(generations)
+
+    def load(self) -> Tuple[Optional[Any], Iterator[Tuple[str, tuple]]]:
+        state = None
+        snapshot_path = os.path.join(self.directory, self.SNAPSHOT_NAME)
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, 'rb') as snapshot_file:
+                self.generation, state = pickle.load(snapshot_file)
+        generations = [g for g in self._journal_generations() if g >= self.generation]
+        if generations:
+            self.generation = generations[-1]
+        return state, self._replay(generations)
+
+    def _replay(self, generations: List[int]) -> Iterator[Tuple[str, tuple]]:
+        for generation in generations:
+            path = self._journal_path(generation)
+            with open(path, 'rb') as journal:
+                data = journal.read()
+            offset = 0
+            while offset + _RECORD_HEADER.size <= len(data):
+                (length,) = _RECORD_HEADER.unpack_from(data, offset)
+                end = offset + _RECORD_HEADER.size + length
+                if end > len(data):
+                    break  # Torn write at the tail
+                yield pickle.loads(data[offset + _RECORD_HEADER.size:end])
+                self.records_since_snapshot += 1
+                offset = end
+            if offset < len(data):
+                # Drop the torn record so new appends start on a record boundary
+                with open(path, 'r+b') as journal:
+                    journal.truncate(offset)
+
+    def _open_journal(self):
+        if self._journal is None:
+            # Unbuffered: every record reaches the OS as soon as it is appended
+            self._journal = open(self._journal_path(self.generation), 'ab', buffering=0)
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_periodically, name='journal-flusher', daemon=True)
+            self._flusher.start()
+
+    def append(self, op: str, args: tuple):
+        payload = pickle.dumps((op, args), protocol=_PICKLE_PROTOCOL)
+        with self._lock:
+            self._open_journal()
+            self._journal.write(_RECORD_HEADER.pack(len(payload)) + payload)
+            self.records_since_snapshot += 1
+            self._pending += 1
+            if self._pending >= self.fsync_batch:
+                self._sync_locked()
+
+    def _flush_periodically(self):
+        """Fsync pending records every fsync_interval, so an idle server does not leave them unsynced"""
+        while not self._closed.wait(self.fsync_interval):
+            with self._lock:
+                if self._pending:
+                    self._sync_locked()
+
+    def should_snapshot(self) -> bool:
+        return self.records_since_snapshot >= self.snapshot_every
+
+    def begin_snapshot(self) -> int:
+        with self._lock:
+            # Until the snapshot is written, a restart replays the old journal and then this one
+            self._sync_locked()
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            self.generation += 1
+            self.records_since_snapshot = 0
+            return self.generation
+
+    def write_snapshot(self, state: Any, generation: int):
+        snapshot_path = os.path.join(self.directory, self.SNAPSHOT_NAME)
+        temp_path = snapshot_path + '.tmp'
+        with open(temp_path, 'wb') as snapshot_file:
+            pickle.dump((generation, state), snapshot_file, protocol=_PICKLE_PROTOCOL)
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        # The rename is the commit point: journals older than the snapshot's generation become obsolete
+        os.replace(temp_path, snapshot_path)
+        for old in self._journal_generations():
+            if old < generation:
+                os.remove(self._journal_path(old))
+
+    def sync(self):
+        with self._lock:
+            self._sync_locked()
+
+    def _sync_locked(self):
+        if self._journal is not None and self._pending:
+            os.fsync(self._journal.fileno())
+        self._pending = 0
+
+    def close(self):
+        self._closed.set()
+        with self._lock:
+            self._sync_locked()
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
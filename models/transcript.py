@@ -0,0 +1,48 @@
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+
+class GpaRanking:
+    """Students ordered by GPA, best first, for class ranking.
+
+    Entries are (-gpa, student_id) tuples in a sorted list, so ties are
+    broken by student ID and both updates and rank lookups are a bisect.
+    """
+
+    def __init__(self):
+        self._entries: List[Tuple[float, str]] = []
+        self._gpas: Dict[str, float] = {}  # Student ID to the GPA currently in the list
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clone(self) -> 'GpaRanking':
+        clone = GpaRanking()
+        clone._entries = list(self._entries)
+        clone._gpas = dict(self._gpas)
+        return clone
+
+    def update(self, student_id: str, gpa: Optional[float]):
+        """Move a student to their new GPA, or drop them from the ranking when it is None"""
+        self.discard(student_id)
+        if gpa is not None:
+            self._gpas[student_id] = gpa
+            insort(self._entries, (-gpa, student_id))
+
+    def discard(self, student_id: str):
+        previous = self._gpas.pop(student_id, None)
+        if previous is not None:
+            entry = (-previous, student_id)
+            position = bisect_left(self._entries, entry)
+            del self._entries[position]
+
+    def top(self, k: int) -> List[Tuple[str, float]]:
+        """Return the k best (student_id, gpa) pairs"""
+        return [(student_id, -negative_gpa) for negative_gpa, student_id in self._entries[:max(k, 0)]]
+
+    def rank(self, student_id: str) -> Optional[int]:
+        """Return the 1-based class rank of a student, or None if they have no grades"""
+        gpa = self._gpas.get(student_id)
+        if gpa is None:
+            return None
+        return bisect_left(self._entries, (-gpa, student_id)) + 1
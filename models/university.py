@@ -1,17 +1,75 @@
-from typing import Dict, List, Optional, Set
-from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from datetime import date, datetime
+from contextlib import contextmanager
+import threading
+import time
 from .person import Student, Teacher
-from .course import Course
+from .course import Course, as_date
+from .grades import grade_report, grade_stats, out_of_range
+from .transcript import GpaRanking
+from .pagination import CursorIndex
+from .indexes import HashIndex, PrefixIndex
+from .storage import Storage
+from .locking import COURSE, STUDENT, LockTable, SharedExclusiveLock, course_key, student_key, teacher_key
+from .waitlist import Waitlist
+from .changes import ChangeLog
+from .snapshot import Snapshot
 
 class University:
-    def __init__(self):
+    # Attributes that describe the running process rather than the data, left out of snapshots
+    _TRANSIENT = ('storage', '_replaying', 'recovery_stats', '_locks', '_world', '_shared', '_checkpoint_due',
+                  '_checkpointing', 'changes', '_snapshots', '_owned')
+
+    def __init__(self, storage: Optional[Storage] = None):
+        self.storage = storage or Storage()
+        self._replaying = False
+        self.recovery_stats: Dict[str, float] = {}
+        # Locking, in acquisition order: _world (shared by every mutation, exclusive for snapshots),
+        # then per-entity locks (courses, students, teachers, each sorted by ID), then _shared, which
+        # guards the indexes, counters and journal that all mutations update
+        self._world = SharedExclusiveLock()
+        self._locks = LockTable()
+        self._shared = threading.RLock()
+        self._checkpoint_due = False
+        self._checkpointing = threading.Lock()  # Held while a checkpoint is being written
         self.students: Dict[str, Student] = {}  # ID to Student mapping
         self.teachers: Dict[str, Teacher] = {}  # ID to Teacher mapping
         self.courses: Dict[str, Course] = {}  # ID to Course mapping
+        # Stable ordering of each collection, used for paginated listings
+        self._order: Dict[str, CursorIndex] = {
+            'students': CursorIndex(),
+            'teachers': CursorIndex(),
+            'courses': CursorIndex(),
+        }
+        self._ranking = GpaRanking()  # Students with at least one grade, best GPA first
+        # Secondary indexes, maintained by every method that adds or changes the indexed attributes
+        self._emails: Dict[str, HashIndex] = {'students': HashIndex(), 'teachers': HashIndex()}
+        self._names: Dict[str, PrefixIndex] = {'students': PrefixIndex(), 'teachers': PrefixIndex()}
+        self._specializations = HashIndex()  # Specialization to teacher IDs
+        self._course_types = HashIndex()  # Course type to course IDs
+        self._difficulty_levels = HashIndex()  # Difficulty level to course IDs
+        self._open_courses: Set[str] = set()  # IDs of courses with at least one free seat
+        # Students queued for full courses: a priority queue per course, and the courses each student waits for
+        self._waitlists: Dict[str, Waitlist] = {}
+        self._waiting: Dict[str, Set[str]] = {}
+        # Change counters for response caching: one per collection and one per entity
+        self._collection_versions: Dict[str, int] = {'students': 0, 'teachers': 0, 'courses': 0}
+        self._entity_versions: Dict[str, int] = {}
+        # Changes made since this process started, for clients that sync incrementally
+        self.changes = ChangeLog()
+        # Open read-only views (see snapshot()), and the entities already copied since the newest one was taken
+        self._snapshots: Tuple[Snapshot, ...] = ()
+        self._owned: Set[Tuple[int, str]] = set()
     
     def add_student(self, student: Student) -> str:
         """Add a student and return their ID"""
-        self.students[student.id] = student
+        with self._writing(), self._shared:
+            self.students[student.id] = student
+            self._order['students'].add(student.id)
+            self._index_entity('students', student)
+            self._touch('students', student.id)
+            self._change('created', collection='students', ids=[student.id])
+            self._log('add_student', student)
         return student.id
     
     def add_teacher(self, teacher: Teacher) -> str:
@@ -19,7 +77,13 @@ class University:
         # TODO: Implement add_teacher method
         # 1. Add the teacher to the teachers dictionary using their ID as the key
         # 2. Return the teacher's ID
-        self.teachers[teacher.id] = teacher
+        with self._writing(), self._shared:
+            self.teachers[teacher.id] = teacher
+            self._order['teachers'].add(teacher.id)
+            self._index_entity('teachers', teacher)
+            self._touch('teachers', teacher.id)
+            self._change('created', collection='teachers', ids=[teacher.id])
+            self._log('add_teacher', teacher)
         return teacher.id
     
     def add_course(self, course: Course) -> str:
@@ -27,9 +91,186 @@ class University:
         # TODO: Implement add_course method
         # 1. Add the course to the courses dictionary using its ID as the key
         # 2. Return the course's ID
-        self.courses[course.id] = course
+        with self._writing(), self._shared:
+            self.courses[course.id] = course
+            self._order['courses'].add(course.id)
+            self._index_entity('courses', course)
+            self._touch('courses', course.id)
+            self._change('created', collection='courses', ids=[course.id])
+            self._log('add_course', course)
         return course.id
     
+    def add_students(self, students: List[Student]) -> List[str]:
+        """Add already validated students in one batch and return their IDs"""
+        return self._add_many('students', students, 'add_students')
+
+    def add_teachers(self, teachers: List[Teacher]) -> List[str]:
+        """Add already validated teachers in one batch and return their IDs"""
+        return self._add_many('teachers', teachers, 'add_teachers')
+
+    def add_courses(self, courses: List[Course]) -> List[str]:
+        """Add already validated courses in one batch and return their IDs"""
+        return self._add_many('courses', courses, 'add_courses')
+
+    def _add_many(self, collection: str, entities: List, op: str) -> List[str]:
+        entities = list(entities)
+        mapping = self._collection(collection)
+        order = self._order[collection]
+        ids = []
+        with self._writing(), self._shared:
+            for entity in entities:
+                mapping[entity.id] = entity
+                order.add(entity.id)
+                ids.append(entity.id)
+            self._index_entities(collection, entities)
+            self._touch(collection, *ids)
+            self._change('created', collection=collection, ids=ids)
+            # One journal record for the whole batch
+            self._log(op, entities)
+        return ids
+    
+    def remove_student(self, student_id: str) -> bool:
+        """Delete a student along with their enrollments, grades, attendance and waitlist places"""
+        while True:
+            student = self.students.get(student_id)
+            if student is None:
+                return False
+            course_ids = self._student_course_ids(student)
+            # Courses rank before students, so every course the student appears in is locked up front
+            with self._writing(*(course_key(course_id) for course_id in course_ids), student_key(student_id)):
+                student = self.students.get(student_id)
+                if student is None:
+                    return False
+                if not self._student_course_ids(student) <= course_ids:
+                    continue  # Enrolled somewhere new meanwhile: lock that course too
+                freed = self._remove_student_locked(student)
+                self._log('remove_student', student_id)
+            break
+        if not self._replaying:
+            for course_id in freed:
+                if self._waitlists.get(course_id):
+                    self._promote(course_id)
+        return True
+
+    def _student_course_ids(self, student: Student) -> Set[str]:
+        """Every course holding a link to a student: enrollments, attendance, grades and waitlists"""
+        with self._shared:
+            waiting = set(self._waiting.get(student.id, ()))
+        return set(student.enrolled_courses) | set(student.attendance) | set(student.grades) | waiting
+
+    def _remove_student_locked(self, student: Student) -> List[str]:
+        """Unlink a student from the courses they appear in; returns the courses where a seat was freed"""
+        student_id = student.id
+        freed = [course_id for course_id in student.enrolled_courses if course_id in self.courses]
+        touched = self._student_course_ids(student)
+        for course_id in touched:
+            course = self.courses.get(course_id)
+            if course is not None:
+                course.forget_student(student_id, student.attendance.get(course_id, ()))
+                self._update_open_seats(course)
+        with self._shared:
+            for course_id in self._waiting.pop(student_id, ()):
+                waitlist = self._waitlists.get(course_id)
+                if waitlist is not None:
+                    waitlist.discard(student_id)
+            self._ranking.discard(student_id)
+            self._unindex_entity('students', student)
+            del self.students[student_id]
+            self._order['students'].discard(student_id)
+            self._entity_versions.pop(student_id, None)
+            self._collection_versions['students'] += 1
+        self._locks.discard(student_key(student_id))
+        self._touch('courses', *(course_id for course_id in touched if course_id in self.courses))
+        self._change('deleted', collection='students', ids=[student_id])
+        return freed
+
+    def remove_teacher(self, teacher_id: str) -> bool:
+        """Delete a teacher, leaving the courses they taught without a teacher"""
+        while True:
+            teacher = self.teachers.get(teacher_id)
+            if teacher is None:
+                return False
+            course_ids = set(teacher.assigned_courses)
+            with self._writing(*(course_key(course_id) for course_id in course_ids), teacher_key(teacher_id)):
+                teacher = self.teachers.get(teacher_id)
+                if teacher is None:
+                    return False
+                if not set(teacher.assigned_courses) <= course_ids:
+                    continue  # Assigned to a new course meanwhile: lock that course too
+                self._remove_teacher_locked(teacher)
+                self._log('remove_teacher', teacher_id)
+                return True
+
+    def _remove_teacher_locked(self, teacher: Teacher):
+        teacher_id = teacher.id
+        course_ids = [course_id for course_id in teacher.assigned_courses if course_id in self.courses]
+        for course_id in course_ids:
+            course = self.courses[course_id]
+            if course.teacher_id == teacher_id:
+                course.teacher_id = None
+        with self._shared:
+            self._unindex_entity('teachers', teacher)
+            del self.teachers[teacher_id]
+            self._order['teachers'].discard(teacher_id)
+            self._entity_versions.pop(teacher_id, None)
+            self._collection_versions['teachers'] += 1
+        self._locks.discard(teacher_key(teacher_id))
+        self._touch('courses', *course_ids)
+        self._change('deleted', collection='teachers', ids=[teacher_id])
+
+    def remove_course(self, course_id: str, version: Optional[int] = None) -> bool:
+        """Delete a course along with its enrollments, grades, attendance and waitlist.
+
+        With a version (see version()), the course is only deleted if it has
+        not changed since; otherwise nothing happens and False is returned.
+        """
+        if course_id not in self.courses:
+            return False
+        with self._writing(course_key(course_id)):
+            course = self.courses.get(course_id)
+            if course is None or (version is not None and self._entity_versions.get(course_id, 0) != version):
+                return False
+            # Nobody can join the course while it is locked, so its links are fixed from here on
+            waitlist = self._waitlists.get(course_id)
+            student_ids = (set(course.students) | set(course.attendees()) | set(course.grades)
+                           | set(waitlist.ordered() if waitlist else ()))
+            teacher_keys = [teacher_key(course.teacher_id)] if course.teacher_id else []
+            with self._hold(*(student_key(student_id) for student_id in student_ids), *teacher_keys):
+                self._remove_course_locked(course, student_ids)
+                self._log('remove_course', course_id)
+        return True
+
+    def _remove_course_locked(self, course: Course, student_ids: Set[str]):
+        course_id = course.id
+        touched = []
+        for student_id in student_ids:
+            student = self.students.get(student_id)
+            if student is None:
+                continue
+            student.enrolled_courses.discard(course_id)
+            student.attendance.pop(course_id, None)
+            if course_id in student.grades:
+                student.drop_grade(course_id)
+                self._rank(student)
+            touched.append(student.id)
+        teacher = self.teachers.get(course.teacher_id) if course.teacher_id else None
+        if teacher is not None:
+            teacher.assigned_courses.discard(course_id)
+            self._touch('teachers', teacher.id)
+        with self._shared:
+            waitlist = self._waitlists.pop(course_id, None)
+            if waitlist is not None:
+                for student_id in waitlist.ordered():
+                    self._forget_waiting(student_id, course_id)
+            self._unindex_entity('courses', course)
+            del self.courses[course_id]
+            self._order['courses'].discard(course_id)
+            self._entity_versions.pop(course_id, None)
+            self._collection_versions['courses'] += 1
+        self._locks.discard(course_key(course_id))
+        self._touch('students', *touched)
+        self._change('deleted', collection='courses', ids=[course_id])
+
     def enroll_student(self, student_id: str, course_id: str) -> bool:
         """Enroll a student in a course"""
         # TODO: Implement enroll_student method
@@ -42,18 +283,279 @@ class University:
         if not student_id in self.students or not course_id in self.courses:
             return False
 
+        # The capacity check and the insert must happen under the same course lock
+        with self._writing(course_key(course_id), student_key(student_id)):
+            course = self.courses.get(course_id)
+            student = self.students.get(student_id)
+            if course is None or student is None:
+                return False
+
+            if course.id in student.enrolled_courses:
+                return True
+            # A free seat left by a withdrawal belongs to the waitlist, not to whoever asks first
+            if course.max_capacity <= len(course.students) or self._waitlists.get(course.id):
+                return False
+
+            self._enroll_locked(student, course)
+            self._log('enroll_student', student_id, course_id)
+            return True
+
+    def _enroll_locked(self, student: Student, course: Course):
+        # Store the entities' own ID strings, not the copies that came with the request
+        course.students.add(student.id)
+        student.enroll_in_course(course.id)
+        self._update_open_seats(course)
+        self._touch('students', student.id)
+        self._touch('courses', course.id)
+        self._change('enrolled', student_id=student.id, course_id=course.id)
+
+    def enroll_or_waitlist(self, student_id: str, course_id: str,
+                           priority: Optional[int] = None) -> Tuple[str, Optional[int]]:
+        """Enroll a student, or queue them on the course's waitlist when it is full.
+
+        Higher priorities are promoted first (e.g. seniority), then first come,
+        first served; without an explicit priority the student's own tier
+        (see set_student_priority) is used. Returns ("enrolled", None), ("waitlisted", position) or
+        ("rejected", None) when the student or the course does not exist.
+        """
+        if student_id not in self.students or course_id not in self.courses:
+            return 'rejected', None
+
+        with self._writing(course_key(course_id), student_key(student_id)):
+            course = self.courses.get(course_id)
+            student = self.students.get(student_id)
+            if course is None or student is None:
+                return 'rejected', None
+            already_enrolled = course.id in student.enrolled_courses
+            status, position = self._enroll_or_waitlist_locked(student, course, priority)
+            if status == 'waitlisted':
+                self._log('enroll_or_waitlist', student_id, course_id, priority)
+            elif not already_enrolled:
+                self._log('enroll_student', student_id, course_id)
+            seat_free = len(course.students) < course.max_capacity
+        if status == 'waitlisted' and seat_free and not self._replaying:
+            # Queued behind a promotion still in flight; make sure the free seat is handed out
+            self._promote(course_id)
+            position = self.get_waitlist_position(student_id, course_id)
+            if position is None:
+                return 'enrolled', None
+        return status, position
+
+    def _enroll_or_waitlist_locked(self, student: Student, course: Course,
+                                   priority: Optional[int]) -> Tuple[str, Optional[int]]:
+        if course.id in student.enrolled_courses:
+            return 'enrolled', None
+        if priority is None:
+            priority = student.priority
+        waitlist = self._waitlists.get(course.id)
+        if len(course.students) < course.max_capacity and not waitlist:
+            self._enroll_locked(student, course)
+            return 'enrolled', None
+        if waitlist is None:
+            waitlist = self._waitlists[course.id] = Waitlist()
+        position = waitlist.add(student.id, priority)
+        with self._shared:
+            self._waiting.setdefault(student.id, set()).add(course.id)
+        self._change('waitlisted', student_id=student.id, course_id=course.id, priority=priority, position=position)
+        return 'waitlisted', position
+
+    def enroll_requests(self, course_id: str,
+                        requests: List[Tuple[str, Optional[int]]]) -> List[Tuple[str, Optional[int]]]:
+        """Apply many (student_id, priority) enrollment requests for one course in a single pass.
+
+        A priority of None stands for the student's own tier.
+        Requests are handled in order exactly as enroll_or_waitlist would,
+        but the course is locked once and the batch is journaled as one
+        record. Returns one (status, position) per request.
+        """
+        requests = list(requests)
+        if course_id not in self.courses:
+            return [('rejected', None)] * len(requests)
+        keys = [student_key(student_id) for student_id, _ in requests if student_id in self.students]
+        with self._writing(course_key(course_id), *keys):
+            course = self.courses.get(course_id)
+            if course is None:
+                return [('rejected', None)] * len(requests)
+            results = []
+            for student_id, priority in requests:
+                student = self.students.get(student_id)
+                if student is None:
+                    results.append(('rejected', None))
+                else:
+                    results.append(self._enroll_or_waitlist_locked(student, course, priority))
+            self._log('enroll_requests', course_id, requests)
+            seat_free = len(course.students) < course.max_capacity
+        if seat_free and self._waitlists.get(course_id) and not self._replaying:
+            self._promote(course_id)
+            for i, (student_id, _) in enumerate(requests):
+                if results[i][0] == 'waitlisted':
+                    position = self.get_waitlist_position(student_id, course_id)
+                    results[i] = ('waitlisted', position) if position is not None else ('enrolled', None)
+        return results
+
+    def set_student_priority(self, student_id: str, priority: int) -> bool:
+        """Set the waitlist tier a student joins full courses with; places already held keep theirs"""
+        if not isinstance(priority, int) or isinstance(priority, bool):
+            raise ValueError("Priority must be an integer")
+        with self._writing(student_key(student_id)):
+            student = self.students.get(student_id)
+            if student is None:
+                return False
+            student.priority = priority
+            self._touch('students', student.id)
+            self._change('priority_set', student_id=student.id, priority=priority)
+            self._log('set_student_priority', student_id, priority)
+            return True
+
+    def leave_waitlist(self, student_id: str, course_id: str) -> bool:
+        """Take a student off a course's waitlist"""
+        with self._writing(course_key(course_id), student_key(student_id)):
+            waitlist = self._waitlists.get(course_id)
+            if waitlist is None or not waitlist.discard(student_id):
+                return False
+            self._forget_waiting(student_id, course_id)
+            self._change('left_waitlist', student_id=student_id, course_id=course_id)
+            self._log('leave_waitlist', student_id, course_id)
+            return True
+
+    def _forget_waiting(self, student_id: str, course_id: str):
+        with self._shared:
+            courses = self._waiting.get(student_id)
+            if courses is not None:
+                courses.discard(course_id)
+                if not courses:
+                    del self._waiting[student_id]
+            if not self._waitlists.get(course_id, True):
+                del self._waitlists[course_id]
+
+    def _promote(self, course_id: str):
+        """Hand the free seats of a course to the head of its waitlist.
+
+        Called once the caller has released its locks: the course is locked
+        first and then each promoted student, which keeps the global lock order.
+        """
+        while True:
+            with self._writing(course_key(course_id)):
+                course = self.courses.get(course_id)
+                waitlist = self._waitlists.get(course_id)
+                if course is None or not waitlist or len(course.students) >= course.max_capacity:
+                    return
+                student_id = waitlist.peek()
+                with self._hold(student_key(student_id)):
+                    self._promote_waitlisted(course_id, student_id)
+
+    def _promote_waitlisted(self, course_id: str, student_id: str):
+        """Move one student from the waitlist into the course (journaled, and replayed from the journal)"""
         course = self.courses[course_id]
-        student = self.students[student_id]
+        self._waitlists[course_id].discard(student_id)
+        self._forget_waiting(student_id, course_id)
+        student = self.students.get(student_id)
+        # Someone who got in by other means meanwhile just leaves the queue
+        if student is not None and course_id not in student.enrolled_courses:
+            self._enroll_locked(student, course)
+        else:
+            self._change('left_waitlist', student_id=student_id, course_id=course_id)
+        self._log('_promote_waitlisted', course_id, student_id)
 
-        if course.max_capacity <= len(course.students):
-            return False
+    @contextmanager
+    def course_locked(self, course_id: str) -> Iterator[Optional[Course]]:
+        """Hold a course's lock to read it (and its version) consistently; yields None if there is no such course"""
+        with self._locks.hold(course_key(course_id)):
+            yield self.courses.get(course_id)
 
-        course.students.add(student_id)
-        student.enroll_in_course(course_id)
-        return True
+    def get_waitlist(self, course_id: str) -> Optional[List[Dict]]:
+        """Get the students waiting for a course, in promotion order"""
+        if course_id not in self.courses:
+            return None
+        with self._locks.hold(course_key(course_id)):
+            waitlist = self._waitlists.get(course_id)
+            if waitlist is None:
+                return []
+            return [
+                {'student_id': student_id, 'position': position, 'priority': waitlist.priority(student_id)}
+                for position, student_id in enumerate(waitlist.ordered(), 1)
+            ]
 
+    def get_waitlist_position(self, student_id: str, course_id: str) -> Optional[int]:
+        """Get a student's 1-based place on a course's waitlist, or None if they are not waiting"""
+        waitlist = self._waitlists.get(course_id)
+        if waitlist is None:
+            return None
+        with self._locks.hold(course_key(course_id)):
+            return waitlist.position(student_id)
 
+    def get_student_waitlists(self, student_id: str) -> Optional[Dict[str, int]]:
+        """Get a student's place on every waitlist they are on, by course ID"""
+        if student_id not in self.students:
+            return None
+        positions = {}
+        for course_id in list(self._waiting.get(student_id, ())):
+            position = self.get_waitlist_position(student_id, course_id)
+            if position is not None:
+                positions[course_id] = position
+        return positions
     
+    def enroll_batch(self, pairs: List[Tuple[str, str]]) -> List[Dict[str, str]]:
+        """Enroll many (student_id, course_id) pairs, all or nothing.
+
+        Capacity is checked once per affected course for the whole batch.
+        Returns the rejected pairs with a reason; when the list is empty every
+        pair was applied, otherwise nothing was.
+        """
+        pairs = list(pairs)
+        keys = [course_key(course_id) for _, course_id in pairs if course_id in self.courses]
+        keys += [student_key(student_id) for student_id, _ in pairs if student_id in self.students]
+        with self._writing(*keys):
+            return self._enroll_batch_locked(pairs)
+
+    def _enroll_batch_locked(self, pairs: List[Tuple[str, str]]) -> List[Dict[str, str]]:
+        rejected = []
+        accepted: List[Tuple[str, str]] = []
+        seen: Set[Tuple[str, str]] = set()
+        requested: Dict[str, int] = {}  # Course ID to seats needed by this batch
+        for student_id, course_id in pairs:
+            reason = None
+            if student_id not in self.students:
+                reason = "student not found"
+            elif course_id not in self.courses:
+                reason = "course not found"
+            elif course_id in self.students[student_id].enrolled_courses:
+                reason = "already enrolled"
+            elif self._waitlists.get(course_id):
+                # As in enroll_student: seats freed while students wait belong to the head of the waitlist
+                reason = "course has a waitlist"
+            elif (student_id, course_id) in seen:
+                reason = "duplicate pair"
+            if reason:
+                rejected.append({'student_id': student_id, 'course_id': course_id, 'reason': reason})
+                continue
+            seen.add((student_id, course_id))
+            accepted.append((student_id, course_id))
+            requested[course_id] = requested.get(course_id, 0) + 1
+
+        for course_id, seats in requested.items():
+            course = self.courses[course_id]
+            if len(course.students) + seats > course.max_capacity:
+                rejected.extend(
+                    {'student_id': student_id, 'course_id': course_id, 'reason': "course is full"}
+                    for student_id, pair_course_id in accepted if pair_course_id == course_id
+                )
+        if rejected:
+            return rejected
+
+        for student_id, course_id in accepted:
+            course = self.courses[course_id]
+            student = self.students[student_id]
+            course.students.add(student.id)
+            student.enroll_in_course(course.id)
+            self._change('enrolled', student_id=student.id, course_id=course.id)
+        for course_id in requested:
+            self._update_open_seats(self.courses[course_id])
+        self._touch('students', *{student_id for student_id, _ in accepted})
+        self._touch('courses', *requested)
+        self._log('enroll_batch', accepted)
+        return []
+
     def assign_teacher(self, teacher_id: str, course_id: str) -> bool:
         """Assign a teacher to a course"""
         # TODO: Implement assign_teacher method
@@ -65,17 +567,34 @@ class University:
         if teacher_id not in self.teachers or course_id not in self.courses:
             return False
 
-        course = self.courses[course_id]
-        teacher = self.teachers[teacher_id]
+        with self._writing(course_key(course_id)):
+            course = self.courses.get(course_id)
+            if course is None:
+                return False
+            # Teachers rank after courses, so their locks can be taken once the course is held
+            with self._hold(teacher_key(teacher_id), *([teacher_key(course.teacher_id)] if course.teacher_id else [])):
+                return self._assign_teacher_locked(course, teacher_id)
+
+    def _assign_teacher_locked(self, course: Course, teacher_id: str) -> bool:
+        teacher = self.teachers.get(teacher_id)
+        if teacher is None:
+            return False
+        course_id = course.id
 
         #using teacher methods for easier handling
-        if course.teacher_id:
-            previous_teacher = self.teachers[course.teacher_id]
+        previous_teacher_id = course.teacher_id
+        if previous_teacher_id:
+            previous_teacher = self.teachers[previous_teacher_id]
             previous_teacher.remove_course(course_id)
 
-        course.teacher_id = teacher_id
+        course.teacher_id = teacher.id
 
-        teacher.assign_course(course_id)
+        teacher.assign_course(course.id)
+        self._touch('teachers', *filter(None, (previous_teacher_id, teacher.id)))
+        self._touch('courses', course.id)
+        self._change('teacher_assigned', course_id=course_id, teacher_id=teacher.id,
+                     previous_teacher_id=previous_teacher_id)
+        self._log('assign_teacher', teacher_id, course_id)
         return True
     
     def withdraw_student(self, student_id: str, course_id: str) -> bool:
@@ -89,14 +608,30 @@ class University:
         if not student_id in self.students or not course_id in self.courses:
             return False
 
-        course = self.courses[course_id]
-        student = self.students[student_id]
+        with self._writing(course_key(course_id), student_key(student_id)):
+            course = self.courses.get(course_id)
+            student = self.students.get(student_id)
+            if course is None or student is None:
+                return False
+            withdrawn = self._withdraw_locked(student, course)
+        # Promotions are journaled on their own, so replaying the withdrawal must not promote again
+        if withdrawn and self._waitlists.get(course_id) and not self._replaying:
+            self._promote(course_id)
+        return withdrawn
 
+    def _withdraw_locked(self, student: Student, course: Course) -> bool:
+        student_id, course_id = student.id, course.id
         if course_id not in student.enrolled_courses:
             return False
 
         course.students.remove(student_id)
         student.withdraw_from_course(course_id)
+        self._update_open_seats(course)
+        # The grade stays in both the course's grade book and the student's transcript, so the two always agree
+        self._touch('students', student.id)
+        self._touch('courses', course.id)
+        self._change('withdrawn', student_id=student_id, course_id=course_id)
+        self._log('withdraw_student', student_id, course_id)
         return True
     
     def get_course_roster(self, course_id: str) -> Optional[List[Dict]]:
@@ -160,9 +695,139 @@ class University:
         # 3. Return True if successful, False otherwise
         if not course_id in self.courses:
             return False
-        course = self.courses[course_id]
-        course.take_attendance(date,present_student_ids)
+        try:
+            day = as_date(date)
+        except ValueError:
+            return False
+        with self._writing(course_key(course_id)):
+            course = self.courses.get(course_id)
+            if course is None:
+                return False
+            previous = course.present_students(day) or set()
+            # Students whose own attendance view changes are locked after the course
+            changed = (previous ^ present_student_ids) if isinstance(present_student_ids, set) else set()
+            with self._hold(*(student_key(student_id) for student_id in changed if student_id in self.students)):
+                if not self._record_attendance_locked(course, day, previous, present_student_ids):
+                    return False
+                self._log('record_attendance', course_id, day, present_student_ids)
+                return True
+
+    def _record_attendance_locked(self, course: Course, day: date, previous: Set[str],
+                                  present_student_ids: Set[str]) -> bool:
+        course_id = course.id
+        if not course.take_attendance(day, present_student_ids):
+            return False
+
+        # Keep each student's own date-ordered view in step with the course
+        for student_id in previous - present_student_ids:
+            if student_id in self.students:
+                self.students[student_id].unmark_present(course_id, day)
+        for student_id in present_student_ids - previous:
+            if student_id in self.students:
+                self.students[student_id].mark_present(course_id, day)
+        self._touch('students', *(previous ^ present_student_ids))
+        self._touch('courses', course.id)
+        self._change('attendance', course_id=course_id, date=day.isoformat(),
+                     marked_present=sorted(present_student_ids - previous),
+                     marked_absent=sorted(previous - present_student_ids))
         return True
+
+    def record_attendance_sheet(self, course_id: str, sheet: Dict[Any, Iterable[str]]) -> Optional[List[Dict[str, str]]]:
+        """Record attendance for many dates of one course at once, all or nothing.
+
+        `sheet` maps each date to the students present that day. Returns the
+        rejected entries with their reasons (nothing is recorded unless the
+        list is empty), or None if the course does not exist.
+        """
+        if course_id not in self.courses:
+            return None
+        with self._writing(course_key(course_id)):
+            course = self.courses.get(course_id)
+            if course is None:
+                return None
+            rejected, days = self._check_attendance_sheet(course, sheet)
+            if rejected:
+                return rejected
+            previous = {day: course.present_students(day) or set() for day in days}
+            changed = set().union(*(previous[day] ^ present for day, present in days.items()))
+            with self._hold(*(student_key(student_id) for student_id in changed if student_id in self.students)):
+                for day, present in days.items():
+                    self._record_attendance_locked(course, day, previous[day], present)
+                # One journal record for the whole sheet
+                self._log('record_attendance_sheet', course_id, days)
+        return []
+
+    def _check_attendance_sheet(self, course: Course, sheet: Dict[Any, Iterable[str]]) -> Tuple[List[Dict[str, str]], Dict[date, Set[str]]]:
+        """Validate a whole sheet against the roster: one set difference per date instead of a lookup per student"""
+        rejected = []
+        days: Dict[date, Set[str]] = {}
+        enrolled = set(course.students)
+        for raw_day, present in sheet.items():
+            try:
+                day = as_date(raw_day)
+            except (ValueError, TypeError):
+                rejected.append({'date': str(raw_day), 'reason': "invalid date"})
+                continue
+            if not isinstance(present, (list, tuple, set, frozenset)):
+                rejected.append({'date': day.isoformat(), 'reason': "present students must be a list of IDs"})
+                continue
+            present = set(present)
+            if not all(isinstance(student_id, str) for student_id in present):
+                rejected.append({'date': day.isoformat(), 'reason': "student IDs must be strings"})
+                continue
+            if day in days:
+                rejected.append({'date': day.isoformat(), 'reason': "duplicate date"})
+                continue
+            rejected.extend(
+                {'date': day.isoformat(), 'student_id': student_id, 'reason': "student not enrolled"}
+                for student_id in sorted(present - enrolled)
+            )
+            days[day] = present
+        return rejected, days
+
+    def get_course_attendance(self, course_id: str, start: Optional[date] = None, end: Optional[date] = None,
+                              last: Optional[int] = None) -> Optional[List[Dict]]:
+        """Get the sessions of a course within a date window, or its last N sessions"""
+        if course_id not in self.courses:
+            return None
+        course = self.courses[course_id]
+        if last is not None:
+            days = [day for day in course.last_sessions(last)
+                    if (start is None or day >= as_date(start)) and (end is None or day <= as_date(end))]
+        else:
+            days = course.sessions_between(start, end)
+        return [
+            {'date': day.isoformat(), 'present': sorted(course.present_students(day)), 'headcount': course.headcount(day)}
+            for day in days
+        ]
+
+    def get_student_attendance(self, student_id: str, course_id: Optional[str] = None,
+                               start: Optional[date] = None, end: Optional[date] = None) -> Optional[Dict[str, List[str]]]:
+        """Get the dates a student was present, per course, within a date window"""
+        if student_id not in self.students:
+            return None
+        student = self.students[student_id]
+        start = as_date(start) if start is not None else None
+        end = as_date(end) if end is not None else None
+        course_ids = [course_id] if course_id is not None else list(student.attendance)
+        return {
+            cid: [day.isoformat() for day in student.attendance_between(cid, start, end)]
+            for cid in course_ids
+        }
+    
+    def get_attendance_stats(self, course_id: str, below: Optional[float] = None) -> Optional[Dict]:
+        """Get per-session headcounts and per-student attendance rates for a course"""
+        if course_id not in self.courses:
+            return None
+        course = self.courses[course_id]
+        stats = {
+            'sessions': len(course.attendance),
+            'headcounts': {day.isoformat(): course.headcount(day) for day in course.sessions_between()},
+            'rates': course.attendance_rates(),
+        }
+        if below is not None:
+            stats['below'] = course.students_below(below)
+        return stats
     
     def assign_grade(self, course_id: str, student_id: str, grade: float) -> bool:
         """Assign a grade to a student for a course"""
@@ -172,10 +837,72 @@ class University:
         # 3. Return True if successful, False otherwise
         if not course_id in self.courses or not student_id in self.students:
             return False
-        course = self.courses[course_id]
-        course.assign_grade(student_id, grade)
-        return True
+        with self._writing(course_key(course_id), student_key(student_id)):
+            course = self.courses.get(course_id)
+            student = self.students.get(student_id)
+            if course is None or student is None:
+                return False
+            if not course.assign_grade(student.id, grade):
+                return False
+            student.record_grade(course.id, grade)
+            self._rank(student)
+            self._touch('students', student.id)
+            self._touch('courses', course.id)
+            self._change('graded', course_id=course.id, student_id=student.id, grade=grade)
+            self._log('assign_grade', course_id, student_id, grade)
+            return True
             
+    def assign_grades(self, course_id: str, grades: Dict[str, float]) -> Optional[List[Dict[str, Any]]]:
+        """Assign a whole gradebook (student ID to grade) for one course, all or nothing.
+
+        Returns the rejected entries with their reasons (nothing is assigned
+        unless the list is empty), or None if the course does not exist.
+        """
+        if course_id not in self.courses:
+            return None
+        keys = [student_key(student_id) for student_id in grades if student_id in self.students]
+        with self._writing(course_key(course_id), *keys):
+            course = self.courses.get(course_id)
+            if course is None:
+                return None
+            rejected, accepted = self._check_grades(course, grades)
+            if rejected:
+                return rejected
+            for student_id, grade in accepted.items():
+                student = self.students[student_id]
+                course.grades[student.id] = grade
+                student.record_grade(course.id, grade)
+                self._rank(student)
+                self._change('graded', course_id=course.id, student_id=student.id, grade=grade)
+            self._touch('students', *accepted)
+            self._touch('courses', course.id)
+            # One journal record for the whole gradebook
+            self._log('assign_grades', course_id, accepted)
+        return []
+
+    def _check_grades(self, course: Course, grades: Dict[str, float]) -> Tuple[List[Dict[str, Any]], Dict[str, float]]:
+        """Apply Course.assign_grade's rules to a whole gradebook, with the range check done in one vectorized pass"""
+        rejected = []
+        candidates: Dict[str, float] = {}
+        for student_id, grade in grades.items():
+            reason = None
+            if student_id not in self.students:
+                reason = "student not found"
+            elif student_id not in course.students:
+                reason = "student not enrolled"
+            elif not isinstance(grade, (int, float)) or isinstance(grade, bool):
+                reason = "grade must be a number"
+            if reason:
+                rejected.append({'student_id': student_id, 'grade': grade, 'reason': reason})
+            else:
+                candidates[student_id] = grade
+        ids = list(candidates)
+        for position in out_of_range(list(candidates.values())):
+            student_id = ids[position]
+            rejected.append({'student_id': student_id, 'grade': candidates.pop(student_id),
+                             'reason': "grade must be between 0 and 100"})
+        return rejected, candidates
+
     def get_course_grades(self, course_id: str) -> Optional[Dict[str, float]]:
         """Get all grades for a course"""
         # TODO: Implement get_course_grades method
@@ -186,20 +913,368 @@ class University:
         course = self.courses[course_id]
         return course.grades.copy() #return copy to ensure safety
     
+    def get_course_grade_stats(self, course_id: str) -> Optional[Dict]:
+        """Get mean, median, spread, percentiles and histogram of a course's grades"""
+        if course_id not in self.courses:
+            return None
+        return grade_stats(self.courses[course_id].grades.values_array)
+
+    def get_grade_report(self) -> Dict:
+        """Get university-wide grade statistics plus running count/mean/std per course"""
+        return grade_report({course_id: course.grades for course_id, course in list(self.courses.items())})
+    
     def get_student_grades(self, student_id: str) -> Optional[Dict[str, float]]:
         """Get all grades for a student across all courses"""
         # TODO: Implement get_student_grades method
         # 1. Check if student_id exists
         # 2. Get student's grades from all enrolled courses
         # 3. Return dictionary mapping course IDs to grades
+        if student_id not in self.students:
+            return None
+        # Served from the student's own grade index, which only holds graded courses
+        return self.students[student_id].grades.copy()
+
+    def get_transcript(self, student_id: str) -> Optional[Dict]:
+        """Get a student's graded courses, GPA and class rank"""
         if student_id not in self.students:
             return None
         student = self.students[student_id]
-        all_grades: dict = {}
-        for course_id in student.enrolled_courses:
-            if course_id in self.courses: # avoid KeyError
-                course = self.courses[course_id]
-                all_grades[course_id] = course.grades[student_id]
+        courses = []
+        for course_id, grade in student.grades.items():
+            course = self.courses.get(course_id)
+            courses.append({'course_id': course_id, 'name': course.name if course else None, 'grade': grade})
+        return {
+            'student_id': student_id,
+            'courses': courses,
+            'gpa': student.gpa(),
+            'rank': self._ranking.rank(student_id),
+            'ranked_students': len(self._ranking),
+        }
+
+    def get_top_students(self, k: int) -> List[Dict]:
+        """Get the k students with the highest GPA"""
+        return [
+            {'student_id': student_id, 'name': self.students[student_id].name, 'gpa': gpa}
+            for student_id, gpa in self._ranking.top(k)
+        ]
+
+    def iter_entities(self, collection: str, after: Optional[str] = None) -> Iterator:
+        """Yield the entities of a collection in stable order, starting after a cursor"""
+        entities = self._collection(collection)
+        ids = self._order[collection].iter_after(after)
+        return (entities[entity_id] for entity_id in ids if entity_id in entities)
+
+    def page(self, collection: str, limit: int, after: Optional[str] = None) -> Tuple[List, Optional[str]]:
+        """Return one page of a collection and the cursor of the next page"""
+        entities = self._collection(collection)
+        ids, next_cursor = self._order[collection].page(limit, after)
+        return [entities[entity_id] for entity_id in ids], next_cursor
+
+    def _collection(self, collection: str) -> Dict:
+        """Look up one of the students/teachers/courses dictionaries by name"""
+        if collection not in self._order:
+            raise ValueError(f"Unknown collection: {collection}")
+        return getattr(self, collection)
+
+    @classmethod
+    def open(cls, storage: Storage) -> 'University':
+        """Rebuild a University from its storage: load the latest snapshot, then replay the journal tail"""
+        university = cls(storage)
+        started = time.perf_counter()
+        state, records = storage.load()
+        if state is not None:
+            university.__dict__.update(state)
+        loaded = time.perf_counter()
+
+        replayed = 0
+        university._replaying = True
+        try:
+            for op, args in records:
+                getattr(university, op)(*args)
+                replayed += 1
+        finally:
+            university._replaying = False
+
+        university.recovery_stats = {
+            'snapshot_seconds': loaded - started,
+            'replay_seconds': time.perf_counter() - loaded,
+            'replayed_records': replayed,
+        }
+        return university
+
+    def checkpoint(self, background: bool = False):
+        """Write a snapshot of the whole state so that restarts skip the journal written so far.
+
+        Mutations pause only while a Snapshot is opened, the indexes and
+        counters are copied and the journal moves to a new generation; the
+        entities are then pickled from the Snapshot, in a background thread
+        if asked. One checkpoint is written at a time: a background request
+        made while another is running is dropped, and the journal asks again.
+        """
+        if not self._checkpointing.acquire(blocking=not background):
+            return
+        try:
+            with self._world.exclusive(), self._shared:
+                if background and not self._checkpoint_due:
+                    self._checkpointing.release()  # Another thread took the checkpoint in the meantime
+                    return
+                self._checkpoint_due = False
+                view = self._open_snapshot()
+                state = self._checkpoint_state()
+                generation = self.storage.begin_snapshot()
+        except BaseException:
+            self._checkpointing.release()
+            raise
+        if background:
+            threading.Thread(target=self._write_checkpoint, args=(view, state, generation),
+                             name='checkpoint', daemon=True).start()
+        else:
+            self._write_checkpoint(view, state, generation)
+
+    def _checkpoint_state(self) -> Dict[str, Any]:
+        """Copy everything but the entities, which come from a Snapshot, with mutations paused"""
+        state = {}
+        for key, value in vars(self).items():
+            # Instance attributes shadowing methods (such as metric timers) are process state too
+            if key in self._TRANSIENT or hasattr(type(self), key) or key in self._order:
+                continue
+            if isinstance(value, dict):
+                value = {name: self._detached(item) for name, item in value.items()}
+            state[key] = self._detached(value)
+        return state
+
+    @staticmethod
+    def _detached(value):
+        """Copy a mutable piece of state; anything else (counters) is immutable"""
+        if isinstance(value, (int, str)):
+            return value
+        if isinstance(value, (set, dict)):
+            return type(value)(value)
+        return value.clone() if hasattr(value, 'clone') else value
+
+    def _write_checkpoint(self, view: Snapshot, state: Dict[str, Any], generation: int):
+        try:
+            # The view stays open until the pickle is written: it is what keeps writers off these entities
+            with view:
+                for collection in self._order:
+                    state[collection] = {entity.id: entity for entity in view.iter_entities(collection)}
+                self.storage.write_snapshot(state, generation)
+        finally:
+            self._checkpointing.release()
+
+    def snapshot(self) -> Snapshot:
+        """Open a point-in-time, read-only view of the students, teachers and courses.
+
+        Nothing is copied up front; mutations pause only while the view is
+        registered. Close it (or use it as a context manager) once done.
+        """
+        with self._world.exclusive(), self._shared:
+            return self._open_snapshot()
+
+    def _open_snapshot(self) -> Snapshot:
+        view = Snapshot(self, {collection: order.end() for collection, order in self._order.items()},
+                        {collection: len(order) for collection, order in self._order.items()})
+        self._snapshots = self._snapshots + (view,)
+        # Copies made for older snapshots are part of the new one, so they must be copied again
+        self._owned = set()
+        return view
+
+    def snapshot_stats(self) -> Dict[str, int]:
+        """Number of open snapshots, and of entity versions kept alive for them"""
+        snapshots = self._snapshots
+        return {
+            'open': len(snapshots),
+            'preserved': sum(sum(view.stats()['preserved'].values()) for view in snapshots),
+        }
+
+    def _release_snapshot(self, view: Snapshot):
+        with self._shared:
+            self._snapshots = tuple(other for other in self._snapshots if other is not view)
+            if not self._snapshots:
+                self._owned = set()
+
+    def _unshare(self, keys):
+        """Copy-on-write: give open snapshots the current objects of entities about to change.
+
+        Runs with the entities' locks held, before the mutation reads them.
+        Each entity is copied at most once per snapshot generation, and only
+        when an open snapshot can see it.
+        """
+        snapshots, owned = self._snapshots, self._owned
+        for key in keys:
+            if key in owned:
+                continue
+            rank, entity_id = key
+            collection = 'courses' if rank == COURSE else 'students' if rank == STUDENT else 'teachers'
+            mapping = getattr(self, collection)
+            entity = mapping.get(entity_id)
+            if entity is None:
+                continue
+            with self._shared:
+                position = self._order[collection].find(entity_id)
+                owned.add(key)
+                if position is None:
+                    continue
+                needed = [view.preserve(collection, entity, position) for view in snapshots]
+            if any(needed):
+                # Readers of the snapshot now find the original among its preserved entities
+                mapping[entity_id] = entity.clone()
+
+    @contextmanager
+    def _hold(self, *keys):
+        """Hold further entity locks inside a mutation, copying the entities for open snapshots first"""
+        with self._locks.hold(*keys):
+            if self._snapshots:
+                self._unshare(keys)
+            yield
+
+    @contextmanager
+    def _writing(self, *keys):
+        """Hold the locks of a mutation: the shared world lock, then the given entity locks"""
+        with self._world.shared(), self._locks.hold(*keys):
+            if self._snapshots:
+                self._unshare(keys)
+            yield
+        # A snapshot requested by the journal is started once this thread holds no locks
+        if self._checkpoint_due and not self._world.held_shared():
+            self.checkpoint(background=True)
+
+    def close(self):
+        """Finish a checkpoint being written, flush pending journal records and release the storage"""
+        with self._checkpointing:
+            self.storage.close()
+
+    def version(self, collection: str, entity_id: Optional[str] = None) -> int:
+        """Return the change counter of a collection, or of one entity in it"""
+        if entity_id is None:
+            return self._collection_versions[collection]
+        return self._entity_versions.get(entity_id, 0)
+
+    def _touch(self, collection: str, *entity_ids: str):
+        """Bump the change counters of a collection and of the given entities, after they changed"""
+        if not entity_ids:
+            return
+        with self._shared:
+            self._collection_versions[collection] += 1
+            versions = self._entity_versions
+            for entity_id in entity_ids:
+                versions[entity_id] = versions.get(entity_id, 0) + 1
+
+    def _change(self, change_type: str, **fields):
+        """Publish a completed mutation to the change feed (not while replaying: the feed is per process)"""
+        if not self._replaying:
+            self.changes.record(change_type, **fields)
+
+    def _log(self, op: str, *args):
+        """Hand a completed mutation to the storage engine"""
+        if self._replaying:
+            return
+        with self._shared:
+            self.storage.append(op, args)
+            if self.storage.should_snapshot():
+                self._checkpoint_due = True
+
+    def _rank(self, student: Student):
+        """Move a student to their current GPA in the class ranking"""
+        with self._shared:
+            self._ranking.update(student.id, student.gpa())
+
+    def find_students(self, email: Optional[str] = None, name_prefix: Optional[str] = None) -> List[Student]:
+        """Find students by email and/or name prefix using the secondary indexes"""
+        return self._find_people('students', email, name_prefix)
+
+    def find_teachers(self, email: Optional[str] = None, name_prefix: Optional[str] = None,
+                      specialization: Optional[str] = None) -> List[Teacher]:
+        """Find teachers by email, name prefix and/or specialization using the secondary indexes"""
+        candidates = [self._specializations.get(specialization)] if specialization is not None else []
+        return self._find_people('teachers', email, name_prefix, candidates)
+
+    def find_courses(self, course_type: Optional[str] = None, difficulty_level: Optional[str] = None,
+                     open_only: bool = False, min_free_seats: int = 0) -> List[Course]:
+        """Find courses by type, difficulty level and free capacity using the secondary indexes"""
+        candidates = []
+        if course_type is not None:
+            candidates.append(self._course_types.get(course_type))
+        if difficulty_level is not None:
+            candidates.append(self._difficulty_levels.get(difficulty_level))
+        if open_only or min_free_seats > 0:
+            candidates.append(self._open_courses)
+        courses = [self.courses[course_id] for course_id in self._intersect(candidates, 'courses')]
+        if min_free_seats > 1:
+            courses = [course for course in courses if course.max_capacity - len(course.students) >= min_free_seats]
+        return courses
+
+    def _find_people(self, collection: str, email: Optional[str], name_prefix: Optional[str],
+                     candidates: Optional[List[Set[str]]] = None) -> List:
+        candidates = list(candidates or [])
+        if email is not None:
+            candidates.append(self._emails[collection].get(email.casefold()))
+        if name_prefix is not None:
+            candidates.append(set(self._names[collection].search(name_prefix)))
+        mapping = self._collection(collection)
+        return [mapping[entity_id] for entity_id in self._intersect(candidates, collection)]
+
+    def _intersect(self, candidates: List[Set[str]], collection: str) -> List[str]:
+        """Intersect candidate ID sets, smallest first, and return the result in listing order"""
+        if not candidates:
+            return list(self._order[collection].iter_after())
+        candidates.sort(key=len)
+        matches = set(candidates[0])
+        for other in candidates[1:]:
+            matches &= other
+        mapping = self._collection(collection)
+        return sorted((entity_id for entity_id in matches if entity_id in mapping),
+                      key=self._order[collection].position)
+
+    def _index_entities(self, collection: str, entities: List):
+        """Add a batch of newly stored entities to the secondary indexes, merging the name index once"""
+        if collection == 'courses':
+            for entity in entities:
+                self._index_entity(collection, entity)
+            return
+        names = []
+        for entity in entities:
+            self._index_entity(collection, entity, names)
+        self._names[collection].add_many(names)
+
+    def _index_entity(self, collection: str, entity, names: Optional[List[Tuple[str, str]]] = None):
+        """Add a newly stored entity to the secondary indexes (its name goes to `names` instead, if given)"""
+        if collection == 'courses':
+            self._course_types.add(entity.course_type, entity.id)
+            if entity.difficulty_level is not None:
+                self._difficulty_levels.add(entity.difficulty_level, entity.id)
+            self._update_open_seats(entity)
+            return
+        email = entity.contact_info.get('email')
+        if isinstance(email, str):
+            self._emails[collection].add(email.casefold(), entity.id)
+        if names is None:
+            self._names[collection].add(entity.name, entity.id)
+        else:
+            names.append((entity.name, entity.id))
+        if collection == 'teachers' and isinstance(entity.specializations, list):
+            for specialization in entity.specializations:
+                self._specializations.add(specialization, entity.id)
 
-        return all_grades
+    def _unindex_entity(self, collection: str, entity):
+        """Remove a deleted entity from the secondary indexes"""
+        if collection == 'courses':
+            self._course_types.remove(entity.course_type, entity.id)
+            if entity.difficulty_level is not None:
+                self._difficulty_levels.remove(entity.difficulty_level, entity.id)
+            self._open_courses.discard(entity.id)
+            return
+        email = entity.contact_info.get('email')
+        if isinstance(email, str):
+            self._emails[collection].remove(email.casefold(), entity.id)
+        self._names[collection].remove(entity.name, entity.id)
+        if collection == 'teachers' and isinstance(entity.specializations, list):
+            for specialization in entity.specializations:
+                self._specializations.remove(specialization, entity.id)
 
+    def _update_open_seats(self, course: Course):
+        with self._shared:
+            if len(course.students) < course.max_capacity:
+                self._open_courses.add(course.id)
+            else:
+                self._open_courses.discard(course.id)
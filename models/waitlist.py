@@ -0,0 +1,174 @@
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+
+class _Tier:
+    """Members of one priority level, counted by arrival number in a Fenwick tree.
+
+    Arrival numbers start at 1 and only grow; `rank` counts the members that
+    arrived up to a given number in O(log n). The tree doubles in size when
+    it fills up.
+    """
+
+    __slots__ = ('_tree', '_live', 'arrivals', 'count')
+
+    def __init__(self, capacity: int = 16):
+        self._tree = [0] * (capacity + 1)  # 1-based
+        self._live = bytearray(capacity + 1)
+        self.arrivals = 0
+        self.count = 0
+
+    def clone(self) -> '_Tier':
+        clone = _Tier(0)
+        clone._tree = list(self._tree)
+        clone._live = bytearray(self._live)
+        clone.arrivals = self.arrivals
+        clone.count = self.count
+        return clone
+
+    def append(self) -> int:
+        """Count a new member and return their arrival number"""
+        self.arrivals += 1
+        if self.arrivals >= len(self._tree):
+            self._grow()
+        self._live[self.arrivals] = 1
+        self._update(self.arrivals, 1)
+        self.count += 1
+        return self.arrivals
+
+    def remove(self, arrival: int):
+        self._live[arrival] = 0
+        self._update(arrival, -1)
+        self.count -= 1
+
+    def rank(self, arrival: int) -> int:
+        """Number of members that arrived up to and including the given arrival number"""
+        tree = self._tree
+        total = 0
+        while arrival:
+            total += tree[arrival]
+            arrival &= arrival - 1
+        return total
+
+    def _update(self, arrival: int, delta: int):
+        tree = self._tree
+        size = len(tree)
+        while arrival < size:
+            tree[arrival] += delta
+            arrival += arrival & -arrival
+
+    def _grow(self):
+        live = self._live + bytearray(len(self._live))
+        tree = list(live)
+        size = len(tree)
+        for index in range(1, size):
+            parent = index + (index & -index)
+            if parent < size:
+                tree[parent] += tree[index]
+        self._tree, self._live = tree, live
+
+
+class Waitlist:
+    """Queue of students waiting for a seat in one course, highest priority first, then first come.
+
+    Entries live in a binary heap keyed on (-priority, arrival number), so
+    joining and promoting the head are O(log n). Leaving the queue only
+    forgets the entry; its heap item is skipped when it reaches the top.
+    Each priority level numbers its own arrivals and counts them in a
+    Fenwick tree, so a student's position is O(log n) plus one step per
+    higher priority level.
+    """
+
+    __slots__ = ('_heap', '_entries', '_tiers')
+
+    def __init__(self):
+        self._heap: List[Tuple[int, int, str]] = []
+        self._entries: Dict[str, Tuple[int, int]] = {}  # Student ID to its live heap key
+        self._tiers: Dict[int, _Tier] = {}  # Priority to the arrivals queued at it
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, student_id: object) -> bool:
+        return student_id in self._entries
+
+    def clone(self) -> 'Waitlist':
+        clone = Waitlist()
+        clone._heap = list(self._heap)
+        clone._entries = dict(self._entries)
+        clone._tiers = {priority: tier.clone() for priority, tier in self._tiers.items()}
+        return clone
+
+    def add(self, student_id: str, priority: int = 0) -> int:
+        """Queue a student (or change their priority) and return their 1-based position"""
+        self.discard(student_id)
+        tier = self._tiers.get(priority)
+        if tier is None:
+            tier = self._tiers[priority] = _Tier()
+        key = (-priority, tier.append())
+        self._entries[student_id] = key
+        heapq.heappush(self._heap, (key[0], key[1], student_id))
+        return self.position(student_id)
+
+    def discard(self, student_id: str) -> bool:
+        key = self._entries.pop(student_id, None)
+        if key is None:
+            return False
+        tier = self._tiers[-key[0]]
+        tier.remove(key[1])
+        if not tier.count:
+            # Arrival numbers restart with the next member; stale heap items never match a live key by accident
+            # because peek compares the student ID too
+            del self._tiers[-key[0]]
+        elif tier.arrivals >= 64 and tier.count * 4 < tier.arrivals:
+            self._renumber(-key[0])
+        if len(self._heap) > 2 * len(self._entries) + 16:
+            self._rebuild_heap()
+        return True
+
+    def _renumber(self, priority: int):
+        """Give the members of a mostly departed priority level consecutive arrival numbers again"""
+        members = sorted((key[1], student_id) for student_id, key in self._entries.items() if key[0] == -priority)
+        tier = self._tiers[priority] = _Tier(max(16, 2 * len(members)))
+        for _, student_id in members:
+            self._entries[student_id] = (-priority, tier.append())
+        self._rebuild_heap()
+
+    def _rebuild_heap(self):
+        # Mostly stale items (or renumbered keys): rebuild from the live entries so the heap stays proportional
+        self._heap = [(key[0], key[1], sid) for sid, key in self._entries.items()]
+        heapq.heapify(self._heap)
+
+    def peek(self) -> Optional[str]:
+        """The student who would be promoted next"""
+        heap = self._heap
+        while heap:
+            priority, arrival, student_id = heap[0]
+            if self._entries.get(student_id) == (priority, arrival):
+                return student_id
+            heapq.heappop(heap)  # Left the queue or re-queued with another priority
+        return None
+
+    def pop(self) -> Optional[str]:
+        student_id = self.peek()
+        if student_id is not None:
+            heapq.heappop(self._heap)
+            self.discard(student_id)
+        return student_id
+
+    def position(self, student_id: str) -> Optional[int]:
+        """1-based place in the queue, or None if the student is not waiting"""
+        key = self._entries.get(student_id)
+        if key is None:
+            return None
+        priority = -key[0]
+        ahead = sum(tier.count for other, tier in self._tiers.items() if other > priority)
+        return ahead + self._tiers[priority].rank(key[1])
+
+    def priority(self, student_id: str) -> Optional[int]:
+        key = self._entries.get(student_id)
+        return -key[0] if key is not None else None
+
+    def ordered(self) -> List[str]:
+        """Waiting student IDs in promotion order"""
+        return [student_id for student_id, _ in sorted(self._entries.items(), key=lambda item: item[1])]
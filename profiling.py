@@ -0,0 +1,213 @@
+import cProfile
+import io
+import marshal
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+MODES = ('cprofile', 'stack')
+MAX_SECONDS = 3600
+MIN_INTERVAL = 0.001
+
+
+class ProfilingSession:
+    """One profiling window: which requests to sample, and what was collected so far"""
+
+    def __init__(self, mode: str, route: Optional[str], percent: float, seconds: float, interval: float):
+        self.mode = mode
+        self.route = route  # Route template such as /courses, or None for every route
+        self.percent = percent
+        self.interval = interval  # Seconds between stack samples
+        self.started = time.time()
+        self.deadline = time.monotonic() + seconds
+        self.stopped = False
+        self.requests = 0
+        self.samples = 0
+        self.stats: Optional[pstats.Stats] = None  # Aggregated cProfile data
+        self.stacks: Counter = Counter()  # Collapsed stack to sample count
+
+    @property
+    def active(self) -> bool:
+        return not self.stopped and time.monotonic() < self.deadline
+
+    def to_dict(self) -> Dict:
+        return {
+            'mode': self.mode,
+            'route': self.route,
+            'percent': self.percent,
+            'interval_ms': self.interval * 1000,
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S%z', time.localtime(self.started)),
+            'seconds_left': max(0.0, round(self.deadline - time.monotonic(), 1)) if not self.stopped else 0.0,
+            'active': self.active,
+            'profiled_requests': self.requests,
+            'stack_samples': self.samples,
+        }
+
+
+class Profiler:
+    """In-process, on-demand profiler for live requests.
+
+    An operator opens a window with `start`; during it, requests on the
+    chosen route (or all routes) are picked with the given probability.
+    In "cprofile" mode each picked request runs under its own cProfile
+    profiler and the results are merged into one pstats.Stats. In "stack"
+    mode a background thread samples the stacks of the threads serving
+    picked requests every `interval` seconds, for flamegraphs. Only one
+    window exists at a time; its data stays downloadable after it ends.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.session: Optional[ProfilingSession] = None
+        self._threads: Dict[int, str] = {}  # Thread ID to route of the sampled request it serves
+        self._sampler: Optional[threading.Thread] = None
+
+    def start(self, mode: str = 'cprofile', route: Optional[str] = None, percent: float = 100.0,
+              seconds: float = 60.0, interval: float = 0.005) -> ProfilingSession:
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}")
+        if not 0 < percent <= 100:
+            raise ValueError("percent must be in (0, 100]")
+        if not 0 < seconds <= MAX_SECONDS:
+            raise ValueError(f"seconds must be in (0, {MAX_SECONDS}]")
+        session = ProfilingSession(mode, route, percent, seconds, max(interval, MIN_INTERVAL))
+        with self._lock:
+            if self.session is not None:
+                self.session.stopped = True
+            self.session = session
+            self._threads.clear()
+        if mode == 'stack':
+            self._sampler = threading.Thread(target=self._sample, args=(session,), daemon=True,
+                                             name='profiler-sampler')
+            self._sampler.start()
+        return session
+
+    def stop(self) -> Optional[ProfilingSession]:
+        with self._lock:
+            session = self.session
+            if session is not None:
+                session.stopped = True
+        return session
+
+    def pick(self, route: str) -> Optional[ProfilingSession]:
+        """Return the active session if this request should be profiled, else None"""
+        session = self.session
+        if session is None or not session.active:
+            return None
+        if session.route is not None and session.route != route:
+            return None
+        if session.percent < 100 and random.random() * 100 >= session.percent:
+            return None
+        return session
+
+    def begin(self, session: ProfilingSession, route: str) -> Optional[cProfile.Profile]:
+        """Start profiling the current request; returns the profiler to hand back to `end`"""
+        if session.mode == 'stack':
+            with self._lock:
+                self._threads[threading.get_ident()] = route
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # Another profiler is already active in this thread
+            return None
+        return profile
+
+    def end(self, session: ProfilingSession, profile: Optional[cProfile.Profile]):
+        if session.mode == 'stack':
+            with self._lock:
+                self._threads.pop(threading.get_ident(), None)
+                session.requests += 1
+            return
+        if profile is None:
+            return
+        profile.disable()
+        with self._lock:
+            if session.stats is None:
+                session.stats = pstats.Stats(profile)
+            else:
+                session.stats.add(profile)
+            session.requests += 1
+
+    def _sample(self, session: ProfilingSession):
+        own = threading.get_ident()
+        while session.active:
+            time.sleep(session.interval)
+            with self._lock:
+                threads = dict(self._threads)
+            if not threads:
+                continue
+            frames = sys._current_frames()
+            collected = []
+            for thread_id, route in threads.items():
+                frame = frames.get(thread_id)
+                if frame is None or thread_id == own:
+                    continue
+                collected.append(_collapse(route, frame))
+            with self._lock:
+                session.stacks.update(collected)
+                session.samples += len(collected)
+
+    def pstats_bytes(self) -> Optional[bytes]:
+        """The aggregated profile in the binary format read by pstats.Stats and snakeviz"""
+        with self._lock:
+            session = self.session
+            if session is None or session.stats is None:
+                return None
+            # Same layout as Stats.dump_stats, without going through a file
+            return marshal.dumps(session.stats.stats)
+
+    def summary(self, limit: int = 30, sort: str = 'cumulative') -> Optional[str]:
+        """The top functions of the aggregated profile, as printed by pstats"""
+        with self._lock:
+            session = self.session
+            if session is None or session.stats is None:
+                return None
+            output = io.StringIO()
+            session.stats.stream = output
+            session.stats.sort_stats(sort).print_stats(limit)
+            return output.getvalue()
+
+    def collapsed(self) -> Optional[str]:
+        """Sampled stacks in collapsed format ("root;...;leaf count"), for flamegraph.pl or speedscope"""
+        with self._lock:
+            session = self.session
+            if session is None or session.mode != 'stack':
+                return None
+            return ''.join(f"{stack} {count}\n" for stack, count in session.stacks.most_common())
+
+
+def _collapse(route: str, frame) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name}@{code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno}")
+        frame = frame.f_back
+    names.append(route)
+    return ';'.join(reversed(names))
+
+
+def attach_profiler(app, profiler: Profiler):
+    """Let the profiler pick requests of a Flask app, by route template"""
+    from flask import g, request
+
+    @app.before_request
+    def start_profiling():
+        if profiler.session is None:
+            return
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        if route.startswith('/admin/'):
+            return  # Never profile the profiler's own endpoints
+        session = profiler.pick(route)
+        if session is not None:
+            g.profiling = (session, profiler.begin(session, route))
+
+    @app.teardown_request
+    def stop_profiling(error=None):
+        profiling = g.pop('profiling', None)
+        if profiling is not None:
+            profiler.end(*profiling)
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+import app as server
+
+
+@pytest.fixture
+def client():
+    return server.app.test_client()
+
+
+def add_student(client, name='Ada Lovelace'):
+    response = client.post('/students', json={'name': name, 'contact_info': {'email': 'ada@example.org', 'phone': '1'}})
+    assert response.status_code == 201
+    return response.get_json()['id']
+
+
+def add_course(client, capacity=10):
+    response = client.post('/courses', json={'type': 'math', 'name': 'Analysis', 'max_capacity': capacity,
+                                             'difficulty_level': 'advanced'})
+    assert response.status_code == 201
+    return response.get_json()['id']
+
+
+def test_gradebook_rejects_grades_too_large_for_a_float(client):
+    course_id = add_course(client)
+    student_id = add_student(client)
+    other_id = add_student(client, 'Alan Turing')
+    for enrolled_id in (student_id, other_id):
+        assert client.post(f'/courses/{course_id}/students/{enrolled_id}').status_code == 201
+
+    response = client.post(f'/courses/{course_id}/grades', json={'grades': {student_id: 10 ** 400, other_id: 80}})
+    assert response.status_code == 400
+    rejected = response.get_json()['rejected']
+    assert [entry['student_id'] for entry in rejected] == [student_id]
+    assert rejected[0]['reason'] == "grade must be between 0 and 100"
+    assert server.university.get_course_grades(course_id) == {}
+
+    response = client.post(f'/courses/{course_id}/grades/{student_id}', json={'grade': 10 ** 400})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('body', [
+    None,
+    [1],
+    'enrollments',
+    {'enrollments': [1]},
+    {'enrollments': [{'student_id': [1], 'course_id': 'c'}]},
+    {'student_id': {'a': 1}, 'course_ids': ['c']},
+    {'student_id': 's', 'course_ids': [None]},
+])
+def test_batch_enrollment_rejects_malformed_bodies(client, body):
+    response = client.post('/enrollments', data=json.dumps(body), content_type='application/json')
+    assert response.status_code == 400
+    assert 'Invalid enrollment batch' in response.get_json()['error']
+
+
+def test_attendance_with_an_invalid_date_is_rejected(client):
+    course_id = add_course(client)
+    student_id = add_student(client)
+    assert client.post(f'/courses/{course_id}/students/{student_id}').status_code == 201
+
+    response = client.post(f'/courses/{course_id}/attendance',
+                           json={'date': '2024-13-45', 'present_student_ids': [student_id]})
+    assert response.status_code == 400
+    assert client.get(f'/courses/{course_id}/attendance').get_json() == {'sessions': []}
+
+    response = client.post(f'/courses/{course_id}/attendance',
+                           json={'date': '2024-03-05', 'present_student_ids': [student_id]})
+    assert response.status_code == 201
+    assert len(client.get(f'/courses/{course_id}/attendance').get_json()['sessions']) == 1
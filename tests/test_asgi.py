@@ -0,0 +1,53 @@
+import asyncio
+import json
+
+import asgi
+
+
+def call(method, path, body=b'', query=b''):
+    """Drive the ASGI application directly; returns the status, headers and the whole response body"""
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method, 'scheme': 'http',
+        'path': path, 'query_string': query, 'root_path': '',
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())],
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 50000),
+    }
+    asyncio.run(asgi.application(scope, receive, send))
+    start = sent[0]
+    assert start['type'] == 'http.response.start'
+    assert not sent[-1].get('more_body', False)
+    return start['status'], dict(start['headers']), b''.join(message.get('body', b'') for message in sent[1:])
+
+
+def test_inline_and_offloaded_requests():
+    body = json.dumps({'name': 'Ada Lovelace', 'contact_info': {'email': 'ada@example.org', 'phone': '1'}}).encode()
+    status, _, response = call('POST', '/students', body)
+    assert status == 201
+    student_id = json.loads(response)['id']
+
+    environ = asgi.wsgi_environ({'method': 'GET', 'path': f'/students/{student_id}'})
+    assert not asgi.offloaded(environ)
+    status, _, response = call('GET', f'/students/{student_id}')
+    assert status == 200
+    assert json.loads(response)['name'] == 'Ada Lovelace'
+
+    assert asgi.offloaded(asgi.wsgi_environ({'method': 'GET', 'path': '/students'}))
+    status, _, response = call('GET', '/students', query=b'limit=1000')
+    assert status == 200
+    assert student_id in {student['id'] for student in json.loads(response)['students']}
+
+
+def test_streamed_response():
+    status, headers, response = call('GET', '/exports/enrollments')
+    assert status == 200
+    assert b'content-length' not in headers
+    assert response.startswith(b'course_id,')
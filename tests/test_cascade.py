@@ -0,0 +1,52 @@
+from export import iter_export
+from models.course import Course
+from models.person import Student
+from models.university import University
+
+
+def make_university():
+    university = University()
+    student_id = university.add_student(Student('Ada Lovelace', {'email': 'ada@example.org', 'phone': '1'}))
+    other_id = university.add_student(Student('Alan Turing', {'email': 'alan@example.org', 'phone': '2'}))
+    course_id = university.add_course(Course('Analysis', 10, 'lecture'))
+    for enrolled_id, grade in ((student_id, 90), (other_id, 70)):
+        assert university.enroll_student(enrolled_id, course_id)
+        assert university.assign_grade(course_id, enrolled_id, grade)
+    return university, student_id, other_id, course_id
+
+
+def export_text(university, name):
+    return b''.join(iter_export(university, name)).decode()
+
+
+def test_withdrawal_keeps_the_grade_on_both_sides():
+    university, student_id, _, course_id = make_university()
+    assert university.withdraw_student(student_id, course_id)
+    assert university.enroll_student(student_id, course_id)
+    assert university.get_course_grades(course_id)[student_id] == 90
+    assert university.get_student_grades(student_id) == {course_id: 90}
+
+
+def test_removing_a_withdrawn_student_drops_their_grade():
+    university, student_id, other_id, course_id = make_university()
+    assert university.withdraw_student(student_id, course_id)
+    assert university.remove_student(student_id)
+
+    assert university.get_course_grades(course_id) == {other_id: 70}
+    stats = university.get_course_grade_stats(course_id)
+    assert stats['count'] == 1
+    assert stats['mean'] == 70
+    assert university.get_grade_report()['courses'][course_id]['count'] == 1
+    assert student_id not in export_text(university, 'grades')
+    assert university.get_transcript(other_id)['ranked_students'] == 1
+
+
+def test_removing_a_course_drops_the_grades_of_withdrawn_students():
+    university, student_id, other_id, course_id = make_university()
+    assert university.withdraw_student(student_id, course_id)
+    assert university.remove_course(course_id)
+
+    assert university.get_student_grades(student_id) == {}
+    assert university.get_student_grades(other_id) == {}
+    assert university.get_transcript(student_id)['rank'] is None
+    assert course_id not in export_text(university, 'grades')
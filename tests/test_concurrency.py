@@ -0,0 +1,92 @@
+import random
+import threading
+
+import pytest
+
+from models import Course, Student, University
+
+COURSES = 8
+CAPACITY = 5
+STUDENTS = 200
+
+
+def link_problems(students, courses) -> list:
+    """Overbooked courses, and enrollments or grades held by only one side"""
+    problems = []
+    for course in courses.values():
+        if len(course.students) > course.max_capacity:
+            problems.append(f"course {course.id} overbooked: {len(course.students)}/{course.max_capacity}")
+        for student_id in course.students:
+            if course.id not in students[student_id].enrolled_courses:
+                problems.append(f"student {student_id} missing enrollment in {course.id}")
+        for student_id in course.grades:
+            if students[student_id].grades.get(course.id) != course.grades[student_id]:
+                problems.append(f"grade of {student_id} in {course.id} differs")
+    for student in students.values():
+        for course_id in student.enrolled_courses:
+            if student.id not in courses[course_id].students:
+                problems.append(f"course {course_id} missing student {student.id}")
+        for course_id in student.grades:
+            if student.id not in courses[course_id].grades:
+                problems.append(f"course {course_id} missing the grade of {student.id}")
+    return problems
+
+
+@pytest.mark.parametrize('threads', [2, 8])
+def test_concurrent_mutations_keep_links_consistent(threads):
+    university = University()
+    course_ids = [university.add_course(Course(f"Course {i}", CAPACITY, "math", "beginner")) for i in range(COURSES)]
+    student_ids = [university.add_student(Student(f"Student {i}", {'email': f"s{i}@example.com", 'phone': '555'}))
+                   for i in range(STUDENTS)]
+    start = threading.Barrier(threads + 2)
+    stop = threading.Event()
+    errors = []
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        start.wait()
+        try:
+            for _ in range(3000):
+                student_id, course_id = rng.choice(student_ids), rng.choice(course_ids)
+                roll = rng.random()
+                if roll < 0.3:
+                    university.enroll_student(student_id, course_id)
+                elif roll < 0.5:
+                    university.enroll_or_waitlist(student_id, course_id)
+                elif roll < 0.7:
+                    university.withdraw_student(student_id, course_id)
+                elif roll < 0.75:
+                    university.leave_waitlist(student_id, course_id)
+                elif roll < 0.85:
+                    university.assign_grade(course_id, student_id, rng.uniform(0, 100))
+                else:
+                    university.enroll_batch([(student_id, rng.choice(course_ids)) for _ in range(3)])
+        except Exception as e:  # Surfaced by the main thread, which owns the assertions
+            errors.append(e)
+
+    def checker():
+        # Every snapshot is a consistent cut, so the links must agree mid-run too
+        start.wait()
+        while not stop.is_set():
+            with university.snapshot() as view:
+                errors.extend(link_problems(view.students, view.courses))
+
+    workers = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    watcher = threading.Thread(target=checker)
+    for thread in workers + [watcher]:
+        thread.start()
+    start.wait()
+    for thread in workers:
+        thread.join()
+    stop.set()
+    watcher.join()
+
+    assert errors == []
+    assert link_problems(university.students, university.courses) == []
+    for course_id in course_ids:
+        course = university.courses[course_id]
+        waiting = university.get_waitlist(course_id)
+        # A free seat never stays free while somebody waits for it
+        assert not waiting or len(course.students) == course.max_capacity
+        for entry in waiting:
+            assert course_id not in university.students[entry['student_id']].enrolled_courses
@@ -0,0 +1,38 @@
+import io
+
+from importers import bulk_import, build_course, build_teacher, iter_records
+
+
+def import_csv(text, build):
+    inserted = []
+    records = iter_records(io.BytesIO(text.encode()), 'text/csv')
+    result = bulk_import(records, build, lambda batch: inserted.extend(batch) or [entity.id for entity in batch])
+    return result, inserted
+
+
+def test_teacher_csv_with_an_empty_specializations_cell_fails_validation():
+    result, inserted = import_csv(
+        "name,email,phone,specializations\n"
+        "Grace Hopper,grace@example.org,1,compilers; navy\n"
+        "Edsger Dijkstra,edsger@example.org,2,\n",
+        build_teacher)
+    assert [teacher.specializations for teacher in inserted] == [['compilers', 'navy']]
+    assert result['errors'] == [{'row': 2, 'error': "Specializations must be a non-empty list of strings"}]
+
+
+def test_missing_list_columns_are_still_reported_as_missing():
+    result, inserted = import_csv("name,email,phone\nGrace Hopper,grace@example.org,1\n", build_teacher)
+    assert inserted == []
+    assert result['errors'] == [{'row': 1, 'error': "Missing field 'specializations'"}]
+
+
+def test_art_course_csv_with_an_empty_materials_cell():
+    # Courses may need no materials: an empty cell imports like "materials_required": [] in NDJSON
+    result, inserted = import_csv(
+        "type,name,max_capacity,materials_required\n"
+        "art,Drawing,20,pencils;paper\n"
+        "art,Sculpture,20,\n",
+        build_course)
+    assert result['errors'] == []
+    assert [(course.name, course.materials_required) for course in inserted] == [
+        ('Drawing', {'pencils', 'paper'}), ('Sculpture', set())]
@@ -0,0 +1,96 @@
+import random
+from bisect import insort
+
+import pytest
+
+from models.indexes import PrefixIndex
+from models.transcript import GpaRanking
+
+NAMES = ['Ada', 'ada', 'Adam', 'Alan', 'Al', 'Bea', 'Beatrix', 'bob', 'Émile', 'emil', 'Zoe', '']
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    # Tiny blocks, so a few hundred pairs split and empty many of them
+    monkeypatch.setattr(PrefixIndex, 'BLOCK', 4)
+
+
+def expected_search(entries, prefix):
+    prefix = prefix.casefold()
+    return [entity_id for key, entity_id in entries if key.startswith(prefix)]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_prefix_index_matches_a_sorted_list(small_blocks, seed):
+    rng = random.Random(seed)
+    index, entries = PrefixIndex(), []
+    clone, clone_entries = None, None
+    for step in range(3000):
+        name = rng.choice(NAMES) + rng.choice(('', 'a', 'b', 'n', 'ne'))
+        entity_id = f'id-{rng.randrange(60)}'
+        roll = rng.random()
+        if roll < 0.45:
+            if (name.casefold(), entity_id) not in entries:
+                index.add(name, entity_id)
+                insort(entries, (name.casefold(), entity_id))
+        elif roll < 0.5:
+            batch = {(rng.choice(NAMES) + str(rng.randrange(5)), f'id-{rng.randrange(60)}')
+                     for _ in range(rng.randrange(1, 40))}
+            batch = [pair for pair in batch if (pair[0].casefold(), pair[1]) not in entries]
+            index.add_many(batch)
+            entries = sorted(entries + [(key.casefold(), entity_id) for key, entity_id in batch])
+        elif roll < 0.85:
+            index.remove(name, entity_id)
+            if (name.casefold(), entity_id) in entries:
+                entries.remove((name.casefold(), entity_id))
+        elif roll < 0.86:
+            clone, clone_entries = index.clone(), list(entries)
+        else:
+            prefix = rng.choice(NAMES)[:rng.randrange(4)]
+            assert list(index.search(prefix)) == expected_search(entries, prefix)
+        assert len(index) == len(entries)
+    assert [entry for block in index._blocks for entry in block] == entries
+    assert index._maxes == [block[-1] for block in index._blocks]
+    assert all(0 < len(block) <= 2 * PrefixIndex.BLOCK for block in index._blocks)
+    if clone is not None:
+        assert list(clone.search('')) == [entity_id for _, entity_id in clone_entries]
+
+
+def test_prefix_index_bulk_build_matches_inserts(small_blocks):
+    rng = random.Random(7)
+    pairs = [(rng.choice(NAMES) + str(i), f'id-{i}') for i in range(500)]
+    bulk, single = PrefixIndex(), PrefixIndex()
+    bulk.add_many(pairs[:10])
+    bulk.add_many(pairs[10:])
+    for key, entity_id in pairs:
+        single.add(key, entity_id)
+    for prefix in ('', 'a', 'AD', 'bea', 'é', 'z', 'q'):
+        assert list(bulk.search(prefix)) == list(single.search(prefix))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_gpa_ranking_matches_a_sorted_list(seed):
+    rng = random.Random(seed)
+    ranking, gpas = GpaRanking(), {}
+    students = [f'student-{i}' for i in range(80)]
+    for _ in range(3000):
+        student_id = rng.choice(students)
+        roll = rng.random()
+        if roll < 0.6:
+            # Few distinct GPAs, so ties are broken by student ID
+            gpa = rng.choice((None, 55.0, 70.0, 70.0, 82.5, 90.0, 100.0))
+            ranking.update(student_id, gpa)
+            if gpa is None:
+                gpas.pop(student_id, None)
+            else:
+                gpas[student_id] = gpa
+        elif roll < 0.8:
+            ranking.discard(student_id)
+            gpas.pop(student_id, None)
+        else:
+            expected = sorted(gpas.items(), key=lambda item: (-item[1], item[0]))
+            k = rng.randrange(len(students))
+            assert ranking.top(k) == expected[:k]
+            ranks = {ranked_id: rank for rank, (ranked_id, _) in enumerate(expected, 1)}
+            assert ranking.rank(student_id) == ranks.get(student_id)
+        assert len(ranking) == len(gpas)
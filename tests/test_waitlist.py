@@ -0,0 +1,100 @@
+import random
+
+import pytest
+
+from models.course import Course
+from models.person import Student
+from models.university import University
+from models.waitlist import Waitlist, _Tier
+
+
+def add_students(university, count):
+    return [university.add_student(Student(f'Student {i}', {'email': f's{i}@example.org', 'phone': str(i)}))
+            for i in range(count)]
+
+
+def test_batch_enrollment_leaves_seats_to_the_waitlist():
+    university = University()
+    first, waiting, late = add_students(university, 3)
+    course_id = university.add_course(Course('Analysis', 1, 'lecture'))
+    other_id = university.add_course(Course('Drawing', 5, 'lecture'))
+    assert university.enroll_or_waitlist(first, course_id) == ('enrolled', None)
+    assert university.enroll_or_waitlist(waiting, course_id) == ('waitlisted', 1)
+
+    rejected = university.enroll_batch([(late, course_id), (late, other_id)])
+    assert rejected == [{'student_id': late, 'course_id': course_id, 'reason': "course has a waitlist"}]
+    assert university.get_student_courses(late) == []
+
+    assert university.withdraw_student(first, course_id)
+    assert [student['id'] for student in university.get_course_roster(course_id)] == [waiting]
+
+
+class NaiveWaitlist:
+    """Reference model: a plain list kept in promotion order"""
+
+    def __init__(self):
+        self.entries = []  # (priority, arrival, student_id)
+        self.arrivals = 0
+
+    def add(self, student_id, priority):
+        self.discard(student_id)
+        self.arrivals += 1
+        self.entries.append((priority, self.arrivals, student_id))
+        self.entries.sort(key=lambda entry: (-entry[0], entry[1]))
+
+    def discard(self, student_id):
+        before = len(self.entries)
+        self.entries = [entry for entry in self.entries if entry[2] != student_id]
+        return len(self.entries) != before
+
+    def pop(self):
+        return self.entries.pop(0)[2] if self.entries else None
+
+    def ordered(self):
+        return [student_id for _, _, student_id in self.entries]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_waitlist_matches_a_naive_model(seed):
+    rng = random.Random(seed)
+    waitlist, model = Waitlist(), NaiveWaitlist()
+    students = [f'student-{i}' for i in range(300)]
+    clone, clone_order = None, None
+    for step in range(6000):
+        student_id = rng.choice(students)
+        roll = rng.random()
+        if roll < 0.45:
+            priority = rng.choice((0, 0, 0, 1, 2, 5))
+            model.add(student_id, priority)
+            expected_position = model.ordered().index(student_id) + 1
+            assert waitlist.add(student_id, priority) == expected_position
+        elif roll < 0.75:
+            assert waitlist.discard(student_id) == model.discard(student_id)
+        elif roll < 0.9:
+            assert waitlist.pop() == model.pop()
+        elif roll < 0.91:
+            clone, clone_order = waitlist.clone(), model.ordered()
+        else:
+            expected = model.ordered()
+            assert waitlist.peek() == (expected[0] if expected else None)
+            assert waitlist.ordered() == expected
+        assert len(waitlist) == len(model.entries)
+        if step % 50 == 0:
+            expected = model.ordered()
+            for position, waiting_id in enumerate(expected, 1):
+                assert waitlist.position(waiting_id) == position
+                assert waitlist.priority(waiting_id) == next(p for p, _, s in model.entries if s == waiting_id)
+            assert all(waitlist.position(other) is None for other in set(students) - set(expected))
+    if clone is not None:
+        assert clone.ordered() == clone_order
+
+
+def test_tier_ranks_survive_growth():
+    tier = _Tier(2)
+    arrivals = [tier.append() for _ in range(100)]
+    for arrival in arrivals[::3]:
+        tier.remove(arrival)
+    live = [arrival for index, arrival in enumerate(arrivals) if index % 3]
+    assert tier.count == len(live)
+    for rank, arrival in enumerate(live, 1):
+        assert tier.rank(arrival) == rank